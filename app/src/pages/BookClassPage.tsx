@@ -122,11 +122,19 @@ const BookClassPage: React.FC<BookClassPageProps> = ({ navigation, route }) => {
 
     setBooking(true);
     try {
+      // Конкретное занятие в выбранный день; если расписание не отдало его,
+      // сервер сам найдёт занятие по дате
+      const sessions = await classesService.getSchedule({
+        class_id: classId,
+        date_from: classDate,
+        date_to: classDate,
+      });
       const bookingData = {
         athlete_id: userRole === 'parent' ? selectedChild!.id : user.id,
         class_id: classId,
         booking_type: bookingType,
-        class_date: classDate,
+        class_date: sessions.length > 0 ? sessions[0].starts_at : classDate,
+        occurrence_id: sessions.length > 0 ? sessions[0].id : undefined,
         notes: notes.trim() || undefined,
       };
 
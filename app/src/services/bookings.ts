@@ -72,6 +72,7 @@ export interface BookingCreate {
   class_id: number;
   booking_type?: 'regular' | 'trial' | 'makeup';
   class_date: string;
+  occurrence_id?: number;
   notes?: string;
 }
 
@@ -23,6 +23,24 @@ export interface Class {
   };
 }
 
+export interface ClassOccurrence {
+  id: number;
+  class_id: number;
+  coach_id: number;
+  starts_at: string;
+  ends_at: string;
+  status: 'scheduled' | 'cancelled';
+  capacity: number;
+  seats_taken: number;
+}
+
+export interface ScheduleParams {
+  date_from?: string;
+  date_to?: string;
+  coach_id?: number;
+  class_id?: number;
+}
+
 export interface ClassCreate {
   name: string;
   description?: string;
@@ -54,10 +72,11 @@ export interface ClassUpdate {
 }
 
 class ClassesService {
-  async getClasses(skip: number = 0, limit: number = 100): Promise<Class[]> {
+  // Следующая страница - cursor из заголовка X-Next-Cursor предыдущего ответа
+  async getClasses(cursor?: string, limit: number = 100): Promise<Class[]> {
     try {
       const response = await api.get('/classes/', {
-        params: { skip, limit }
+        params: { cursor, limit }
       });
       return response.data;
     } catch (error: any) {
@@ -68,10 +87,10 @@ class ClassesService {
     }
   }
 
-  async getClassesByCoach(coachId: number, skip: number = 0, limit: number = 100): Promise<Class[]> {
+  async getClassesByCoach(coachId: number, cursor?: string, limit: number = 100): Promise<Class[]> {
     try {
       const response = await api.get('/classes/', {
-        params: { coach_id: coachId, skip, limit }
+        params: { coach_id: coachId, cursor, limit }
       });
       return response.data;
     } catch (error: any) {
@@ -94,6 +113,18 @@ class ClassesService {
     }
   }
 
+  async getSchedule(params: ScheduleParams = {}): Promise<ClassOccurrence[]> {
+    try {
+      const response = await api.get('/classes/schedule', { params });
+      return response.data;
+    } catch (error: any) {
+      if (error.response?.data?.detail) {
+        throw new Error(error.response.data.detail);
+      }
+      throw new Error('Failed to get schedule');
+    }
+  }
+
   async createClass(classData: ClassCreate): Promise<Class> {
     try {
       console.log('ClassesService: Creating class with data:', classData);
@@ -66,14 +66,16 @@ export interface TournamentParticipantCreate {
 }
 
 class TournamentsService {
+  // Следующая страница - cursor из заголовка X-Next-Cursor предыдущего ответа
   async getTournaments(
-    skip: number = 0, 
+    cursor?: string,
     limit: number = 100, 
     status?: string, 
     category?: string
   ): Promise<Tournament[]> {
     try {
-      const params: any = { skip, limit };
+      const params: any = { limit };
+      if (cursor) params.cursor = cursor;
       if (status) params.status = status;
       if (category) params.category = category;
       
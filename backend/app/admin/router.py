@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import PlainTextResponse
+from typing import List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.deps import get_db, get_current_head_coach
+from app.users.models import User
+from app.core.slow_queries import slow_query_log
+from app.core.profiling import profile_store
+from app.core.cache import cache
+from app.core.singleflight import single_flight
+from app.admin import schemas
+from app.jobs import crud as jobs_crud, schemas as jobs_schemas
+from app.jobs.models import JobStatus
+from app.common.pagination import PageParams, page_params
+
+router = APIRouter()
+
+@router.get("/slow-queries", response_model=List[schemas.SlowQueryOut])
+async def get_slow_queries(
+    current_user: User = Depends(get_current_head_coach)
+):
+    """Получить журнал медленных запросов (только главный тренер)"""
+    return slow_query_log.entries()
+
+@router.delete("/slow-queries")
+async def clear_slow_queries(
+    current_user: User = Depends(get_current_head_coach)
+):
+    """Очистить журнал медленных запросов (только главный тренер)"""
+    slow_query_log.clear()
+    return {"message": "Slow query log cleared"}
+
+@router.get("/profiles", response_model=List[schemas.ProfileOut])
+async def get_profiles(
+    current_user: User = Depends(get_current_head_coach)
+):
+    """Получить список сохранённых профилей запросов (только главный тренер)"""
+    return profile_store.list()
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def download_profile(
+    profile_id: str,
+    current_user: User = Depends(get_current_head_coach)
+):
+    """Скачать профиль в свёрнутом формате для flamegraph (только главный тренер)"""
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profile not found"
+        )
+    return PlainTextResponse(
+        profile["folded"],
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.folded"'}
+    )
+
+@router.get("/cache", response_model=schemas.CacheStatsOut)
+async def get_cache_stats(
+    current_user: User = Depends(get_current_head_coach)
+):
+    """Получить метрики кэша и объединения запросов по функциям (только главный тренер)"""
+    return {**cache.stats(), "coalescing": single_flight.stats()}
+
+@router.delete("/cache")
+async def clear_cache(
+    current_user: User = Depends(get_current_head_coach)
+):
+    """Сбросить кэш и его счётчики (только главный тренер)"""
+    await cache.clear()
+    cache.reset_stats()
+    single_flight.reset_stats()
+    return {"message": "Cache cleared"}
+
+@router.get("/jobs/stats", response_model=List[jobs_schemas.JobStatsOut])
+async def get_job_stats(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_head_coach)
+):
+    """Число фоновых задач по обработчику и статусу (только главный тренер)"""
+    return await jobs_crud.get_job_stats(db)
+
+@router.get("/jobs", response_model=List[jobs_schemas.JobOut])
+async def get_jobs(
+    response: Response,
+    job_status: Optional[JobStatus] = None,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_head_coach)
+):
+    """Список фоновых задач, например job_status=failed (только главный тренер)"""
+    jobs = await jobs_crud.get_jobs(db, job_status, page)
+    response.headers.update(jobs.headers())
+    return jobs.items
+
+@router.post("/jobs/{job_id}/retry", response_model=jobs_schemas.JobOut)
+async def retry_job(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_head_coach)
+):
+    """Повторить задачу, исчерпавшую попытки (только главный тренер)"""
+    job = await jobs_crud.retry_job(db, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Failed job not found"
+        )
+    return job
@@ -0,0 +1,45 @@
+from pydantic import BaseModel
+from typing import Any, List, Optional
+from datetime import datetime
+
+class SlowQueryOut(BaseModel):
+    id: int
+    statement: str
+    parameters: Optional[Any] = None  # значения заменены на типы
+    duration_ms: float
+    executemany: bool
+    captured_at: datetime
+    plan: Optional[str] = None  # заполняется асинхронно после захвата
+    plan_error: Optional[str] = None
+
+class ProfileOut(BaseModel):
+    id: str
+    method: str
+    path: str
+    user_id: int
+    started_at: datetime
+    duration_ms: float
+    samples: int
+    interval_ms: int
+
+class CacheFunctionStatsOut(BaseModel):
+    name: str
+    hits: int
+    misses: int
+    errors: int  # сбои хранилища кэша (запрос при этом уходит в базу)
+    hit_ratio: float
+
+class CoalescingStatsOut(BaseModel):
+    name: str
+    executed: int  # запросов к базе
+    shared: int  # вызовов, получивших результат чужого запроса
+    coalescing_ratio: float
+
+class CacheStatsOut(BaseModel):
+    enabled: bool
+    backend: str
+    entries: Optional[int] = None  # только для кэша в памяти
+    hits: int
+    misses: int
+    functions: List[CacheFunctionStatsOut]
+    coalescing: List[CoalescingStatsOut] = []
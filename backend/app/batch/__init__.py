@@ -0,0 +1 @@
+# Batch module: several API requests in one round trip
@@ -0,0 +1,160 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.deps import BATCH_USER_KEY, get_current_user, get_db
+from app.users.models import User
+from app.batch import schemas
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+SAFE_METHODS = ("GET", "HEAD")
+WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+# Ключи ASGI scope, которые подзапрос наследует от запроса пакета
+_INHERITED_SCOPE_KEYS = ("type", "asgi", "http_version", "scheme", "server", "client", "root_path")
+
+
+def _sub_scope(parent: Dict[str, Any], item: schemas.BatchRequestItem, body: bytes, user: Optional[User]) -> Dict[str, Any]:
+    path, _, query = item.url.partition("?")
+    headers: List[Tuple[bytes, bytes]] = [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in item.headers.items()
+        if name.lower() not in ("authorization", "content-length", "content-type", "host")
+    ]
+    headers.extend((name, value) for name, value in parent["headers"] if name in (b"authorization", b"host"))
+    if body:
+        headers.append((b"content-type", b"application/json"))
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+
+    scope = {key: parent[key] for key in _INHERITED_SCOPE_KEYS if key in parent}
+    scope.update({
+        "method": item.method,
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "query_string": query.encode("utf-8"),
+        "headers": headers,
+        "state": dict(parent.get("state", {})),
+    })
+    if user is not None:
+        scope[BATCH_USER_KEY] = user
+    return scope
+
+
+def _decode_body(headers: Dict[str, str], body: bytes) -> Any:
+    if not body:
+        return None
+    if headers.get("content-type", "").startswith("application/json"):
+        return orjson.loads(body)
+    return body.decode("utf-8", "replace")
+
+
+async def _dispatch(app, parent: Dict[str, Any], item: schemas.BatchRequestItem, user: Optional[User]) -> schemas.BatchResponseItem:
+    """Выполнить подзапрос через ASGI-приложение целиком (middleware, обработчики ошибок)"""
+    body = orjson.dumps(item.body) if item.body is not None else b""
+    scope = _sub_scope(parent, item, body, user)
+    response: Dict[str, Any] = {"status": None, "headers": {}, "body": b""}
+    finished = asyncio.Event()
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {
+                name.decode("latin-1"): value.decode("latin-1")
+                for name, value in message.get("headers", [])
+                if name != b"content-length"
+            }
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # ServerErrorMiddleware уже отправил 500 и пробросил исключение дальше
+        logger.exception("Batch sub-request %s %s failed", item.method, item.url)
+        if response["status"] is None:
+            response["status"] = status.HTTP_500_INTERNAL_SERVER_ERROR
+    finally:
+        finished.set()
+
+    return schemas.BatchResponseItem(
+        id=item.id,
+        status=response["status"],
+        headers=response["headers"],
+        body=_decode_body(response["headers"], response["body"]),
+    )
+
+
+def _validate(item: schemas.BatchRequestItem) -> None:
+    item.method = item.method.upper()
+    if item.method not in SAFE_METHODS + WRITE_METHODS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported method: {item.method}")
+    path = item.url.partition("?")[0]
+    if not path.startswith("/") or path.startswith("//"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"URL must be an API path: {item.url}")
+    if path.rstrip("/") == "/batch" or path.startswith("/ws/"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"URL is not allowed in batch: {item.url}")
+
+
+@router.post("", response_model=schemas.BatchResponse)
+async def batch(
+    batch_request: schemas.BatchRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Выполнить несколько запросов API за один запрос.
+
+    Пользователь аутентифицируется один раз; подзапросы GET/HEAD используют
+    его без повторной проверки токена и выполняются параллельно (не более
+    BATCH_CONCURRENCY одновременно). Если в пакете есть запись, все подзапросы
+    выполняются по очереди в заданном порядке и проверяют токен сами: запись
+    меняет данные, которые могут читать следующие подзапросы.
+    Ошибка подзапроса не прерывает пакет - у каждого ответа свой статус.
+    """
+    items = batch_request.requests
+    if len(items) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many requests in batch (max {settings.BATCH_MAX_REQUESTS})"
+        )
+    for item in items:
+        _validate(item)
+
+    # Сессия аутентификации больше не нужна: соединение возвращается в пул
+    # до подзапросов (expire_on_commit=False - пользователь остаётся загруженным)
+    await db.commit()
+
+    app = request.app
+    parent = request.scope
+
+    if any(item.method in WRITE_METHODS for item in items):
+        responses = [await _dispatch(app, parent, item, None) for item in items]
+        return schemas.BatchResponse(responses=responses)
+
+    semaphore = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
+
+    async def run(item: schemas.BatchRequestItem) -> schemas.BatchResponseItem:
+        async with semaphore:
+            return await _dispatch(app, parent, item, current_user)
+
+    responses = await asyncio.gather(*(run(item) for item in items))
+    return schemas.BatchResponse(responses=list(responses))
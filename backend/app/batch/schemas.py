@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+class BatchRequestItem(BaseModel):
+    id: Optional[str] = None  # возвращается в ответе без изменений
+    method: str = "GET"
+    url: str = Field(..., min_length=1, max_length=2000)  # путь с query string, например "/users/me"
+    headers: Dict[str, str] = {}  # например If-None-Match; Authorization берётся из запроса пакета
+    body: Optional[Any] = None  # JSON-тело для POST/PUT/PATCH
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem] = Field(..., min_length=1)
+
+class BatchResponseItem(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str] = {}
+    body: Optional[Any] = None  # JSON ответа, текст или None (например, для 304)
+
+class BatchResponse(BaseModel):
+    responses: List[BatchResponseItem]
@@ -0,0 +1,185 @@
+"""Пересечения занятий спортсмена и тренера.
+
+Занятость за период загружается одним запросом на источник (занятия
+классов по индексам starts_at, принятые индивидуальные тренировки) в
+IntervalIndex; новые интервалы проверяются по нему в памяти.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bookings.models import Booking, IndividualTrainingRequest, IndividualTrainingStatus, SEAT_STATUSES
+from app.classes.models import Class, ClassOccurrence, OccurrenceStatus
+from app.core.intervals import IntervalIndex
+
+logger = logging.getLogger(__name__)
+
+# Индивидуальная тренировка без времени окончания
+INDIVIDUAL_TRAINING_DEFAULT_DURATION = timedelta(hours=1)
+
+# Сколько пересечений перечислять в тексте ошибки
+CONFLICTS_IN_MESSAGE = 5
+
+# Самое длинное занятие: нижняя граница выборки по индексу starts_at
+MAX_SESSION_DURATION = timedelta(days=1)
+
+
+@dataclass(frozen=True)
+class Busy:
+    """Занятое время: занятие класса или индивидуальная тренировка"""
+    kind: str  # "class" или "individual_training"
+    id: int  # id занятия (class_occurrences) или запроса на тренировку
+    title: str
+    starts_at: datetime
+    ends_at: datetime
+
+    def describe(self) -> str:
+        return f"{self.title} {self.starts_at:%d.%m.%Y %H:%M}-{self.ends_at:%H:%M}"
+
+
+class ScheduleConflict(ValueError):
+    """Новое занятие пересекается с уже занятым временем"""
+
+    def __init__(self, conflicts: List[Busy]):
+        message = "Schedule conflict: " + "; ".join(busy.describe() for busy in conflicts[:CONFLICTS_IN_MESSAGE])
+        if len(conflicts) > CONFLICTS_IN_MESSAGE:
+            message += f" and {len(conflicts) - CONFLICTS_IN_MESSAGE} more"
+        super().__init__(message)
+        self.conflicts = conflicts
+
+
+def _parse_time(value: Optional[str]) -> Optional[time]:
+    # Старые строки могли сохраниться без проверки формата ("18:00:00", "25:00"):
+    # такое время пропускается, чтобы одна запись не ломала все проверки
+    if not value:
+        return None
+    try:
+        return time.fromisoformat(value)
+    except ValueError:
+        logger.warning("Skipping unparseable training time %r", value)
+        return None
+
+
+def training_interval(
+    day: Optional[datetime],
+    time_start: Optional[str],
+    time_end: Optional[str],
+) -> Optional[Tuple[datetime, datetime]]:
+    """Интервал индивидуальной тренировки по дате и строкам HH:MM; без времени начала - None"""
+    start = _parse_time(time_start)
+    if day is None or start is None:
+        return None
+    starts_at = datetime.combine(day.date(), start)
+    end = _parse_time(time_end)
+    ends_at = datetime.combine(day.date(), end) if end else starts_at + INDIVIDUAL_TRAINING_DEFAULT_DURATION
+    if ends_at <= starts_at:
+        ends_at += timedelta(days=1)
+    return starts_at, ends_at
+
+
+def request_interval(request: IndividualTrainingRequest) -> Optional[Tuple[datetime, datetime]]:
+    """Назначенное время принятой тренировки, иначе - желаемое"""
+    if request.scheduled_time_start:
+        return training_interval(request.scheduled_date or request.requested_date, request.scheduled_time_start, request.scheduled_time_end)
+    return training_interval(request.requested_date, request.preferred_time_start, request.preferred_time_end)
+
+
+async def _accepted_trainings(db: AsyncSession, where, start: datetime, end: datetime, exclude_request_id: Optional[int]) -> List[Busy]:
+    # Дата тренировки - день без времени: окно расширяется на сутки
+    day_from = datetime.combine(start.date(), time.min) - timedelta(days=1)
+    day_to = datetime.combine(end.date(), time.min) + timedelta(days=1)
+    query = select(IndividualTrainingRequest).where(
+        where,
+        IndividualTrainingRequest.status == IndividualTrainingStatus.accepted,
+        or_(
+            and_(IndividualTrainingRequest.scheduled_date >= day_from, IndividualTrainingRequest.scheduled_date < day_to),
+            and_(
+                IndividualTrainingRequest.scheduled_date.is_(None),
+                IndividualTrainingRequest.requested_date >= day_from,
+                IndividualTrainingRequest.requested_date < day_to,
+            ),
+        ),
+    )
+    if exclude_request_id is not None:
+        query = query.where(IndividualTrainingRequest.id != exclude_request_id)
+    busy = []
+    for request in (await db.execute(query)).scalars():
+        interval = request_interval(request)
+        if interval and interval[0] < end and interval[1] > start:
+            busy.append(Busy("individual_training", request.id, "Индивидуальная тренировка", *interval))
+    return busy
+
+
+async def athlete_schedule(
+    db: AsyncSession,
+    athlete_id: int,
+    start: datetime,
+    end: datetime,
+    exclude_request_id: Optional[int] = None,
+) -> IntervalIndex[Busy]:
+    """Занятость спортсмена в [start, end): бронирования с местом и принятые тренировки"""
+    result = await db.execute(
+        select(ClassOccurrence.id, Class.name, ClassOccurrence.starts_at, ClassOccurrence.ends_at)
+        .join(Booking, Booking.occurrence_id == ClassOccurrence.id)
+        .join(Class, Class.id == ClassOccurrence.class_id)
+        .where(
+            Booking.athlete_id == athlete_id,
+            Booking.status.in_(SEAT_STATUSES),
+            ClassOccurrence.status == OccurrenceStatus.scheduled,
+            # class_date = starts_at занятия: диапазон по ix_bookings_athlete_id_class_date
+            Booking.class_date > start - MAX_SESSION_DURATION,
+            Booking.class_date < end,
+            ClassOccurrence.starts_at > start - MAX_SESSION_DURATION,
+            ClassOccurrence.starts_at < end,
+            ClassOccurrence.ends_at > start,
+        )
+    )
+    busy = [Busy("class", *row) for row in result.all()]
+    busy += await _accepted_trainings(db, IndividualTrainingRequest.athlete_id == athlete_id, start, end, exclude_request_id)
+    return IntervalIndex((item.starts_at, item.ends_at, item) for item in busy)
+
+
+async def coach_schedule(
+    db: AsyncSession,
+    coach_id: int,
+    start: datetime,
+    end: datetime,
+    exclude_class_id: Optional[int] = None,
+    exclude_request_id: Optional[int] = None,
+) -> IntervalIndex[Busy]:
+    """Занятость тренера в [start, end): занятия его классов и принятые тренировки"""
+    query = (
+        select(ClassOccurrence.id, Class.name, ClassOccurrence.starts_at, ClassOccurrence.ends_at)
+        .join(Class, Class.id == ClassOccurrence.class_id)
+        .where(
+            ClassOccurrence.coach_id == coach_id,
+            ClassOccurrence.status == OccurrenceStatus.scheduled,
+            ClassOccurrence.starts_at > start - MAX_SESSION_DURATION,
+            ClassOccurrence.starts_at < end,
+            ClassOccurrence.ends_at > start,
+        )
+    )
+    if exclude_class_id is not None:
+        query = query.where(ClassOccurrence.class_id != exclude_class_id)
+    busy = [Busy("class", *row) for row in (await db.execute(query)).all()]
+    busy += await _accepted_trainings(db, IndividualTrainingRequest.coach_id == coach_id, start, end, exclude_request_id)
+    return IntervalIndex((item.starts_at, item.ends_at, item) for item in busy)
+
+
+def check_conflicts(schedule: IntervalIndex[Busy], intervals: Iterable[Tuple[datetime, datetime]]) -> None:
+    """ScheduleConflict, если хотя бы один из интервалов пересекается с занятостью"""
+    conflicts = {}
+    for starts_at, ends_at in intervals:
+        for busy in schedule.overlapping(starts_at, ends_at):
+            conflicts[(busy.kind, busy.id)] = busy
+    if conflicts:
+        raise ScheduleConflict(sorted(conflicts.values(), key=lambda busy: busy.starts_at))
+
+
+def bounds(intervals: List[Tuple[datetime, datetime]]) -> Tuple[datetime, datetime]:
+    """Общий период интервалов - окно загрузки занятости"""
+    return min(start for start, _ in intervals), max(end for _, end in intervals)
@@ -1,33 +1,254 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import Row, case, select, func, update, delete, tuple_
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
-from datetime import datetime
-from app.bookings.models import Booking, IndividualTrainingRequest, IndividualTrainingStatus
-from app.bookings.schemas import BookingCreate, BookingUpdate, IndividualTrainingRequestCreate, IndividualTrainingRequestUpdate
-from app.classes.models import Class
+from typing import List, Optional, Tuple
+from collections import Counter
+from datetime import date, datetime, time, timedelta
+from app.bookings.models import Booking, BookingStatus, CoachWorkingHours, IndividualTrainingRequest, IndividualTrainingStatus, SEAT_STATUSES
+from app.bookings.conflicts import athlete_schedule, bounds, check_conflicts, coach_schedule, request_interval
+from app.bookings.schemas import BookingCreate, BookingSeriesCreate, BookingUpdate, IndividualTrainingRequestCreate, IndividualTrainingRequestUpdate, WorkingHoursBase
+from app.classes.models import Class, ClassOccurrence, ClassStatus, OccurrenceStatus
+from app.classes.schedule import WEEKDAYS, expand, is_date_only, local_now, to_local
+from app.config import settings
+from app.core.intervals import subtract
+from app.classes import crud as class_crud
+from app.common.pagination import Page, PageParams, paginate
+from app.core.writes import hydrate, insert_many_returning, insert_returning, update_returning
+from app.core.fields import FieldSet, select_options
+from app.jobs.crud import enqueue, enqueue_many
+from app.progress import crud as progress_crud
 
-async def create_booking(db: AsyncSession, booking_data: BookingCreate, booked_by_parent_id: Optional[int]) -> Booking:
-    """Создать новое бронирование"""
-    db_booking = Booking(
-        **booking_data.model_dump(),
-        booked_by_parent_id=booked_by_parent_id
-    )
-    db.add(db_booking)
-    await db.commit()
-    await db.refresh(db_booking)
-    
-    # Load relationships for response serialization
+BOOKING_RELATIONS = ("athlete", "booked_by_parent", "class_obj.coach")
+TRAINING_REQUEST_RELATIONS = ("athlete", "coach", "requested_by_parent")
+
+class SessionNotFound(ValueError):
+    """У класса нет запланированного занятия в это время"""
+
+class SessionFull(ValueError):
+    """На занятии не осталось мест"""
+
+    def __init__(self, message: str, occurrence_id: Optional[int] = None):
+        super().__init__(message)
+        self.occurrence_id = occurrence_id
+
+async def _take_seat(db: AsyncSession, *where) -> Optional[int]:
+    # Проверка и увеличение счётчика - один UPDATE: параллельные бронирования
+    # ждут блокировки строки и перепроверяют seats_taken < capacity после неё
     result = await db.execute(
-        select(Booking)
-        .where(Booking.id == db_booking.id)
-        .options(
-            selectinload(Booking.athlete),
-            selectinload(Booking.booked_by_parent),
-            selectinload(Booking.class_obj).selectinload(Class.coach)
+        update(ClassOccurrence)
+        .where(
+            *where,
+            ClassOccurrence.status == OccurrenceStatus.scheduled,
+            ClassOccurrence.seats_taken < ClassOccurrence.capacity,
         )
+        .values(seats_taken=ClassOccurrence.seats_taken + 1)
+        .returning(ClassOccurrence.id)
+        .execution_options(synchronize_session=False)
     )
-    return result.scalar_one()
+    return result.scalar_one_or_none()
+
+async def get_scheduled_occurrence(
+    db: AsyncSession,
+    class_id: int,
+    class_date: datetime,
+    occurrence_id: Optional[int] = None,
+) -> ClassOccurrence:
+    """Запланированное занятие класса; SessionNotFound, если его нет в расписании.
+
+    По occurrence_id, иначе по времени начала class_date. Если передана
+    только дата (так бронирует приложение), берётся занятие класса в этот день.
+    """
+    query = select(ClassOccurrence).where(
+        ClassOccurrence.class_id == class_id,
+        ClassOccurrence.status == OccurrenceStatus.scheduled,
+    )
+    if occurrence_id is not None:
+        query = query.where(ClassOccurrence.id == occurrence_id)
+    elif is_date_only(class_date):
+        query = query.where(
+            ClassOccurrence.starts_at >= class_date,
+            ClassOccurrence.starts_at < class_date + timedelta(days=1),
+        )
+    else:
+        query = query.where(ClassOccurrence.starts_at == class_date)
+    occurrences = (await db.execute(query.order_by(ClassOccurrence.starts_at).limit(2))).scalars().all()
+    if not occurrences:
+        raise SessionNotFound("No scheduled session of this class at the given class_date")
+    if len(occurrences) > 1:
+        raise SessionNotFound("The class has several sessions on this day: pass class_date with time or occurrence_id")
+    return occurrences[0]
+
+async def take_seat(db: AsyncSession, occurrence_id: int) -> None:
+    """Занять место на занятии; SessionFull, если мест нет"""
+    if await _take_seat(db, ClassOccurrence.id == occurrence_id) is None:
+        raise SessionFull("No seats left for this session", occurrence_id)
+
+async def release_seat(db: AsyncSession, occurrence_id: int) -> None:
+    """Освободить место на занятии и отдать его первому в листе ожидания"""
+    await db.execute(
+        update(ClassOccurrence)
+        .where(ClassOccurrence.id == occurrence_id, ClassOccurrence.seats_taken > 0)
+        .values(seats_taken=ClassOccurrence.seats_taken - 1)
+        .execution_options(synchronize_session=False)
+    )
+    await promote_waitlist(db, occurrence_id)
+
+async def promote_waitlist(db: AsyncSession, occurrence_id: int) -> Optional[int]:
+    """Перевести первого ожидающего в pending, если на занятии есть место.
+
+    Выполняется в транзакции, освободившей место; уведомление уходит задачей
+    после COMMIT. Возвращает id переведённого бронирования.
+    """
+    result = await db.execute(
+        select(Booking.id)
+        .where(Booking.occurrence_id == occurrence_id, Booking.status == BookingStatus.waitlisted)
+        .order_by(Booking.waitlisted_at, Booking.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    booking_id = result.scalar_one_or_none()
+    if booking_id is None:
+        return None
+    if await _take_seat(db, ClassOccurrence.id == occurrence_id) is None:
+        # Вместимость уменьшили или занятие отменено - очередь ждёт дальше
+        return None
+
+    await db.execute(
+        update(Booking)
+        .where(Booking.id == booking_id)
+        .values(status=BookingStatus.pending, updated_at=datetime.utcnow())
+    )
+    await enqueue(db, "notifications.waitlist_promoted", {"booking_id": booking_id}, key=f"waitlist-promoted:{booking_id}")
+    return booking_id
+
+async def get_waitlist_position(db: AsyncSession, booking: Booking) -> Tuple[int, int]:
+    """Позиция бронирования в листе ожидания и длина очереди.
+
+    Оба числа - подсчёт по индексу ix_bookings_occurrence_id_waitlist:
+    позиция не хранится, поэтому выход из очереди не перенумеровывает строки.
+    """
+    waitlisted = (Booking.occurrence_id == booking.occurrence_id) & (Booking.status == BookingStatus.waitlisted)
+    result = await db.execute(
+        select(
+            func.count().filter(
+                tuple_(Booking.waitlisted_at, Booking.id) < tuple_(booking.waitlisted_at, booking.id)
+            ),
+            func.count(),
+        ).where(waitlisted)
+    )
+    ahead, size = result.one()
+    return ahead + 1, size
+
+async def _sync_seat(db: AsyncSession, db_booking: Booking, new_status: BookingStatus) -> None:
+    """Обновить счётчик мест при смене статуса бронирования"""
+    if db_booking.occurrence_id is None:
+        return
+    held = db_booking.status in SEAT_STATUSES
+    holds = new_status in SEAT_STATUSES
+    if held and not holds:
+        await release_seat(db, db_booking.occurrence_id)
+    elif holds and not held:
+        if await _take_seat(db, ClassOccurrence.id == db_booking.occurrence_id) is None:
+            raise SessionFull("No seats left for this session")
+
+async def create_booking(db: AsyncSession, booking_data: BookingCreate, booked_by_parent_id: Optional[int]) -> Booking:
+    """Создать новое бронирование, заняв место на занятии.
+
+    Если мест нет и join_waitlist - бронирование создаётся в листе ожидания.
+    """
+    occurrence = await get_scheduled_occurrence(db, booking_data.class_id, to_local(booking_data.class_date), booking_data.occurrence_id)
+    interval = (occurrence.starts_at, occurrence.ends_at)
+    check_conflicts(await athlete_schedule(db, booking_data.athlete_id, *interval), [interval])
+
+    values = {}
+    try:
+        await take_seat(db, occurrence.id)
+    except SessionFull:
+        if not booking_data.join_waitlist:
+            raise
+        values = {"status": BookingStatus.waitlisted, "waitlisted_at": datetime.utcnow()}
+    db_booking = await insert_returning(
+        db,
+        Booking,
+        {
+            **booking_data.model_dump(exclude={"join_waitlist", "occurrence_id"}),
+            **values,
+            "class_date": occurrence.starts_at,
+            "occurrence_id": occurrence.id,
+            "booked_by_parent_id": booked_by_parent_id,
+        },
+        load=BOOKING_RELATIONS,
+    )
+    await db.flush()
+    return db_booking
+
+async def create_booking_series(
+    db: AsyncSession,
+    series_data: BookingSeriesCreate,
+    class_obj: Class,
+    booked_by_parent_id: Optional[int],
+) -> List[Booking]:
+    """Забронировать все будущие занятия класса с date_from по date_to.
+
+    Места на всех занятиях занимаются одним условным UPDATE, бронирования
+    вставляются одним многострочным INSERT. Если на части занятий мест нет:
+    с join_waitlist они попадают в лист ожидания, иначе SessionFull и
+    откат всей серии.
+    """
+    await class_crud.ensure_occurrences(db, class_obj, series_data.date_to)
+
+    in_range = (
+        ClassOccurrence.class_id == class_obj.id,
+        ClassOccurrence.starts_at >= max(datetime.combine(series_data.date_from, time.min), local_now()),
+        ClassOccurrence.starts_at < datetime.combine(series_data.date_to + timedelta(days=1), time.min),
+        ClassOccurrence.status == OccurrenceStatus.scheduled,
+    )
+    sessions = (await db.execute(
+        select(ClassOccurrence.id, ClassOccurrence.starts_at, ClassOccurrence.ends_at)
+        .where(*in_range)
+        .order_by(ClassOccurrence.starts_at)
+    )).all()
+    if not sessions:
+        raise SessionNotFound("No scheduled sessions of this class in the given date range")
+    intervals = [(starts_at, ends_at) for _, starts_at, ends_at in sessions]
+    check_conflicts(await athlete_schedule(db, series_data.athlete_id, *bounds(intervals)), intervals)
+
+    taken = await db.execute(
+        update(ClassOccurrence)
+        .where(*in_range, ClassOccurrence.seats_taken < ClassOccurrence.capacity)
+        .values(seats_taken=ClassOccurrence.seats_taken + 1)
+        .returning(ClassOccurrence.id)
+        .execution_options(synchronize_session=False)
+    )
+    taken_ids = set(taken.scalars().all())
+
+    full = [starts_at for occurrence_id, starts_at, _ in sessions if occurrence_id not in taken_ids]
+    if full and not series_data.join_waitlist:
+        raise SessionFull("No seats left for sessions: " + ", ".join(starts_at.strftime("%d.%m.%Y %H:%M") for starts_at in full))
+
+    now = datetime.utcnow()
+    base = {
+        "athlete_id": series_data.athlete_id,
+        "class_id": class_obj.id,
+        "booked_by_parent_id": booked_by_parent_id,
+        "booking_type": series_data.booking_type,
+        "notes": series_data.notes,
+        "booking_date": now,
+        "created_at": now,
+        "updated_at": now,
+    }
+    rows = [
+        {
+            **base,
+            "occurrence_id": occurrence_id,
+            "class_date": starts_at,
+            "status": BookingStatus.pending if occurrence_id in taken_ids else BookingStatus.waitlisted,
+            "waitlisted_at": None if occurrence_id in taken_ids else now,
+        }
+        for occurrence_id, starts_at, _ in sessions
+    ]
+    bookings = await insert_many_returning(db, Booking, rows, load=BOOKING_RELATIONS)
+    return sorted(bookings, key=lambda booking: booking.class_date)
 
 async def get_booking(db: AsyncSession, booking_id: int) -> Optional[Booking]:
     """Получить бронирование по ID"""
@@ -42,46 +263,106 @@ async def get_booking(db: AsyncSession, booking_id: int) -> Optional[Booking]:
     )
     return result.scalar_one_or_none()
 
-async def get_bookings_by_parent(db: AsyncSession, parent_id: int) -> List[Booking]:
+async def get_bookings_by_parent(db: AsyncSession, parent_id: int, page: Optional[PageParams] = None, fields: Optional[FieldSet] = None) -> Page[Booking]:
     """Получить бронирования родителя"""
-    result = await db.execute(
+    # booked_by_parent - сам родитель, он уже в identity map сессии
+    query = (
         select(Booking)
         .where(Booking.booked_by_parent_id == parent_id)
-        .options(
-            selectinload(Booking.athlete),
-            selectinload(Booking.class_obj).selectinload(Class.coach)
-        )
-        .order_by(Booking.class_date.desc())
+        .options(*select_options(Booking, ("athlete", "class_obj.coach"), fields, keep=(Booking.class_date,)))
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(Booking.class_date, True), (Booking.id, True)], page)
 
-async def get_bookings_by_athlete(db: AsyncSession, athlete_id: int) -> List[Booking]:
+async def get_bookings_by_athlete(db: AsyncSession, athlete_id: int, page: Optional[PageParams] = None, fields: Optional[FieldSet] = None) -> Page[Booking]:
     """Получить бронирования спортсмена"""
-    result = await db.execute(
+    query = (
         select(Booking)
         .where(Booking.athlete_id == athlete_id)
-        .options(
-            selectinload(Booking.booked_by_parent),
-            selectinload(Booking.class_obj).selectinload(Class.coach)
-        )
-        .order_by(Booking.class_date.desc())
+        .options(*select_options(Booking, ("booked_by_parent", "class_obj.coach"), fields, keep=(Booking.class_date,)))
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(Booking.class_date, True), (Booking.id, True)], page)
 
-async def get_bookings_by_coach(db: AsyncSession, coach_id: int) -> List[Booking]:
-    """Получить бронирования для занятий тренера"""
-    result = await db.execute(
+def _coach_bookings_filter(
+    coach_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    statuses: Optional[List[BookingStatus]] = None,
+    class_id: Optional[int] = None,
+) -> list:
+    # Диапазон по class_date - по индексу ix_bookings_class_id_class_date для каждого класса тренера
+    where = [Class.coach_id == coach_id]
+    if date_from:
+        where.append(Booking.class_date >= datetime.combine(date_from, time.min))
+    if date_to:
+        where.append(Booking.class_date < datetime.combine(date_to + timedelta(days=1), time.min))
+    if statuses:
+        where.append(Booking.status.in_(statuses))
+    if class_id:
+        where.append(Booking.class_id == class_id)
+    return where
+
+async def get_bookings_by_coach(
+    db: AsyncSession,
+    coach_id: int,
+    page: Optional[PageParams] = None,
+    fields: Optional[FieldSet] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    statuses: Optional[List[BookingStatus]] = None,
+    class_id: Optional[int] = None,
+) -> Page[Booking]:
+    """Получить бронирования для занятий тренера (с фильтрами - для панели тренера)"""
+    query = (
         select(Booking)
         .join(Class, Booking.class_id == Class.id)
-        .where(Class.coach_id == coach_id)
-        .options(
-            selectinload(Booking.athlete),
-            selectinload(Booking.booked_by_parent),
-            selectinload(Booking.class_obj).selectinload(Class.coach)
+        .where(*_coach_bookings_filter(coach_id, date_from, date_to, statuses, class_id))
+        .options(*select_options(Booking, BOOKING_RELATIONS, fields, keep=(Booking.class_date,)))
+    )
+    return await paginate(db, query, [(Booking.class_date, True), (Booking.id, True)], page)
+
+async def get_coach_booking_summary(
+    db: AsyncSession,
+    coach_id: int,
+    date_from: date,
+    date_to: date,
+    class_id: Optional[int] = None,
+) -> List[dict]:
+    """Сводка бронирований тренера по классам и дням: число по статусам и оплаты.
+
+    Один GROUP BY (класс, день, статус); строки сворачиваются в записи
+    класс+день в Python.
+    """
+    day = func.date(Booking.class_date)
+    result = await db.execute(
+        select(
+            Class.id,
+            Class.name,
+            day,
+            Booking.status,
+            func.count(),
+            func.count().filter(Booking.is_paid.is_(True)),
+            func.coalesce(func.sum(Booking.payment_amount).filter(Booking.is_paid.is_(True)), 0),
         )
-        .order_by(Booking.class_date.desc())
+        .join(Class, Booking.class_id == Class.id)
+        .where(*_coach_bookings_filter(coach_id, date_from, date_to, class_id=class_id))
+        .group_by(Class.id, Class.name, day, Booking.status)
     )
-    return result.scalars().all()
+    summary = {}
+    for class_id_, class_name, class_day, booking_status, count, paid_count, paid_amount in result.all():
+        entry = summary.setdefault((class_day, class_id_), {
+            "class_id": class_id_,
+            "class_name": class_name,
+            "day": class_day,
+            "counts": {},
+            "total": 0,
+            "paid_count": 0,
+            "paid_amount": 0,
+        })
+        entry["counts"][booking_status] = count
+        entry["total"] += count
+        entry["paid_count"] += paid_count
+        entry["paid_amount"] += paid_amount
+    return [summary[key] for key in sorted(summary, key=lambda key: (str(key[0]), key[1]))]
 
 async def cancel_booking(db: AsyncSession, booking_id: int, cancellation_reason: str) -> Optional[Booking]:
     """Отменить бронирование"""
@@ -91,12 +372,12 @@ async def cancel_booking(db: AsyncSession, booking_id: int, cancellation_reason:
     if not db_booking:
         return None
     
+    await _sync_seat(db, db_booking, BookingStatus.cancelled)
     db_booking.status = "cancelled"
     db_booking.cancellation_reason = cancellation_reason
     db_booking.updated_at = datetime.utcnow()
     
-    await db.commit()
-    await db.refresh(db_booking)
+    await db.flush()
     return db_booking
 
 async def update_booking(db: AsyncSession, booking_id: int, booking_update: BookingUpdate) -> Optional[Booking]:
@@ -108,38 +389,35 @@ async def update_booking(db: AsyncSession, booking_id: int, booking_update: Book
         return None
     
     update_data = booking_update.model_dump(exclude_unset=True)
+    if update_data.get("status") is not None:
+        await _sync_seat(db, db_booking, update_data["status"])
     for field, value in update_data.items():
         setattr(db_booking, field, value)
     
-    await db.commit()
-    await db.refresh(db_booking)
+    await db.flush()
     return db_booking
 
 async def approve_booking(db: AsyncSession, booking_id: int) -> Optional[Booking]:
-    """Подтвердить бронирование"""
-    result = await db.execute(select(Booking).where(Booking.id == booking_id))
-    db_booking = result.scalar_one_or_none()
-    
+    """Подтвердить ожидающее бронирование; None, если его нет или оно не в pending.
+
+    Место за pending уже занято, поэтому счётчик не меняется. Другие статусы
+    (отменённые, завершённые, лист ожидания) места не держат и подтверждаться
+    не могут - условие статуса в том же UPDATE.
+    """
+    db_booking = await update_returning(
+        db,
+        Booking,
+        booking_id,
+        {"status": BookingStatus.confirmed, "updated_at": datetime.utcnow()},
+        load=BOOKING_RELATIONS,
+        where=(Booking.status == BookingStatus.pending,),
+    )
     if not db_booking:
         return None
     
-    db_booking.status = "confirmed"
-    db_booking.updated_at = datetime.utcnow()
-    
-    await db.commit()
-    await db.refresh(db_booking)
-    
-    # Load relationships for response serialization
-    result = await db.execute(
-        select(Booking)
-        .where(Booking.id == booking_id)
-        .options(
-            selectinload(Booking.athlete),
-            selectinload(Booking.booked_by_parent),
-            selectinload(Booking.class_obj).selectinload(Class.coach)
-        )
-    )
-    return result.scalar_one()
+    await enqueue(db, "notifications.booking_status", {"booking_id": booking_id}, key=f"booking-status:{booking_id}:confirmed")
+    await db.flush()
+    return db_booking
 
 async def decline_booking(db: AsyncSession, booking_id: int, decline_reason: str) -> Optional[Booking]:
     """Отклонить бронирование"""
@@ -149,12 +427,13 @@ async def decline_booking(db: AsyncSession, booking_id: int, decline_reason: str
     if not db_booking:
         return None
     
+    await _sync_seat(db, db_booking, BookingStatus.cancelled)
     db_booking.status = "cancelled"
     db_booking.cancellation_reason = decline_reason
     db_booking.updated_at = datetime.utcnow()
     
-    await db.commit()
-    await db.refresh(db_booking)
+    await enqueue(db, "notifications.booking_status", {"booking_id": booking_id}, key=f"booking-status:{booking_id}:cancelled")
+    await db.flush()
     
     # Load relationships for response serialization
     result = await db.execute(
@@ -168,27 +447,144 @@ async def decline_booking(db: AsyncSession, booking_id: int, decline_reason: str
     )
     return result.scalar_one()
 
-async def create_individual_training_request(db: AsyncSession, request_data: IndividualTrainingRequestCreate, requested_by_parent_id: Optional[int]) -> IndividualTrainingRequest:
-    """Создать запрос на индивидуальную тренировку"""
-    db_request = IndividualTrainingRequest(
-        **request_data.model_dump(),
-        requested_by_parent_id=requested_by_parent_id
+async def get_bookings_for_review(db: AsyncSession, booking_ids: List[int]) -> List[Row]:
+    """id, статус, занятие и тренер класса для пачки бронирований одним запросом.
+
+    Строки бронирований блокируются до конца транзакции: статусы, по которым
+    роутер проверил пачку, не поменяются до массового UPDATE.
+    """
+    result = await db.execute(
+        select(Booking.id, Booking.status, Booking.occurrence_id, Class.coach_id)
+        .join(Class, Class.id == Booking.class_id)
+        .where(Booking.id.in_(booking_ids))
+        .with_for_update(of=Booking)
     )
-    db.add(db_request)
-    await db.commit()
-    await db.refresh(db_request)
-    
-    # Load relationships for response serialization
+    return result.all()
+
+async def _update_bookings(db: AsyncSession, booking_ids: List[int], values: dict, *where) -> List[Booking]:
     result = await db.execute(
-        select(IndividualTrainingRequest)
-        .where(IndividualTrainingRequest.id == db_request.id)
-        .options(
-            selectinload(IndividualTrainingRequest.athlete),
-            selectinload(IndividualTrainingRequest.coach),
-            selectinload(IndividualTrainingRequest.requested_by_parent)
+        update(Booking)
+        .where(Booking.id.in_(booking_ids), *where)
+        .values(**values, updated_at=datetime.utcnow())
+        .returning(Booking)
+    )
+    bookings = list(result.scalars().all())
+    await hydrate(db, bookings, BOOKING_RELATIONS)
+    return sorted(bookings, key=lambda booking: (booking.class_date, booking.id))
+
+async def approve_bookings(db: AsyncSession, booking_ids: List[int]) -> List[Booking]:
+    """Подтвердить пачку бронирований одним UPDATE, уведомления - одним INSERT в очередь"""
+    bookings = await _update_bookings(db, booking_ids, {"status": BookingStatus.confirmed}, Booking.status == BookingStatus.pending)
+    await enqueue_many(db, "notifications.booking_status", [
+        ({"booking_id": booking.id}, f"booking-status:{booking.id}:confirmed") for booking in bookings
+    ])
+    return bookings
+
+async def decline_bookings(db: AsyncSession, reviewed: List[Row], decline_reason: str) -> List[Booking]:
+    """Отклонить пачку бронирований (строки из get_bookings_for_review).
+
+    Места освобождаются одним UPDATE с CASE по занятиям, лист ожидания
+    продвигается только на занятиях, где он есть.
+    """
+    bookings = await _update_bookings(
+        db,
+        [row.id for row in reviewed],
+        {"status": BookingStatus.cancelled, "cancellation_reason": decline_reason},
+    )
+
+    freed = Counter(row.occurrence_id for row in reviewed if row.occurrence_id is not None and row.status in SEAT_STATUSES)
+    if freed:
+        released = case(freed, value=ClassOccurrence.id)
+        await db.execute(
+            update(ClassOccurrence)
+            .where(ClassOccurrence.id.in_(freed), ClassOccurrence.seats_taken >= released)
+            .values(seats_taken=ClassOccurrence.seats_taken - released)
+            .execution_options(synchronize_session=False)
+        )
+        with_waitlist = await db.execute(
+            select(Booking.occurrence_id)
+            .where(Booking.occurrence_id.in_(freed), Booking.status == BookingStatus.waitlisted)
+            .distinct()
         )
+        for occurrence_id in with_waitlist.scalars().all():
+            for _ in range(freed[occurrence_id]):
+                if await promote_waitlist(db, occurrence_id) is None:
+                    break
+
+    await enqueue_many(db, "notifications.booking_status", [
+        ({"booking_id": booking.id}, f"booking-status:{booking.id}:cancelled") for booking in bookings
+    ])
+    return bookings
+
+# Прошедшие бронирования закрывает периодическая задача bookings.sweep (app/bookings/jobs.py)
+BOOKING_EXPIRED_REASON = "Expired: not confirmed before the class"
+BOOKING_SESSION_CANCELLED_REASON = "Cancelled: the class session was cancelled"
+
+def _open_before(statuses, cutoff: datetime, limit: int):
+    # Подзапрос пачки по ix_bookings_class_date_open; SKIP LOCKED - строки,
+    # которые сейчас меняет пользователь или тренер, достанутся следующему запуску
+    return (
+        select(Booking.id)
+        .where(Booking.status.in_(statuses), Booking.class_date < cutoff)
+        .order_by(Booking.class_date, Booking.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
     )
-    return result.scalar_one()
+
+async def complete_past_bookings(db: AsyncSession, cutoff: datetime, limit: int) -> int:
+    """Перевести до limit подтверждённых бронирований с class_date < cutoff в completed.
+
+    Бронирования на отменённые занятия не засчитываются, а отменяются тем же
+    UPDATE. Посещения прибавляются к прогрессу спортсменов по строкам из
+    RETURNING, поэтому каждое бронирование засчитывается ровно один раз.
+    Возвращает число закрытых бронирований.
+    """
+    session_cancelled = (
+        select(ClassOccurrence.id)
+        .where(ClassOccurrence.id == Booking.occurrence_id, ClassOccurrence.status == OccurrenceStatus.cancelled)
+        .exists()
+    )
+    result = await db.execute(
+        update(Booking)
+        .where(Booking.id.in_(_open_before((BookingStatus.confirmed,), cutoff, limit)), Booking.status == BookingStatus.confirmed)
+        .values(
+            status=case((session_cancelled, BookingStatus.cancelled), else_=BookingStatus.completed),
+            cancellation_reason=case((session_cancelled, BOOKING_SESSION_CANCELLED_REASON), else_=Booking.cancellation_reason),
+            updated_at=datetime.utcnow(),
+        )
+        .returning(Booking.athlete_id, Booking.status)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+    attended = Counter(athlete_id for athlete_id, status in rows if status == BookingStatus.completed)
+    await progress_crud.add_classes_attended(db, attended)
+    return len(rows)
+
+async def expire_stale_bookings(db: AsyncSession, cutoff: datetime, limit: int) -> int:
+    """Отменить до limit так и не подтверждённых (pending, waitlisted) бронирований с class_date < cutoff.
+
+    Места прошедших занятий не освобождаются: занятие уже состоялось.
+    """
+    stale = (BookingStatus.pending, BookingStatus.waitlisted)
+    result = await db.execute(
+        update(Booking)
+        .where(Booking.id.in_(_open_before(stale, cutoff, limit)), Booking.status.in_(stale))
+        .values(status=BookingStatus.cancelled, cancellation_reason=BOOKING_EXPIRED_REASON, updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+async def create_individual_training_request(db: AsyncSession, request_data: IndividualTrainingRequestCreate, requested_by_parent_id: Optional[int]) -> IndividualTrainingRequest:
+    """Создать запрос на индивидуальную тренировку"""
+    db_request = await insert_returning(
+        db,
+        IndividualTrainingRequest,
+        {**request_data.model_dump(), "requested_by_parent_id": requested_by_parent_id},
+        load=TRAINING_REQUEST_RELATIONS,
+    )
+    await db.flush()
+    return db_request
 
 async def get_individual_training_request(db: AsyncSession, request_id: int) -> Optional[IndividualTrainingRequest]:
     """Получить запрос на индивидуальную тренировку по ID"""
@@ -203,31 +599,29 @@ async def get_individual_training_request(db: AsyncSession, request_id: int) ->
     )
     return result.scalar_one_or_none()
 
-async def get_individual_training_requests_by_athlete(db: AsyncSession, athlete_id: int) -> List[IndividualTrainingRequest]:
+async def get_individual_training_requests_by_athlete(db: AsyncSession, athlete_id: int, page: Optional[PageParams] = None) -> Page[IndividualTrainingRequest]:
     """Получить запросы на индивидуальные тренировки спортсмена"""
-    result = await db.execute(
+    query = (
         select(IndividualTrainingRequest)
         .where(IndividualTrainingRequest.athlete_id == athlete_id)
         .options(
             selectinload(IndividualTrainingRequest.coach),
             selectinload(IndividualTrainingRequest.requested_by_parent)
         )
-        .order_by(IndividualTrainingRequest.requested_date.desc())
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(IndividualTrainingRequest.requested_date, True), (IndividualTrainingRequest.id, True)], page)
 
-async def get_individual_training_requests_by_coach(db: AsyncSession, coach_id: int) -> List[IndividualTrainingRequest]:
+async def get_individual_training_requests_by_coach(db: AsyncSession, coach_id: int, page: Optional[PageParams] = None) -> Page[IndividualTrainingRequest]:
     """Получить запросы на индивидуальные тренировки для тренера"""
-    result = await db.execute(
+    query = (
         select(IndividualTrainingRequest)
         .where(IndividualTrainingRequest.coach_id == coach_id)
         .options(
             selectinload(IndividualTrainingRequest.athlete),
             selectinload(IndividualTrainingRequest.requested_by_parent)
         )
-        .order_by(IndividualTrainingRequest.requested_date.desc())
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(IndividualTrainingRequest.requested_date, True), (IndividualTrainingRequest.id, True)], page)
 
 async def get_pending_individual_training_requests_by_coach(db: AsyncSession, coach_id: int) -> List[IndividualTrainingRequest]:
     """Получить ожидающие запросы на индивидуальные тренировки для тренера (максимум 10)"""
@@ -270,11 +664,16 @@ async def accept_individual_training_request(db: AsyncSession, request_id: int,
     for field, value in update_dict.items():
         setattr(db_request, field, value)
     
+    # Время тренировки не должно пересекаться с занятиями тренера и спортсмена
+    interval = request_interval(db_request)
+    if interval:
+        check_conflicts(await coach_schedule(db, db_request.coach_id, *interval, exclude_request_id=request_id), [interval])
+        check_conflicts(await athlete_schedule(db, db_request.athlete_id, *interval, exclude_request_id=request_id), [interval])
+    
     db_request.status = IndividualTrainingStatus.accepted
     db_request.updated_at = datetime.utcnow()
     
-    await db.commit()
-    await db.refresh(db_request)
+    await db.flush()
     
     # Load relationships for response serialization
     result = await db.execute(
@@ -300,8 +699,7 @@ async def decline_individual_training_request(db: AsyncSession, request_id: int,
     db_request.decline_reason = decline_reason
     db_request.updated_at = datetime.utcnow()
     
-    await db.commit()
-    await db.refresh(db_request)
+    await db.flush()
     
     # Load relationships for response serialization
     result = await db.execute(
@@ -326,8 +724,7 @@ async def complete_individual_training_request(db: AsyncSession, request_id: int
     db_request.status = IndividualTrainingStatus.completed
     db_request.updated_at = datetime.utcnow()
     
-    await db.commit()
-    await db.refresh(db_request)
+    await db.flush()
     
     # Load relationships for response serialization
     result = await db.execute(
@@ -340,3 +737,88 @@ async def complete_individual_training_request(db: AsyncSession, request_id: int
         )
     )
     return result.scalar_one()
+
+# Рабочее время тренера и свободные окна для индивидуальных тренировок
+async def get_working_hours(db: AsyncSession, coach_id: int) -> List[CoachWorkingHours]:
+    """Рабочее время тренера по дням недели"""
+    result = await db.execute(
+        select(CoachWorkingHours)
+        .where(CoachWorkingHours.coach_id == coach_id)
+        .order_by(CoachWorkingHours.id)
+    )
+    return sorted(result.scalars().all(), key=lambda hours: (WEEKDAYS[hours.day_of_week], hours.start_time))
+
+async def set_working_hours(db: AsyncSession, coach_id: int, hours: List[WorkingHoursBase]) -> List[CoachWorkingHours]:
+    """Заменить рабочее время тренера: удаление и один многострочный INSERT"""
+    await db.execute(delete(CoachWorkingHours).where(CoachWorkingHours.coach_id == coach_id))
+    now = datetime.utcnow()
+    rows = [
+        {**item.model_dump(), "coach_id": coach_id, "created_at": now, "updated_at": now}
+        for item in hours
+    ]
+    created = await insert_many_returning(db, CoachWorkingHours, rows)
+    return sorted(created, key=lambda item: (WEEKDAYS[item.day_of_week], item.start_time))
+
+def _default_working_hours() -> List[Tuple[int, time, time]]:
+    start, end = (time.fromisoformat(value.strip()) for value in settings.COACH_DEFAULT_WORKING_HOURS.split("-"))
+    return [(weekday, start, end) for weekday in range(7)]
+
+def _working_windows(hours: List[Tuple[int, time, time]], date_from: date, date_to: date) -> List[Tuple[datetime, datetime]]:
+    by_weekday = {}
+    for weekday, start, end in hours:
+        by_weekday.setdefault(weekday, []).append((start, end))
+    windows = []
+    day = date_from
+    while day <= date_to:
+        for start, end in by_weekday.get(day.weekday(), ()):
+            windows.append((datetime.combine(day, start), datetime.combine(day, end)))
+        day += timedelta(days=1)
+    return windows
+
+async def _planned_sessions(db: AsyncSession, coach_id: int, date_from: date, date_to: date) -> List[Tuple[datetime, datetime]]:
+    """Занятия классов тренера за горизонтом: в class_occurrences их ещё нет,
+    поэтому они разворачиваются из расписания в памяти, без записи в базу"""
+    result = await db.execute(
+        select(Class).where(
+            Class.coach_id == coach_id,
+            Class.status == ClassStatus.active,
+            (Class.occurrences_until.is_(None)) | (Class.occurrences_until < date_to),
+        )
+    )
+    sessions = []
+    for class_obj in result.scalars().all():
+        start = date_from
+        if class_obj.occurrences_until is not None:
+            start = max(start, class_obj.occurrences_until + timedelta(days=1))
+        sessions.extend(expand(class_obj.day_of_week, class_obj.start_time, class_obj.end_time, start, date_to))
+    return sessions
+
+async def get_free_slots(
+    db: AsyncSession,
+    coach_id: int,
+    date_from: date,
+    date_to: date,
+    duration: timedelta,
+) -> List[Tuple[datetime, datetime]]:
+    """Свободные окна тренера не короче duration с date_from по date_to.
+
+    Рабочее время за вычетом занятий его классов и принятых индивидуальных
+    тренировок. Занятость загружается одним запросом на источник, вычитание -
+    один проход по отсортированным интервалам, поэтому месяц считается за
+    миллисекунды. Прошедшее время не предлагается.
+    """
+    rows = await get_working_hours(db, coach_id)
+    hours = [(WEEKDAYS[row.day_of_week], row.start_time, row.end_time) for row in rows] or _default_working_hours()
+
+    now = local_now()
+    windows = [
+        (max(start, now), end)
+        for start, end in _working_windows(hours, date_from, date_to)
+        if end > now
+    ]
+    if not windows:
+        return []
+
+    schedule = await coach_schedule(db, coach_id, *bounds(windows))
+    busy = schedule.spans() + await _planned_sessions(db, coach_id, date_from, date_to)
+    return [(start, end) for start, end in subtract(windows, busy) if end - start >= duration]
@@ -0,0 +1,51 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.cache import CACHE_TAGS_KEY, invalidate
+from app.database import AsyncSessionLocal
+from app.jobs.crud import JOBS_ENQUEUED_KEY
+from app.jobs.registry import job
+from app.bookings import crud
+from app.classes.schedule import local_now
+
+logger = logging.getLogger(__name__)
+
+
+async def _in_batches(db: AsyncSession, sweep_batch: Callable[[AsyncSession, datetime, int], Awaitable[int]], cutoff: datetime) -> int:
+    # Каждая пачка - своя сессия и транзакция: блокировки держатся на время одного
+    # UPDATE, а сессия задачи, как у всех обработчиков, фиксируется только вместе
+    # с complete_job. Сброс кэша и пробуждение воркера передаются ей
+    swept = 0
+    for _ in range(settings.BOOKING_SWEEP_MAX_BATCHES):
+        async with AsyncSessionLocal() as batch:
+            count = await sweep_batch(batch, cutoff, settings.BOOKING_SWEEP_BATCH_SIZE)
+            await batch.commit()
+        tags = batch.info.get(CACHE_TAGS_KEY)
+        if tags:
+            invalidate(db, *tags)
+        if batch.info.get(JOBS_ENQUEUED_KEY):
+            db.info[JOBS_ENQUEUED_KEY] = True
+        swept += count
+        if count < settings.BOOKING_SWEEP_BATCH_SIZE:
+            break
+    return swept
+
+
+@job("bookings.sweep", every=settings.BOOKING_SWEEP_INTERVAL_SECONDS)
+async def sweep(db: AsyncSession) -> None:
+    """Закрыть прошедшие бронирования: confirmed -> completed (на отменённые
+    занятия - cancelled), pending и waitlisted -> cancelled.
+
+    Пачки фиксируются каждая в своей сессии и не откатываются вместе с
+    задачей: после сбоя посередине зафиксированные остаются, а следующий
+    запуск продолжит с оставшихся строк.
+    """
+    cutoff = local_now() - timedelta(hours=settings.BOOKING_SWEEP_AFTER_HOURS)
+    completed = await _in_batches(db, crud.complete_past_bookings, cutoff)
+    expired = await _in_batches(db, crud.expire_stale_bookings, cutoff)
+    if completed or expired:
+        logger.info("Swept bookings: %s completed, %s expired", completed, expired)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum as SqlEnum, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Enum as SqlEnum, ForeignKey, DateTime, Boolean, Time, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 from enum import Enum
@@ -9,12 +9,16 @@ class BookingStatus(str, Enum):
     confirmed = "confirmed"
     cancelled = "cancelled"
     completed = "completed"
+    waitlisted = "waitlisted"  # в листе ожидания: места нет, ждёт освобождения
 
 class BookingType(str, Enum):
     regular = "regular"
     trial = "trial"
     makeup = "makeup"  # компенсационное занятие
 
+# Статусы, при которых бронирование занимает место на занятии
+SEAT_STATUSES = (BookingStatus.pending, BookingStatus.confirmed)
+
 class IndividualTrainingStatus(str, Enum):
     pending = "pending"
     accepted = "accepted"
@@ -23,10 +27,22 @@ class IndividualTrainingStatus(str, Enum):
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_athlete_id_class_date", "athlete_id", "class_date", "id"),
+        Index("ix_bookings_booked_by_parent_id_class_date", "booked_by_parent_id", "class_date", "id", postgresql_where=text("booked_by_parent_id IS NOT NULL")),
+        Index("ix_bookings_class_id_class_date", "class_id", "class_date", "id"),
+        Index("ix_bookings_occurrence_id_status", "occurrence_id", "status"),
+        # Очередь листа ожидания занятия: следующий и позиция - по этому индексу
+        Index("ix_bookings_occurrence_id_waitlist", "occurrence_id", "waitlisted_at", "id", postgresql_where=text("status = 'waitlisted'")),
+        # Незакрытые бронирования по дате: пачки периодической задачи bookings.sweep
+        Index("ix_bookings_class_date_open", "class_date", "id", postgresql_where=text("status IN ('pending', 'confirmed', 'waitlisted')")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     athlete_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     class_id = Column(Integer, ForeignKey("classes.id"), nullable=False)
+    # Занятие, место на котором держит бронирование; у старых записей может не быть
+    occurrence_id = Column(Integer, ForeignKey("class_occurrences.id"), nullable=True)
     booked_by_parent_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # nullable для взрослых спортсменов
     
     booking_type = Column(SqlEnum(BookingType), default=BookingType.regular)
@@ -34,6 +50,8 @@ class Booking(Base):
     
     # Booking details
     booking_date = Column(DateTime, default=datetime.utcnow)
+    # Место в очереди: позиция = число ожидающих раньше, строки не перенумеровываются
+    waitlisted_at = Column(DateTime, nullable=True)
     class_date = Column(DateTime, nullable=False)  # дата конкретного занятия
     
     # Payment info
@@ -54,6 +72,11 @@ class Booking(Base):
 
 class IndividualTrainingRequest(Base):
     __tablename__ = "individual_training_requests"
+    __table_args__ = (
+        Index("ix_individual_training_requests_athlete_id_requested_date", "athlete_id", "requested_date", "id"),
+        Index("ix_individual_training_requests_coach_id_requested_date", "coach_id", "requested_date", "id"),
+        Index("ix_individual_training_requests_coach_id_pending", "coach_id", "requested_date", postgresql_where=text("status = 'pending'")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     athlete_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -90,3 +113,19 @@ class IndividualTrainingRequest(Base):
     athlete = relationship("User", foreign_keys=[athlete_id])
     coach = relationship("User", foreign_keys=[coach_id])
     requested_by_parent = relationship("User", foreign_keys=[requested_by_parent_id])
+
+class CoachWorkingHours(Base):
+    """Рабочее время тренера для индивидуальных тренировок: окно на день недели"""
+    __tablename__ = "coach_working_hours"
+    __table_args__ = (
+        Index("ix_coach_working_hours_coach_id", "coach_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    coach_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    day_of_week = Column(String, nullable=False)  # "понедельник", "вторник", etc.
+    start_time = Column(Time, nullable=False)
+    end_time = Column(Time, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
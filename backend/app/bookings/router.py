@@ -1,25 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from datetime import date
-from app.deps import get_db, get_current_user
+from typing import List, Optional, Tuple
+from datetime import date, timedelta
+from app.config import settings
+from app.deps import get_db, get_read_db, get_current_user
 from app.users.models import User, UserRole
 from app.bookings import schemas, crud
-from app.bookings.models import IndividualTrainingStatus
+from app.bookings.conflicts import ScheduleConflict
+from app.bookings.models import BookingStatus, IndividualTrainingStatus
+from app.classes.models import Class
+from app.classes.schedule import local_today
+from app.core.responses import serialize
+from app.core.fields import FieldSet, prune, sparse_fields
+from app.common.pagination import PageParams, optional_page_params
 
 router = APIRouter()
 
-@router.post("/", response_model=schemas.BookingOut)
-async def create_booking(
-    booking_data: schemas.BookingCreate,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    """Создать бронирование (родители для детей или взрослые спортсмены для себя)"""
-    
+async def _authorize_booking(db: AsyncSession, current_user: User, class_id: int, athlete_id: int) -> Tuple[Class, Optional[int]]:
+    """Проверки перед бронированием: занятие, возраст спортсмена и права пользователя.
+
+    Возвращает занятие и booked_by_parent_id для новых бронирований.
+    """
     # Получить информацию о занятии для проверки возрастных ограничений
     from app.classes import crud as class_crud
-    class_obj = await class_crud.get_class(db, booking_data.class_id)
+    class_obj = await class_crud.get_class(db, class_id)
     if not class_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -28,7 +32,7 @@ async def create_booking(
     
     # Получить информацию о спортсмене для проверки возраста
     from app.users import crud as user_crud
-    athlete = await user_crud.get_user(db, booking_data.athlete_id)
+    athlete = await user_crud.get_user(db, athlete_id)
     if not athlete:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -62,10 +66,10 @@ async def create_booking(
     if has_parent_role:
         # Родители могут бронировать для своих детей
         # TODO: добавить проверку parent-athlete relationship
-        new_booking = await crud.create_booking(db, booking_data, current_user.id)
+        return class_obj, current_user.id
     elif has_athlete_role:
         # Спортсмены могут бронировать только для себя
-        if booking_data.athlete_id != current_user.id:
+        if athlete_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Athletes can only book for themselves"
@@ -84,31 +88,204 @@ async def create_booking(
             )
         
         # Для взрослых спортсменов: booked_by_parent_id = None (они бронируют сами)
-        new_booking = await crud.create_booking(db, booking_data, None)
+        return class_obj, None
     else:
         # Тренеры не могут создавать бронирования
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only parents and adult athletes can create bookings"
         )
+
+@router.post("/", response_model=schemas.BookingOut)
+async def create_booking(
+    booking_data: schemas.BookingCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Создать бронирование (родители для детей или взрослые спортсмены для себя)"""
+    _, booked_by_parent_id = await _authorize_booking(db, current_user, booking_data.class_id, booking_data.athlete_id)
     
+    try:
+        new_booking = await crud.create_booking(db, booking_data, booked_by_parent_id)
+    except (crud.SessionFull, ScheduleConflict) as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     return new_booking
 
+def _check_days_ahead(date_to: date) -> None:
+    """400, если дата дальше, чем можно бронировать: занятия за ней не создаются"""
+    if date_to > local_today() + timedelta(days=settings.BOOKING_MAX_DAYS_AHEAD):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"date_to must be within {settings.BOOKING_MAX_DAYS_AHEAD} days from today"
+        )
+
+@router.post("/series", response_model=List[schemas.BookingOut])
+async def create_booking_series(
+    series_data: schemas.BookingSeriesCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Забронировать все занятия класса за период одним запросом (например, на сезон)"""
+    if (series_data.date_to - series_data.date_from).days >= settings.BOOKING_SERIES_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Booking series is limited to {settings.BOOKING_SERIES_MAX_DAYS} days"
+        )
+    _check_days_ahead(series_data.date_to)
+    
+    class_obj, booked_by_parent_id = await _authorize_booking(db, current_user, series_data.class_id, series_data.athlete_id)
+    try:
+        bookings = await crud.create_booking_series(db, series_data, class_obj, booked_by_parent_id)
+    except (crud.SessionFull, ScheduleConflict) as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return serialize(List[schemas.BookingOut], bookings)
+
 @router.get("/my-bookings", response_model=List[schemas.BookingOut])
 async def get_my_bookings(
+    page: PageParams = Depends(optional_page_params),
+    fields: Optional[FieldSet] = Depends(sparse_fields(schemas.BookingOut)),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Получить мои бронирования"""
+    """Получить мои бронирования (fields= - только нужные поля)"""
     user_roles = [ur.role for ur in current_user.user_roles]
     if UserRole.parent in user_roles:
-        bookings = await crud.get_bookings_by_parent(db, current_user.id)
+        bookings = await crud.get_bookings_by_parent(db, current_user.id, page, fields)
     elif UserRole.athlete in user_roles:
-        bookings = await crud.get_bookings_by_athlete(db, current_user.id)
+        bookings = await crud.get_bookings_by_athlete(db, current_user.id, page, fields)
     else:  # coach
-        bookings = await crud.get_bookings_by_coach(db, current_user.id)
+        bookings = await crud.get_bookings_by_coach(db, current_user.id, page, fields)
     
-    return bookings
+    return serialize(prune(List[schemas.BookingOut], fields), bookings.items, headers=bookings.headers())
+
+def _dashboard_range(current_user: User, date_from: Optional[date], date_to: Optional[date]) -> Tuple[date, date]:
+    """Проверки панели тренера: роль и период (по умолчанию - ближайшая неделя)"""
+    user_roles = [ur.role for ur in current_user.user_roles]
+    if UserRole.coach not in user_roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only coaches can view the booking dashboard"
+        )
+    date_from = date_from or local_today()
+    date_to = date_to or date_from + timedelta(days=6)
+    if date_to < date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must not be earlier than date_from"
+        )
+    if (date_to - date_from).days >= settings.BOOKING_DASHBOARD_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range is limited to {settings.BOOKING_DASHBOARD_MAX_DAYS} days"
+        )
+    return date_from, date_to
+
+@router.get("/coach/dashboard", response_model=List[schemas.BookingOut])
+async def get_coach_dashboard(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    booking_status: Optional[List[BookingStatus]] = Query(None, alias="status"),
+    class_id: Optional[int] = None,
+    page: PageParams = Depends(optional_page_params),
+    fields: Optional[FieldSet] = Depends(sparse_fields(schemas.BookingOut)),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Бронирования на занятия тренера за период с фильтрами по статусу (можно несколько) и классу"""
+    date_from, date_to = _dashboard_range(current_user, date_from, date_to)
+    bookings = await crud.get_bookings_by_coach(
+        db, current_user.id, page, fields,
+        date_from=date_from, date_to=date_to, statuses=booking_status, class_id=class_id,
+    )
+    return serialize(prune(List[schemas.BookingOut], fields), bookings.items, headers=bookings.headers())
+
+@router.get("/coach/dashboard/summary", response_model=List[schemas.BookingDaySummaryOut])
+async def get_coach_dashboard_summary(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    class_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Сводка по классам и дням: число бронирований по статусам, оплаченные и сумма оплат"""
+    date_from, date_to = _dashboard_range(current_user, date_from, date_to)
+    summary = await crud.get_coach_booking_summary(db, current_user.id, date_from, date_to, class_id)
+    return serialize(List[schemas.BookingDaySummaryOut], summary)
+
+async def _review_bookings(db: AsyncSession, current_user: User, booking_ids: List[int], action: str, statuses) -> list:
+    """Проверки массового подтверждения/отклонения одним запросом: все бронирования
+    существуют, относятся к классам тренера и находятся в одном из statuses"""
+    user_roles = [ur.role for ur in current_user.user_roles]
+    if UserRole.coach not in user_roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Only coaches can {action} bookings"
+        )
+
+    reviewed = await crud.get_bookings_for_review(db, booking_ids)
+    missing = set(booking_ids) - {row.id for row in reviewed}
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Bookings not found: {', '.join(map(str, sorted(missing)))}"
+        )
+    if any(row.coach_id != current_user.id for row in reviewed):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"You can only {action} bookings for your own classes"
+        )
+    invalid = sorted(row.id for row in reviewed if row.status not in statuses)
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Bookings cannot be {action}d in their current status: {', '.join(map(str, invalid))}"
+        )
+    return reviewed
+
+@router.put("/bulk/approve", response_model=List[schemas.BookingOut])
+async def approve_bookings(
+    bulk_data: schemas.BookingBulkApprove,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Подтвердить несколько ожидающих бронирований (только для тренеров).
+
+    Все или ничего: если хотя бы одно бронирование чужое или не в pending,
+    не подтверждается ни одно.
+    """
+    await _review_bookings(db, current_user, bulk_data.booking_ids, "approve", (BookingStatus.pending,))
+    bookings = await crud.approve_bookings(db, bulk_data.booking_ids)
+    return serialize(List[schemas.BookingOut], bookings)
+
+@router.put("/bulk/decline", response_model=List[schemas.BookingOut])
+async def decline_bookings(
+    bulk_data: schemas.BookingBulkDecline,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Отклонить несколько бронирований (только для тренеров); освободившиеся места уходят листу ожидания"""
+    reviewed = await _review_bookings(
+        db, current_user, bulk_data.booking_ids, "decline",
+        (BookingStatus.pending, BookingStatus.confirmed, BookingStatus.waitlisted),
+    )
+    bookings = await crud.decline_bookings(db, reviewed, bulk_data.decline_reason)
+    return serialize(List[schemas.BookingOut], bookings)
 
 @router.put("/{booking_id}/cancel", response_model=schemas.BookingOut)
 async def cancel_booking(
@@ -162,6 +339,38 @@ async def get_booking(
     
     return booking
 
+@router.get("/{booking_id}/waitlist-position", response_model=schemas.WaitlistPositionOut)
+async def get_waitlist_position(
+    booking_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Позиция бронирования в листе ожидания"""
+    booking = await crud.get_booking(db, booking_id)
+    if not booking:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Booking not found"
+        )
+    
+    # Проверить права доступа
+    user_roles = [ur.role for ur in current_user.user_roles]
+    if (UserRole.parent in user_roles and booking.booked_by_parent_id != current_user.id) or \
+       (UserRole.athlete in user_roles and booking.athlete_id != current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied"
+        )
+    
+    if booking.status != BookingStatus.waitlisted:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Booking is not on the waitlist"
+        )
+    
+    position, size = await crud.get_waitlist_position(db, booking)
+    return schemas.WaitlistPositionOut(booking_id=booking.id, position=position, waitlist_size=size)
+
 @router.put("/{booking_id}/approve", response_model=schemas.BookingOut)
 async def approve_booking(
     booking_id: int,
@@ -193,7 +402,14 @@ async def approve_booking(
             detail="You can only approve bookings for your own classes"
         )
     
+    # Подтверждается только pending: у него уже занято место. Лист ожидания,
+    # отменённые и завершённые места не держат
     approved_booking = await crud.approve_booking(db, booking_id)
+    if not approved_booking:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Only pending bookings can be approved"
+        )
     return approved_booking
 
 @router.put("/{booking_id}/decline", response_model=schemas.BookingOut)
@@ -287,19 +503,22 @@ async def create_individual_training_request(
 
 @router.get("/individual-training/my-requests", response_model=List[schemas.IndividualTrainingRequestOut])
 async def get_my_individual_training_requests(
+    response: Response,
+    page: PageParams = Depends(optional_page_params),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить мои запросы на индивидуальные тренировки"""
     user_roles = [ur.role for ur in current_user.user_roles]
     if UserRole.parent in user_roles:
-        requests = await crud.get_individual_training_requests_by_athlete(db, current_user.id)
+        requests = await crud.get_individual_training_requests_by_athlete(db, current_user.id, page)
     elif UserRole.athlete in user_roles:
-        requests = await crud.get_individual_training_requests_by_athlete(db, current_user.id)
+        requests = await crud.get_individual_training_requests_by_athlete(db, current_user.id, page)
     else:  # coach
-        requests = await crud.get_individual_training_requests_by_coach(db, current_user.id)
+        requests = await crud.get_individual_training_requests_by_coach(db, current_user.id, page)
     
-    return requests
+    response.headers.update(requests.headers())
+    return requests.items
 
 @router.get("/individual-training/pending", response_model=List[schemas.IndividualTrainingRequestOut])
 async def get_pending_individual_training_requests(
@@ -317,6 +536,75 @@ async def get_pending_individual_training_requests(
     requests = await crud.get_pending_individual_training_requests_by_coach(db, current_user.id)
     return requests
 
+async def _get_coach_or_404(db: AsyncSession, coach_id: int) -> None:
+    from app.users import crud as user_crud
+    if not await user_crud.user_has_role(db, coach_id, UserRole.coach):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Coach not found"
+        )
+
+@router.put("/individual-training/working-hours", response_model=List[schemas.WorkingHoursOut])
+async def set_working_hours(
+    hours_data: schemas.WorkingHoursSet,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Задать рабочее время для индивидуальных тренировок (только для тренеров)"""
+    user_roles = [ur.role for ur in current_user.user_roles]
+    if UserRole.coach not in user_roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only coaches can set working hours"
+        )
+
+    hours = await crud.set_working_hours(db, current_user.id, hours_data.hours)
+    return serialize(List[schemas.WorkingHoursOut], hours)
+
+@router.get("/individual-training/coaches/{coach_id}/working-hours", response_model=List[schemas.WorkingHoursOut])
+async def get_working_hours(
+    coach_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Рабочее время тренера; пустой список - время по умолчанию"""
+    await _get_coach_or_404(db, coach_id)
+    hours = await crud.get_working_hours(db, coach_id)
+    return serialize(List[schemas.WorkingHoursOut], hours)
+
+@router.get("/individual-training/coaches/{coach_id}/free-slots", response_model=List[schemas.FreeSlotOut])
+async def get_free_slots(
+    coach_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    duration_minutes: int = Query(60, ge=15, le=480),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Свободное время тренера для индивидуальной тренировки (по умолчанию - неделя с сегодняшнего дня).
+
+    Окна не короче duration_minutes: рабочее время за вычетом занятий и
+    принятых тренировок. Запрос на тренировку с временем внутри окна не
+    пересечётся с расписанием тренера.
+    """
+    await _get_coach_or_404(db, coach_id)
+    date_from = date_from or local_today()
+    date_to = date_to or date_from + timedelta(days=6)
+    if date_to < date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must not be earlier than date_from"
+        )
+    if (date_to - date_from).days >= settings.FREE_SLOTS_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range is limited to {settings.FREE_SLOTS_MAX_DAYS} days"
+        )
+    _check_days_ahead(date_to)
+
+    slots = await crud.get_free_slots(db, coach_id, date_from, date_to, timedelta(minutes=duration_minutes))
+    return serialize(List[schemas.FreeSlotOut], [{"starts_at": start, "ends_at": end} for start, end in slots])
+
 @router.get("/individual-training/{request_id}", response_model=schemas.IndividualTrainingRequestOut)
 async def get_individual_training_request(
     request_id: int,
@@ -380,7 +668,13 @@ async def accept_individual_training_request(
             detail="Can only accept pending requests"
         )
     
-    accepted_request = await crud.accept_individual_training_request(db, request_id, update_data)
+    try:
+        accepted_request = await crud.accept_individual_training_request(db, request_id, update_data)
+    except ScheduleConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     return accepted_request
 
 @router.put("/individual-training/{request_id}/decline", response_model=schemas.IndividualTrainingRequestOut)
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, ConfigDict, field_validator
-from typing import Optional
-from datetime import datetime
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Dict, List, Optional
+from datetime import date, datetime, time
 from app.bookings.models import BookingStatus, BookingType, IndividualTrainingStatus
+from app.classes.schedule import WEEKDAYS
+from app.config import settings
 
 class BookingBase(BaseModel):
     athlete_id: int
@@ -11,7 +13,38 @@ class BookingBase(BaseModel):
     notes: Optional[str] = None
 
 class BookingCreate(BookingBase):
-    pass
+    occurrence_id: Optional[int] = None  # конкретное занятие из GET /classes/schedule; иначе - по class_date
+    join_waitlist: bool = False  # если мест нет - встать в лист ожидания вместо ошибки 409
+
+class BookingSeriesCreate(BaseModel):
+    """Бронирование всех занятий класса за период (например, на сезон)"""
+    athlete_id: int
+    class_id: int
+    date_from: date
+    date_to: date
+    booking_type: BookingType = BookingType.regular
+    notes: Optional[str] = None
+    join_waitlist: bool = False  # на занятия без мест - в лист ожидания; иначе 409 для всей серии
+
+    @field_validator("date_to")
+    @classmethod
+    def validate_date_to(cls, v, info):
+        date_from = info.data.get("date_from")
+        if date_from and v < date_from:
+            raise ValueError("date_to must not be earlier than date_from")
+        return v
+
+class BookingBulkApprove(BaseModel):
+    """Очередь тренера: подтвердить несколько бронирований за раз"""
+    booking_ids: List[int] = Field(min_length=1, max_length=settings.BOOKING_BULK_MAX)
+
+    @field_validator("booking_ids")
+    @classmethod
+    def unique_ids(cls, v):
+        return list(dict.fromkeys(v))
+
+class BookingBulkDecline(BookingBulkApprove):
+    decline_reason: str
 
 class BookingUpdate(BaseModel):
     status: Optional[BookingStatus] = None
@@ -37,9 +70,11 @@ class ClassSimple(BaseModel):
 
 class BookingOut(BookingBase):
     id: int
+    occurrence_id: Optional[int] = None
     booked_by_parent_id: Optional[int] = None  # Nullable для взрослых спортсменов
     status: BookingStatus
     booking_date: datetime
+    waitlisted_at: Optional[datetime] = None
     is_paid: bool
     payment_amount: Optional[int] = None
     cancellation_reason: Optional[str] = None
@@ -53,7 +88,35 @@ class BookingOut(BookingBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+class BookingDaySummaryOut(BaseModel):
+    """Бронирования класса за день: число по статусам и оплаты"""
+    class_id: int
+    class_name: str
+    day: date
+    counts: Dict[BookingStatus, int]
+    total: int
+    paid_count: int
+    paid_amount: int
+
+class WaitlistPositionOut(BaseModel):
+    booking_id: int
+    position: int  # 1 - следующий на освободившееся место
+    waitlist_size: int
+
 # Individual Training Request Schemas
+def _validate_time_format(v: Optional[str]) -> Optional[str]:
+    if v is not None:
+        try:
+            # Validate HH:MM format
+            if len(v) != 5 or v[2] != ':':
+                raise ValueError("Time must be in HH:MM format")
+            hour, minute = v.split(':')
+            if not (0 <= int(hour) <= 23 and 0 <= int(minute) <= 59):
+                raise ValueError("Invalid time values")
+        except ValueError as e:
+            raise ValueError(f"Invalid time format: {e}")
+    return v
+
 class IndividualTrainingRequestBase(BaseModel):
     coach_id: int
     requested_date: datetime
@@ -64,17 +127,7 @@ class IndividualTrainingRequestBase(BaseModel):
     @field_validator("preferred_time_start", "preferred_time_end")
     @classmethod
     def validate_time_format(cls, v):
-        if v is not None:
-            try:
-                # Validate HH:MM format
-                if len(v) != 5 or v[2] != ':':
-                    raise ValueError("Time must be in HH:MM format")
-                hour, minute = v.split(':')
-                if not (0 <= int(hour) <= 23 and 0 <= int(minute) <= 59):
-                    raise ValueError("Invalid time values")
-            except ValueError as e:
-                raise ValueError(f"Invalid time format: {e}")
-        return v
+        return _validate_time_format(v)
 
 class IndividualTrainingRequestCreate(IndividualTrainingRequestBase):
     pass
@@ -87,6 +140,11 @@ class IndividualTrainingRequestUpdate(BaseModel):
     payment_amount: Optional[int] = None
     is_paid: Optional[bool] = None
 
+    @field_validator("scheduled_time_start", "scheduled_time_end")
+    @classmethod
+    def validate_time_format(cls, v):
+        return _validate_time_format(v)
+
 class IndividualTrainingRequestOut(IndividualTrainingRequestBase):
     id: int
     athlete_id: int
@@ -111,6 +169,42 @@ class IndividualTrainingRequestOut(IndividualTrainingRequestBase):
 
     model_config = ConfigDict(from_attributes=True)
 
+# Рабочее время тренера и свободные окна
+class WorkingHoursBase(BaseModel):
+    day_of_week: str  # "понедельник", "вторник", etc.
+    start_time: time
+    end_time: time
+
+    @field_validator("day_of_week")
+    @classmethod
+    def validate_day_of_week(cls, v):
+        day = v.strip().lower()
+        if day not in WEEKDAYS:
+            raise ValueError(f"Unknown day of week: {v}")
+        return day
+
+    @field_validator("end_time")
+    @classmethod
+    def validate_end_time(cls, v, info):
+        start_time = info.data.get("start_time")
+        if start_time and v <= start_time:
+            raise ValueError("end_time must be later than start_time")
+        return v
+
+class WorkingHoursSet(BaseModel):
+    """Полная замена рабочего времени тренера; пустой список - время по умолчанию"""
+    hours: List[WorkingHoursBase]
+
+class WorkingHoursOut(WorkingHoursBase):
+    id: int
+    coach_id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+class FreeSlotOut(BaseModel):
+    starts_at: datetime
+    ends_at: datetime
+
 # Специальная схема для отображения с деталями
 class BookingWithDetails(BookingOut):
     athlete_name: str
@@ -5,35 +5,26 @@ from typing import List, Optional
 from datetime import datetime
 
 from . import models, schemas
+from app.common.pagination import PageParams, paginate
 
 # Chat Room CRUD
 async def create_chat_room(db: AsyncSession, room: schemas.ChatRoomCreate, created_by_id: int):
     """Создать новую комнату чата"""
     db_room = models.ChatRoom(**room.dict(), created_by_id=created_by_id)
-    db.add(db_room)
-    await db.commit()
-    await db.refresh(db_room)
-    
     # Автоматически добавляем создателя как администратора
-    membership = models.ChatMembership(
-        room_id=db_room.id,
-        user_id=created_by_id,
-        is_admin=True
-    )
-    db.add(membership)
-    await db.commit()
+    db_room.members = [models.ChatMembership(user_id=created_by_id, is_admin=True)]
+    db.add(db_room)
+    await db.flush()
     
     return db_room
 
-async def get_chat_rooms(db: AsyncSession, skip: int = 0, limit: int = 100):
+async def get_chat_rooms(db: AsyncSession, page: Optional[PageParams] = None):
     """Получить список комнат чата"""
-    result = await db.execute(
+    query = (
         select(models.ChatRoom)
         .filter(models.ChatRoom.is_active == True)
-        .offset(skip)
-        .limit(limit)
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(models.ChatRoom.id, False)], page)
 
 async def get_user_chat_rooms(db: AsyncSession, user_id: int):
     """Получить комнаты чата пользователя"""
@@ -59,8 +50,7 @@ async def create_message(db: AsyncSession, message: schemas.ChatMessageCreate, s
     """Создать новое сообщение"""
     db_message = models.ChatMessage(**message.dict(), sender_id=sender_id)
     db.add(db_message)
-    await db.commit()
-    await db.refresh(db_message)
+    await db.flush()
     
     # Add sender information
     from app.users.models import User
@@ -75,18 +65,16 @@ async def create_message(db: AsyncSession, message: schemas.ChatMessageCreate, s
     
     return db_message
 
-async def get_room_messages(db: AsyncSession, room_id: int, skip: int = 0, limit: int = 50):
+async def get_room_messages(db: AsyncSession, room_id: int, page: Optional[PageParams] = None):
     """Получить сообщения комнаты"""
-    result = await db.execute(
-        select(models.ChatMessage).where(
-            models.ChatMessage.room_id == room_id,
-            models.ChatMessage.is_deleted == False
-        ).order_by(desc(models.ChatMessage.created_at)).offset(skip).limit(limit)
+    query = select(models.ChatMessage).where(
+        models.ChatMessage.room_id == room_id,
+        models.ChatMessage.is_deleted == False
     )
-    messages = result.scalars().all()
+    messages = await paginate(db, query, [(models.ChatMessage.created_at, True), (models.ChatMessage.id, True)], page)
     
     # Add sender information to each message
-    for message in messages:
+    for message in messages.items:
         # Fetch sender info
         from app.users.models import User
         sender_result = await db.execute(
@@ -110,19 +98,21 @@ async def get_forum_categories(db: AsyncSession):
     )
     return result.scalars().all()
 
-async def get_forum_topics(db: AsyncSession, category_id: int, skip: int = 0, limit: int = 20):
+async def get_forum_topics(db: AsyncSession, category_id: int, page: Optional[PageParams] = None):
     """Получить топики категории"""
-    result = await db.execute(
+    query = (
         select(models.ForumTopic)
         .filter(
             models.ForumTopic.category_id == category_id,
             models.ForumTopic.is_approved == True
         )
-        .order_by(desc(models.ForumTopic.is_pinned), desc(models.ForumTopic.updated_at))
-        .offset(skip)
-        .limit(limit)
     )
-    return result.scalars().all()
+    return await paginate(
+        db,
+        query,
+        [(models.ForumTopic.is_pinned, True), (models.ForumTopic.updated_at, True), (models.ForumTopic.id, True)],
+        page,
+    )
 
 async def get_forum_topic(db: AsyncSession, topic_id: int):
     """Получить топик по ID"""
@@ -135,29 +125,24 @@ async def create_forum_topic(db: AsyncSession, topic: schemas.ForumTopicCreate,
     """Создать новый топик"""
     db_topic = models.ForumTopic(**topic.dict(), created_by_id=created_by_id)
     db.add(db_topic)
-    await db.commit()
-    await db.refresh(db_topic)
+    await db.flush()
     return db_topic
 
-async def get_forum_replies(db: AsyncSession, topic_id: int, skip: int = 0, limit: int = 50):
+async def get_forum_replies(db: AsyncSession, topic_id: int, page: Optional[PageParams] = None):
     """Получить ответы топика"""
-    result = await db.execute(
+    query = (
         select(models.ForumReply)
         .filter(
             models.ForumReply.topic_id == topic_id,
             models.ForumReply.is_approved == True
         )
-        .order_by(models.ForumReply.created_at)
-        .offset(skip)
-        .limit(limit)
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(models.ForumReply.created_at, False), (models.ForumReply.id, False)], page)
 
 async def create_forum_reply(db: AsyncSession, reply: schemas.ForumReplyCreate, author_id: int):
     """Создать новый ответ"""
     db_reply = models.ForumReply(**reply.dict(), author_id=author_id)
     db.add(db_reply)
-    await db.commit()
-    await db.refresh(db_reply)
+    await db.flush()
     return db_reply
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Enum as SqlEnum
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Text, Enum as SqlEnum, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 from enum import Enum
@@ -48,6 +48,10 @@ class ChatRoom(Base):
 class ChatMembership(Base):
     """Участники чата"""
     __tablename__ = "chat_memberships"
+    __table_args__ = (
+        Index("ix_chat_memberships_room_id_user_id", "room_id", "user_id"),
+        Index("ix_chat_memberships_user_id", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     room_id = Column(Integer, ForeignKey("chat_rooms.id"), nullable=False)
@@ -71,6 +75,9 @@ class ChatMembership(Base):
 class ChatMessage(Base):
     """Сообщения в чате"""
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_room_id_created_at", "room_id", "created_at", "id", postgresql_where=text("is_deleted = false")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     room_id = Column(Integer, ForeignKey("chat_rooms.id"), nullable=False)
@@ -102,6 +109,9 @@ class ChatMessage(Base):
 class MessageReaction(Base):
     """Реакции на сообщения"""
     __tablename__ = "message_reactions"
+    __table_args__ = (
+        Index("ix_message_reactions_message_id", "message_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     message_id = Column(Integer, ForeignKey("chat_messages.id"), nullable=False)
@@ -142,6 +152,9 @@ class ForumCategory(Base):
 class ForumTopic(Base):
     """Топики форума"""
     __tablename__ = "forum_topics"
+    __table_args__ = (
+        Index("ix_forum_topics_category_id_pinned_updated_at", "category_id", "is_pinned", "updated_at", "id", postgresql_where=text("is_approved")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     category_id = Column(Integer, ForeignKey("forum_categories.id"), nullable=False)
@@ -174,6 +187,9 @@ class ForumTopic(Base):
 class ForumReply(Base):
     """Ответы в форуме"""
     __tablename__ = "forum_replies"
+    __table_args__ = (
+        Index("ix_forum_replies_topic_id_created_at", "topic_id", "created_at", "id", postgresql_where=text("is_approved")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     topic_id = Column(Integer, ForeignKey("forum_topics.id"), nullable=False)
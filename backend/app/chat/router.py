@@ -1,19 +1,26 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from app.deps import get_db, get_current_user
+from app.deps import get_db, get_read_db, get_current_user
 from app.users.models import User
 from . import crud, schemas
+from .models import ForumTopic
+from app.core.conditional import compute_validators
+from app.common.pagination import PageParams, page_params, paged
 
 router = APIRouter()
 
 @router.get("/rooms", response_model=List[schemas.ChatRoomOut])
 async def get_chat_rooms(
+    response: Response,
+    page: PageParams = Depends(paged(100)),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить список комнат"""
-    return await crud.get_chat_rooms(db=db)
+    rooms = await crud.get_chat_rooms(db=db, page=page)
+    response.headers.update(rooms.headers())
+    return rooms.items
 
 @router.post("/rooms", response_model=schemas.ChatRoomOut)
 async def create_chat_room(
@@ -27,13 +34,15 @@ async def create_chat_room(
 @router.get("/rooms/{room_id}/messages", response_model=List[schemas.ChatMessageOut])
 async def get_room_messages(
     room_id: int,
-    skip: int = 0,
-    limit: int = 50,
+    response: Response,
+    page: PageParams = Depends(page_params),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить сообщения"""
-    return await crud.get_room_messages(db=db, room_id=room_id, skip=skip, limit=limit)
+    messages = await crud.get_room_messages(db=db, room_id=room_id, page=page)
+    response.headers.update(messages.headers())
+    return messages.items
 
 @router.post("/messages", response_model=schemas.ChatMessageOut)
 async def create_message(
@@ -47,7 +56,7 @@ async def create_message(
 # Forum endpoints
 @router.get("/forum/categories", response_model=List[schemas.ForumCategoryOut])
 async def get_forum_categories(
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить категории форума"""
@@ -56,13 +65,22 @@ async def get_forum_categories(
 @router.get("/forum/categories/{category_id}/topics", response_model=List[schemas.ForumTopicOut])
 async def get_forum_topics(
     category_id: int,
-    skip: int = 0,
-    limit: int = 20,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(paged(20)),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить топики категории"""
-    return await crud.get_forum_topics(db=db, category_id=category_id, skip=skip, limit=limit)
+    validators = await compute_validators(
+        db, request, (ForumTopic, (ForumTopic.category_id == category_id) & (ForumTopic.is_approved == True))
+    )
+    if validators.matches(request):
+        return validators.not_modified()
+    topics = await crud.get_forum_topics(db=db, category_id=category_id, page=page)
+    response.headers.update(topics.headers())
+    response.headers.update(validators.headers())
+    return topics.items
 
 @router.post("/forum/topics", response_model=schemas.ForumTopicOut)
 async def create_forum_topic(
@@ -76,25 +94,33 @@ async def create_forum_topic(
 @router.get("/forum/topics/{topic_id}", response_model=schemas.ForumTopicOut)
 async def get_forum_topic(
     topic_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить топик"""
+    validators = await compute_validators(db, request, (ForumTopic, ForumTopic.id == topic_id))
+    if validators.matches(request):
+        return validators.not_modified()
     topic = await crud.get_forum_topic(db=db, topic_id=topic_id)
     if not topic:
         raise HTTPException(status_code=404, detail="Topic not found")
+    response.headers.update(validators.headers())
     return topic
 
 @router.get("/forum/topics/{topic_id}/replies", response_model=List[schemas.ForumReplyOut])
 async def get_forum_replies(
     topic_id: int,
-    skip: int = 0,
-    limit: int = 50,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить ответы топика"""
-    return await crud.get_forum_replies(db=db, topic_id=topic_id, skip=skip, limit=limit)
+    replies = await crud.get_forum_replies(db=db, topic_id=topic_id, page=page)
+    response.headers.update(replies.headers())
+    return replies.items
 
 @router.post("/forum/replies", response_model=schemas.ForumReplyOut)
 async def create_forum_reply(
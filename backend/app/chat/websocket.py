@@ -28,7 +28,7 @@ class ConnectionManager:
         self.active_connections[room_id].append(websocket)
         self.user_connections[websocket] = user_id
         
-        logger.info(f"User {user_id} connected to room {room_id}")
+        logger.info("User %s connected to room %s", user_id, room_id)
 
     def disconnect(self, websocket: WebSocket, room_id: int):
         """Отключить пользователя от комнаты"""
@@ -39,7 +39,7 @@ class ConnectionManager:
         if websocket in self.user_connections:
             user_id = self.user_connections[websocket]
             del self.user_connections[websocket]
-            logger.info(f"User {user_id} disconnected from room {room_id}")
+            logger.info("User %s disconnected from room %s", user_id, room_id)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
         """Отправить личное сообщение"""
@@ -61,7 +61,7 @@ class ConnectionManager:
                     await connection.send_text(message_text)
                 except:
                     # Если соединение разорвано, удаляем его
-                    logger.warning(f"Failed to send message to connection in room {room_id}")
+                    logger.warning("Failed to send message to connection in room %s", room_id)
                     self.disconnect(connection, room_id)
 
     async def send_typing_status(self, room_id: int, user_id: int, is_typing: bool, exclude_websocket: WebSocket = None):
@@ -89,58 +89,59 @@ async def websocket_endpoint(
             await websocket.close(code=4001, reason="Authentication failed")
             return
 
-        # Создаем асинхронную сессию для работы с базой данных
+        # Короткая сессия только на проверку членства: соединение с базой
+        # не удерживается всё время жизни сокета
         async with AsyncSessionLocal() as db:
             # Проверяем, что пользователь является участником комнаты
             membership = await crud.get_user_membership(db, room_id, user.id)
 
-            if not membership:
-                await websocket.close(code=4003, reason="Access denied")
-                return
+        if not membership:
+            await websocket.close(code=4003, reason="Access denied")
+            return
 
-            await manager.connect(websocket, room_id, user.id)
+        await manager.connect(websocket, room_id, user.id)
+        
+        # Отправляем уведомление о подключении
+        join_message = {
+            "type": "user_joined",
+            "room_id": room_id,
+            "user_id": user.id,
+            "username": user.username
+        }
+        await manager.broadcast_to_room(join_message, room_id, websocket)
+
+        try:
+            while True:
+                data = await websocket.receive_text()
+                try:
+                    message_data = json.loads(data)
+                    await handle_websocket_message(websocket, message_data, user, room_id)
+                except json.JSONDecodeError:
+                    await manager.send_personal_message(
+                        json.dumps({"type": "error", "message": "Invalid JSON format"}),
+                        websocket
+                    )
+                except Exception as e:
+                    logger.error("Error handling message: %s", e)
+                    await manager.send_personal_message(
+                        json.dumps({"type": "error", "message": "Error processing message"}),
+                        websocket
+                    )
+
+        except WebSocketDisconnect:
+            manager.disconnect(websocket, room_id)
             
-            # Отправляем уведомление о подключении
-            join_message = {
-                "type": "user_joined",
+            # Отправляем уведомление об отключении
+            leave_message = {
+                "type": "user_left",
                 "room_id": room_id,
                 "user_id": user.id,
                 "username": user.username
             }
-            await manager.broadcast_to_room(join_message, room_id, websocket)
-
-            try:
-                while True:
-                    data = await websocket.receive_text()
-                    try:
-                        message_data = json.loads(data)
-                        await handle_websocket_message(websocket, message_data, user, room_id)
-                    except json.JSONDecodeError:
-                        await manager.send_personal_message(
-                            json.dumps({"type": "error", "message": "Invalid JSON format"}),
-                            websocket
-                        )
-                    except Exception as e:
-                        logger.error(f"Error handling message: {e}")
-                        await manager.send_personal_message(
-                            json.dumps({"type": "error", "message": "Error processing message"}),
-                            websocket
-                        )
-
-            except WebSocketDisconnect:
-                manager.disconnect(websocket, room_id)
-                
-                # Отправляем уведомление об отключении
-                leave_message = {
-                    "type": "user_left",
-                    "room_id": room_id,
-                    "user_id": user.id,
-                    "username": user.username
-                }
-                await manager.broadcast_to_room(leave_message, room_id)
+            await manager.broadcast_to_room(leave_message, room_id)
 
     except Exception as e:
-        logger.error(f"WebSocket connection error: {e}")
+        logger.error("WebSocket connection error: %s", e)
         await websocket.close(code=1011, reason="Internal server error")
 
 async def handle_websocket_message(
@@ -152,8 +153,9 @@ async def handle_websocket_message(
     """Обработка WebSocket сообщений"""
     message_type = message_data.get("type")
     
-    # Создаем асинхронную сессию для каждой операции
-    async with AsyncSessionLocal() as db:
+    # Отдельная транзакция на каждое сообщение: фиксируется при выходе из блока,
+    # при исключении откатывается
+    async with AsyncSessionLocal.begin() as db:
         if message_type == "chat_message":
             # Новое сообщение чата
             content = message_data.get("content", "").strip()
@@ -180,6 +182,8 @@ async def handle_websocket_message(
                 content=content
             )
             new_message = await crud.create_message(db=db, message=message_create, sender_id=user.id)
+            # Фиксируем до рассылки, чтобы участники не получили несохранённое сообщение
+            await db.commit()
             
             # Отправляем сообщение всем участникам комнаты
             broadcast_message = {
@@ -251,7 +255,7 @@ async def handle_websocket_message(
                 await manager.broadcast_to_room(broadcast_message, room_id)
 
             except Exception as e:
-                logger.error(f"Error handling reaction: {e}")
+                logger.error("Error handling reaction: %s", e)
                 await manager.send_personal_message(
                     json.dumps({"type": "error", "message": "Error processing reaction"}),
                     websocket
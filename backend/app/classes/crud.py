@@ -1,20 +1,40 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import case, func, select, update, or_
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
-from app.classes.models import Class
-from app.classes.schemas import ClassCreate, ClassUpdate
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import Any, Dict, Iterable, List, Optional
+from datetime import date, datetime, time, timedelta
+from app.classes.models import Class, ClassOccurrence, ClassStatus, OccurrenceStatus
+from app.classes.schemas import ClassCreate, ClassUpdate, ClassOut
+from app.classes.schedule import expand, horizon_end, local_now, local_today
+from app.bookings.conflicts import bounds, check_conflicts, coach_schedule
+from app.bookings.models import Booking, BookingStatus, SEAT_STATUSES
+from app.common.pagination import Page, PageParams, paginate
+from app.core.writes import insert_returning, dialect_insert
+from app.core.cache import cached, invalidate
+from app.jobs.crud import enqueue_many
 
-async def get_classes(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[Class]:
+# Поля, от которых зависят class_occurrences
+SCHEDULE_FIELDS = ("day_of_week", "start_time", "end_time", "status", "max_capacity")
+
+# Вместимость занятия, если у класса max_capacity не задан (как default колонки)
+DEFAULT_CAPACITY = 20
+
+# Строк в одном INSERT: 9 параметров на строку, лимит asyncpg - 32767 параметров
+OCCURRENCE_INSERT_CHUNK = 1000
+
+# Причина отмены бронирований на занятия, выпавшие из расписания
+SCHEDULE_CHANGED_REASON = "Cancelled: the class schedule changed"
+
+@cached(List[ClassOut], tags=("classes", "users"))
+async def get_classes(db: AsyncSession, page: Optional[PageParams] = None) -> Page[Class]:
     """Получить список активных занятий"""
-    result = await db.execute(
+    query = (
         select(Class)
         .where(Class.status == "active")
-        .offset(skip)
-        .limit(limit)
         .options(selectinload(Class.coach))
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(Class.id, False)], page)
 
 async def get_class(db: AsyncSession, class_id: int) -> Optional[Class]:
     """Получить занятие по ID"""
@@ -27,18 +47,10 @@ async def get_class(db: AsyncSession, class_id: int) -> Optional[Class]:
 
 async def create_class(db: AsyncSession, class_data: ClassCreate) -> Class:
     """Создать новое занятие"""
-    db_class = Class(**class_data.model_dump())
-    db.add(db_class)
-    await db.commit()
-    await db.refresh(db_class)
-    
-    # Load the created class with coach information
-    result = await db.execute(
-        select(Class)
-        .where(Class.id == db_class.id)
-        .options(selectinload(Class.coach))
-    )
-    return result.scalar_one()
+    db_class = await insert_returning(db, Class, class_data.model_dump(), load=("coach",))
+    await regenerate_occurrences(db, db_class)
+    invalidate(db, "classes")
+    return db_class
 
 async def update_class(db: AsyncSession, class_id: int, class_update: ClassUpdate) -> Optional[Class]:
     """Обновить занятие"""
@@ -53,24 +65,29 @@ async def update_class(db: AsyncSession, class_id: int, class_update: ClassUpdat
         return None
     
     update_data = class_update.model_dump(exclude_unset=True)
+    schedule_changed = any(
+        field in update_data and update_data[field] != getattr(db_class, field)
+        for field in SCHEDULE_FIELDS
+    )
     for field, value in update_data.items():
         setattr(db_class, field, value)
     
-    await db.commit()
-    await db.refresh(db_class)
+    await db.flush()
+    if schedule_changed:
+        await regenerate_occurrences(db, db_class)
+    invalidate(db, "classes")
     return db_class
 
-async def get_classes_by_coach(db: AsyncSession, coach_id: int, skip: int = 0, limit: int = 100) -> List[Class]:
+@cached(List[ClassOut], tags=("classes", "users"))
+async def get_classes_by_coach(db: AsyncSession, coach_id: int, page: Optional[PageParams] = None) -> Page[Class]:
     """Получить занятия по тренеру"""
-    result = await db.execute(
+    query = (
         select(Class)
         .where(Class.coach_id == coach_id)
         .where(Class.status == "active")
-        .offset(skip)
-        .limit(limit)
         .options(selectinload(Class.coach))
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(Class.id, False)], page)
 
 async def get_classes_by_difficulty(db: AsyncSession, difficulty: str) -> List[Class]:
     """Получить занятия по уровню сложности"""
@@ -107,3 +124,268 @@ async def get_class_participants(db: AsyncSession, class_id: int):
     )
     
     return result.all()
+
+
+def _occurrence_rows(class_obj: Class, start: date, end: date, after: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    return [
+        {
+            "class_id": class_obj.id,
+            "coach_id": class_obj.coach_id,
+            "starts_at": starts_at,
+            "ends_at": ends_at,
+            "status": OccurrenceStatus.scheduled,
+            "capacity": class_obj.max_capacity if class_obj.max_capacity is not None else DEFAULT_CAPACITY,
+        }
+        for starts_at, ends_at in expand(class_obj.day_of_week, class_obj.start_time, class_obj.end_time, start, end)
+        if after is None or starts_at >= after
+    ]
+
+async def _insert_occurrences(db: AsyncSession, rows: List[Dict[str, Any]], reschedule: bool) -> None:
+    """Многострочный INSERT занятий. Уже существующие (class_id, starts_at)
+    пропускаются, а с reschedule - снова становятся scheduled с новым ends_at"""
+    now = datetime.utcnow()
+    for offset in range(0, len(rows), OCCURRENCE_INSERT_CHUNK):
+        chunk = [{**row, "created_at": now, "updated_at": now} for row in rows[offset:offset + OCCURRENCE_INSERT_CHUNK]]
+        stmt = dialect_insert(db, ClassOccurrence).values(chunk)
+        if reschedule:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[ClassOccurrence.class_id, ClassOccurrence.starts_at],
+                set_={
+                    "coach_id": stmt.excluded.coach_id,
+                    "ends_at": stmt.excluded.ends_at,
+                    "capacity": stmt.excluded.capacity,
+                    "status": OccurrenceStatus.scheduled,
+                    "updated_at": now,
+                },
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=[ClassOccurrence.class_id, ClassOccurrence.starts_at])
+        await db.execute(stmt)
+
+async def _set_occurrences_until(db: AsyncSession, class_ids: Iterable[int], until: Optional[date]) -> None:
+    # updated_at = updated_at: служебное поле не должно менять ETag списка занятий
+    await db.execute(
+        update(Class)
+        .where(Class.id.in_(list(class_ids)))
+        .values(occurrences_until=until, updated_at=Class.updated_at)
+        .execution_options(synchronize_session=False)
+    )
+
+async def _link_bookings(db: AsyncSession, class_ids: List[int], start: date, end: date) -> None:
+    """Привязать к занятиям бронирования без occurrence_id и пересчитать места.
+
+    Такие бронирования остались с времён до class_occurrences: миграция
+    не создаёт занятий, поэтому привязка идёт здесь, когда они появляются.
+    Бронирование на дату без времени (00:00) получает единственное занятие
+    класса в этот день, а class_date - его время начала.
+    """
+    if not class_ids:
+        return
+    day_start = datetime.combine(start, time.min)
+    day_end = datetime.combine(end + timedelta(days=1), time.min)
+    result = await db.execute(
+        select(Booking.id, Booking.class_id, Booking.class_date)
+        .where(
+            Booking.class_id.in_(class_ids),
+            Booking.occurrence_id.is_(None),
+            Booking.status.in_(SEAT_STATUSES),
+            Booking.class_date >= day_start,
+            Booking.class_date < day_end,
+        )
+    )
+    bookings = result.all()
+    if not bookings:
+        return
+
+    result = await db.execute(
+        select(ClassOccurrence.id, ClassOccurrence.class_id, ClassOccurrence.starts_at)
+        .where(
+            ClassOccurrence.class_id.in_({class_id for _, class_id, _ in bookings}),
+            ClassOccurrence.status == OccurrenceStatus.scheduled,
+            ClassOccurrence.starts_at >= day_start,
+            ClassOccurrence.starts_at < day_end,
+        )
+    )
+    exact = {}
+    by_day = {}
+    for occurrence in result.all():
+        exact[(occurrence.class_id, occurrence.starts_at)] = occurrence
+        by_day.setdefault((occurrence.class_id, occurrence.starts_at.date()), []).append(occurrence)
+
+    links = {}
+    for booking_id, class_id, class_date in bookings:
+        occurrence = exact.get((class_id, class_date))
+        if occurrence is None and class_date.time() == time.min:
+            same_day = by_day.get((class_id, class_date.date()), [])
+            if len(same_day) == 1:
+                occurrence = same_day[0]
+        if occurrence is not None:
+            links[booking_id] = occurrence
+    if not links:
+        return
+
+    await db.execute(
+        update(Booking)
+        .where(Booking.id.in_(list(links)))
+        .values(
+            occurrence_id=case({booking_id: o.id for booking_id, o in links.items()}, value=Booking.id),
+            class_date=case({booking_id: o.starts_at for booking_id, o in links.items()}, value=Booking.id),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await _recount_seats(db, ClassOccurrence.id.in_({o.id for o in links.values()}))
+
+async def _recount_seats(db: AsyncSession, *where: Any) -> None:
+    # Счётчик пересчитывается целиком: бронирования старше лимита мест
+    # остаются в силе, новые просто не пройдут проверку seats_taken < capacity
+    seats = (
+        select(func.count())
+        .where(Booking.occurrence_id == ClassOccurrence.id, Booking.status.in_(SEAT_STATUSES))
+        .scalar_subquery()
+    )
+    await db.execute(
+        update(ClassOccurrence)
+        .where(*where)
+        .values(seats_taken=seats)
+        .execution_options(synchronize_session=False)
+    )
+
+async def _cancel_bookings(db: AsyncSession, occurrence_ids: List[int]) -> None:
+    """Отменить открытые бронирования на отменённые занятия и уведомить спортсменов"""
+    result = await db.execute(
+        update(Booking)
+        .where(
+            Booking.occurrence_id.in_(occurrence_ids),
+            Booking.status.in_((*SEAT_STATUSES, BookingStatus.waitlisted)),
+        )
+        .values(status=BookingStatus.cancelled, cancellation_reason=SCHEDULE_CHANGED_REASON, updated_at=datetime.utcnow())
+        .returning(Booking.id)
+        .execution_options(synchronize_session=False)
+    )
+    await enqueue_many(db, "notifications.booking_status", [
+        ({"booking_id": booking_id}, f"booking-status:{booking_id}:cancelled") for booking_id in result.scalars().all()
+    ])
+
+async def regenerate_occurrences(db: AsyncSession, class_obj: Class) -> None:
+    """Пересоздать будущие занятия после создания класса или изменения расписания.
+
+    Занятия, которые остались в расписании, сохраняются (и ссылки на них),
+    выпавшие из расписания отмечаются cancelled вместе с бронированиями на
+    них (спортсмены получают уведомление). Прошедшие не меняются.
+    ScheduleConflict, если новое расписание пересекается с другими
+    занятиями тренера.
+    """
+    now = local_now()
+    # Не короче уже созданного: занятия серий за горизонтом тоже пересоздаются
+    until = horizon_end()
+    if class_obj.occurrences_until is not None:
+        until = max(until, class_obj.occurrences_until)
+    active = class_obj.status == ClassStatus.active
+    rows = _occurrence_rows(class_obj, now.date(), until, after=now) if active else []
+    if rows:
+        # Тренер не может вести два занятия одновременно (ScheduleConflict)
+        intervals = [(row["starts_at"], row["ends_at"]) for row in rows]
+        check_conflicts(await coach_schedule(db, class_obj.coach_id, *bounds(intervals), exclude_class_id=class_obj.id), intervals)
+
+    cancel = (
+        update(ClassOccurrence)
+        .where(
+            ClassOccurrence.class_id == class_obj.id,
+            ClassOccurrence.starts_at >= now,
+            ClassOccurrence.status == OccurrenceStatus.scheduled,
+        )
+        .values(status=OccurrenceStatus.cancelled, seats_taken=0, updated_at=datetime.utcnow())
+        .returning(ClassOccurrence.id)
+        .execution_options(synchronize_session=False)
+    )
+    if rows:
+        cancel = cancel.where(ClassOccurrence.starts_at.not_in([row["starts_at"] for row in rows]))
+    dropped = (await db.execute(cancel)).scalars().all()
+    if dropped:
+        await _cancel_bookings(db, dropped)
+    await _insert_occurrences(db, rows, reschedule=True)
+    if rows:
+        await _link_bookings(db, [class_obj.id], now.date(), until)
+        # Занятия, вернувшиеся в расписание, начинают с мест по живым бронированиям
+        await _recount_seats(
+            db,
+            ClassOccurrence.class_id == class_obj.id,
+            ClassOccurrence.starts_at >= now,
+            ClassOccurrence.status == OccurrenceStatus.scheduled,
+        )
+    await _set_occurrences_until(db, [class_obj.id], until if active else None)
+    set_committed_value(class_obj, "occurrences_until", until if active else None)
+
+def _next_start(class_obj: Class, today: date) -> date:
+    """Первый день, для которого у класса ещё нет занятий"""
+    if class_obj.occurrences_until is not None and class_obj.occurrences_until >= today:
+        return class_obj.occurrences_until + timedelta(days=1)
+    return today
+
+async def ensure_occurrences(db: AsyncSession, class_obj: Class, until: date) -> None:
+    """Создать занятия класса до until, если горизонт до него ещё не дошёл.
+
+    Нужно для бронирования на весь сезон: дальше горизонта занятий нет.
+    Периодическая задача продолжит с нового occurrences_until.
+    """
+    if class_obj.status != ClassStatus.active:
+        return
+    if class_obj.occurrences_until is not None and class_obj.occurrences_until >= until:
+        return
+    start = _next_start(class_obj, local_today())
+    rows = _occurrence_rows(class_obj, start, until)
+    await _insert_occurrences(db, rows, reschedule=False)
+    await _link_bookings(db, [class_obj.id], start, until)
+    await _set_occurrences_until(db, [class_obj.id], until)
+    set_committed_value(class_obj, "occurrences_until", until)
+
+async def extend_occurrences(db: AsyncSession) -> int:
+    """Досоздать занятия активных классов до горизонта.
+
+    Каждый класс продолжается с occurrences_until, поэтому ежедневный запуск
+    добавляет по одному дню расписания. Возвращает число новых строк-кандидатов.
+    """
+    today = local_today()
+    until = horizon_end()
+    result = await db.execute(
+        select(Class)
+        .where(Class.status == ClassStatus.active)
+        .where(or_(Class.occurrences_until.is_(None), Class.occurrences_until < until))
+    )
+    classes = result.scalars().all()
+    if not classes:
+        return 0
+
+    rows: List[Dict[str, Any]] = []
+    for class_obj in classes:
+        rows.extend(_occurrence_rows(class_obj, _next_start(class_obj, today), until))
+
+    await _insert_occurrences(db, rows, reschedule=False)
+    await _link_bookings(db, [class_obj.id for class_obj in classes], today, until)
+    await _set_occurrences_until(db, [class_obj.id for class_obj in classes], until)
+    return len(rows)
+
+async def get_occurrences(
+    db: AsyncSession,
+    date_from: date,
+    date_to: date,
+    coach_id: Optional[int] = None,
+    class_id: Optional[int] = None,
+    include_cancelled: bool = False,
+) -> List[ClassOccurrence]:
+    """Занятия с date_from по date_to включительно - выборка по диапазону starts_at"""
+    query = (
+        select(ClassOccurrence)
+        .where(ClassOccurrence.starts_at >= datetime.combine(date_from, time.min))
+        .where(ClassOccurrence.starts_at < datetime.combine(date_to + timedelta(days=1), time.min))
+        .options(selectinload(ClassOccurrence.class_obj).selectinload(Class.coach))
+        .order_by(ClassOccurrence.starts_at, ClassOccurrence.id)
+    )
+    if coach_id:
+        query = query.where(ClassOccurrence.coach_id == coach_id)
+    if class_id:
+        query = query.where(ClassOccurrence.class_id == class_id)
+    if not include_cancelled:
+        query = query.where(ClassOccurrence.status == OccurrenceStatus.scheduled)
+    result = await db.execute(query)
+    return result.scalars().all()
@@ -0,0 +1,17 @@
+import logging
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.jobs.registry import job
+from app.classes import crud
+
+logger = logging.getLogger(__name__)
+
+
+@job("classes.extend_occurrences", every=settings.CLASS_OCCURRENCE_EXTEND_INTERVAL_SECONDS)
+async def extend_occurrences(db: AsyncSession) -> None:
+    """Сдвинуть горизонт class_occurrences (новый день расписания)"""
+    created = await crud.extend_occurrences(db)
+    if created:
+        logger.info("Generated %s class occurrences", created)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum as SqlEnum, ForeignKey, DateTime, Text, Boolean, Time
+from sqlalchemy import Column, Integer, String, Enum as SqlEnum, ForeignKey, DateTime, Date, Text, Boolean, Time, Index, UniqueConstraint, CheckConstraint, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 from enum import Enum
@@ -17,8 +17,15 @@ class ClassStatus(str, Enum):
     cancelled = "cancelled"
     completed = "completed"
 
+class OccurrenceStatus(str, Enum):
+    scheduled = "scheduled"
+    cancelled = "cancelled"  # занятие отменено или перенесено изменением расписания
+
 class Class(Base):
     __tablename__ = "classes"
+    __table_args__ = (
+        Index("ix_classes_coach_id_active", "coach_id", "id", postgresql_where=text("status = 'active'")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)  # например: "Грэпплинг для начинающих", "Грэпплинг детская группа"
@@ -40,6 +47,9 @@ class Class(Base):
     # Статус
     status = Column(SqlEnum(ClassStatus), default=ClassStatus.active)
     is_trial_available = Column(Boolean, default=True)  # пробные занятия
+
+    # День, до которого включительно созданы class_occurrences
+    occurrences_until = Column(Date, nullable=True)
     
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -47,3 +57,36 @@ class Class(Base):
     # Relationships
     coach = relationship("User", foreign_keys=[coach_id], back_populates="coached_classes")
     bookings = relationship("Booking", back_populates="class_obj")
+
+
+class ClassOccurrence(Base):
+    """Конкретное занятие по недельному расписанию Class.
+
+    Создаются заранее на CLASS_OCCURRENCE_HORIZON_DAYS вперёд (app.classes.jobs),
+    при изменении расписания будущие занятия пересоздаются. Время - местное,
+    как у Booking.class_date.
+    """
+    __tablename__ = "class_occurrences"
+    __table_args__ = (
+        # Повторная генерация не создаёт дублей; заодно индекс расписания занятия
+        UniqueConstraint("class_id", "starts_at", name="uq_class_occurrences_class_id_starts_at"),
+        Index("ix_class_occurrences_starts_at", "starts_at", "id", postgresql_where=text("status = 'scheduled'")),
+        Index("ix_class_occurrences_coach_id_starts_at", "coach_id", "starts_at"),
+        CheckConstraint("seats_taken >= 0", name="ck_class_occurrences_seats_taken"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    class_id = Column(Integer, ForeignKey("classes.id", ondelete="CASCADE"), nullable=False)
+    coach_id = Column(Integer, ForeignKey("users.id"), nullable=False)  # копия Class.coach_id для выборок по тренеру
+    starts_at = Column(DateTime, nullable=False)
+    ends_at = Column(DateTime, nullable=False)
+    status = Column(SqlEnum(OccurrenceStatus), nullable=False, default=OccurrenceStatus.scheduled)
+
+    # Места: seats_taken меняется только условным UPDATE (app.bookings.crud.take_seat)
+    capacity = Column(Integer, nullable=False, default=20)  # копия Class.max_capacity
+    seats_taken = Column(Integer, nullable=False, default=0)  # бронирования pending и confirmed
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    class_obj = relationship("Class")
@@ -1,9 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
-from app.deps import get_db, get_current_user
+from typing import List, Optional
+from sqlalchemy import select
+from datetime import date, datetime, time, timedelta
+from app.config import settings
+from app.deps import get_db, get_read_db, get_current_user
 from app.users.models import User, UserRole
 from app.classes import schemas, crud
+from app.bookings.conflicts import ScheduleConflict
+from app.classes.models import Class, ClassOccurrence, OccurrenceStatus
+from app.classes.schedule import local_today
+from app.core.conditional import compute_validators
+from app.common.pagination import PageParams, paged
 import logging
 
 # Set up logging
@@ -13,23 +21,74 @@ router = APIRouter()
 
 @router.get("/", response_model=List[schemas.ClassOut])
 async def get_classes(
-    skip: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
     coach_id: int = None,
-    db: AsyncSession = Depends(get_db)
+    page: PageParams = Depends(paged(100)),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить список всех активных занятий"""
-    print(f"DEBUG: get_classes called with coach_id={coach_id}, skip={skip}, limit={limit}")
+    where = Class.status == "active"
+    if coach_id:
+        where = where & (Class.coach_id == coach_id)
+    # В ответ входит тренер: его изменения тоже меняют ETag
+    coaches = User.id.in_(select(Class.coach_id).where(where))
+    validators = await compute_validators(db, request, (Class, where), (User, coaches))
+    if validators.matches(request):
+        return validators.not_modified()
     if coach_id:
         # Filter by coach if coach_id is provided
-        print(f"DEBUG: Filtering classes by coach_id={coach_id}")
-        classes = await crud.get_classes_by_coach(db, coach_id, skip=skip, limit=limit)
+        classes = await crud.get_classes_by_coach(db, coach_id, page)
     else:
         # Get all classes
-        print(f"DEBUG: Getting all classes")
-        classes = await crud.get_classes(db, skip=skip, limit=limit)
-    print(f"DEBUG: Returning {len(classes)} classes")
-    return classes
+        classes = await crud.get_classes(db, page)
+    response.headers.update(classes.headers())
+    response.headers.update(validators.headers())
+    return classes.items
+
+@router.get("/schedule", response_model=List[schemas.ClassOccurrenceOut])
+async def get_schedule(
+    request: Request,
+    response: Response,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    coach_id: Optional[int] = None,
+    class_id: Optional[int] = None,
+    include_cancelled: bool = False,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Расписание конкретных занятий за период (по умолчанию - ближайшая неделя)"""
+    date_from = date_from or local_today()
+    date_to = date_to or date_from + timedelta(days=6)
+    if date_to < date_from:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_to must not be earlier than date_from"
+        )
+    if (date_to - date_from).days >= settings.CLASS_SCHEDULE_MAX_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range is limited to {settings.CLASS_SCHEDULE_MAX_DAYS} days"
+        )
+
+    # Условие как в crud.get_occurrences: ETag меняется с любым занятием периода
+    where = (
+        (ClassOccurrence.starts_at >= datetime.combine(date_from, time.min))
+        & (ClassOccurrence.starts_at < datetime.combine(date_to + timedelta(days=1), time.min))
+    )
+    if coach_id:
+        where = where & (ClassOccurrence.coach_id == coach_id)
+    if class_id:
+        where = where & (ClassOccurrence.class_id == class_id)
+    if not include_cancelled:
+        where = where & (ClassOccurrence.status == OccurrenceStatus.scheduled)
+    coaches = User.id.in_(select(Class.coach_id).where(Class.id.in_(select(ClassOccurrence.class_id).where(where))))
+    validators = await compute_validators(db, request, (ClassOccurrence, where), Class, (User, coaches))
+    if validators.matches(request):
+        return validators.not_modified()
+    occurrences = await crud.get_occurrences(db, date_from, date_to, coach_id, class_id, include_cancelled)
+    response.headers.update(validators.headers())
+    return occurrences
 
 @router.post("/", response_model=schemas.ClassOut)
 async def create_class(
@@ -39,9 +98,7 @@ async def create_class(
 ):
     """Создать новое занятие (только для тренеров)"""
     # Debug logging
-    logger.info(f"Create class request from user {current_user.id} ({current_user.full_name})")
-    logger.info(f"User primary_role: {current_user.primary_role}")
-    logger.info(f"User roles: {[ur.role for ur in current_user.user_roles]}")
+    logger.info("Create class request from user %s", current_user.id)
     
     # Check if user has coach role - check both primary_role and user_roles
     has_coach_role = (
@@ -49,31 +106,43 @@ async def create_class(
         any(ur.role == UserRole.coach for ur in current_user.user_roles)
     )
     
-    logger.info(f"User has coach role: {has_coach_role}")
-    
     if not has_coach_role:
-        logger.warning(f"User {current_user.id} attempted to create class but is not a coach")
+        logger.warning("User %s attempted to create class but is not a coach", current_user.id)
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only coaches can create classes"
         )
     
-    logger.info(f"User {current_user.id} authorized to create class")
-    new_class = await crud.create_class(db, class_data)
+    logger.info("User %s authorized to create class", current_user.id)
+    try:
+        new_class = await crud.create_class(db, class_data)
+    except ScheduleConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     return new_class
 
 @router.get("/{class_id}", response_model=schemas.ClassOut)
 async def get_class(
     class_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить информацию о конкретном занятии"""
+    validators = await compute_validators(
+        db, request, (Class, Class.id == class_id), (User, User.id == select(Class.coach_id).where(Class.id == class_id).scalar_subquery())
+    )
+    if validators.matches(request):
+        return validators.not_modified()
     class_obj = await crud.get_class(db, class_id)
     if not class_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Class not found"
         )
+    response.headers.update(validators.headers())
     return class_obj
 
 @router.put("/{class_id}", response_model=schemas.ClassOut)
@@ -103,13 +172,19 @@ async def update_class(
             detail="Only the class coach can update this class"
         )
     
-    updated_class = await crud.update_class(db, class_id, class_update)
+    try:
+        updated_class = await crud.update_class(db, class_id, class_update)
+    except ScheduleConflict as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     return updated_class
 
 @router.get("/{class_id}/participants", response_model=List[schemas.ClassParticipantOut])
 async def get_class_participants(
     class_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить список участников занятия (только для тренера этого занятия)"""
@@ -0,0 +1,63 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterator, List, Tuple
+
+from app.config import settings
+
+WEEKDAYS = {
+    "понедельник": 0,
+    "вторник": 1,
+    "среда": 2,
+    "четверг": 3,
+    "пятница": 4,
+    "суббота": 5,
+    "воскресенье": 6,
+}
+
+
+def local_now() -> datetime:
+    """Текущее местное время клуба (без tzinfo, как время занятий)"""
+    return datetime.utcnow() + timedelta(hours=settings.CLUB_UTC_OFFSET_HOURS)
+
+
+def to_local(value: datetime) -> datetime:
+    """Время клиента с часовым поясом -> местное время клуба без tzinfo"""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None) + timedelta(hours=settings.CLUB_UTC_OFFSET_HOURS)
+
+
+def is_date_only(value: datetime) -> bool:
+    """Клиент передал только дату ("2026-10-26" -> 00:00): время занятия не указано"""
+    return value.tzinfo is None and value.time() == time.min
+
+
+def local_today() -> date:
+    return local_now().date()
+
+
+def horizon_end() -> date:
+    """Последний день, на который должны быть созданы занятия"""
+    return local_today() + timedelta(days=settings.CLASS_OCCURRENCE_HORIZON_DAYS)
+
+
+def parse_days(day_of_week: str) -> List[int]:
+    """"понедельник, среда" -> [0, 2]; неизвестные названия пропускаются"""
+    names = (name.strip().lower() for name in day_of_week.split(","))
+    return sorted({WEEKDAYS[name] for name in names if name in WEEKDAYS})
+
+
+def expand(day_of_week: str, start_time: time, end_time: time, start: date, end: date) -> Iterator[Tuple[datetime, datetime]]:
+    """Начало и конец каждого занятия по расписанию с start по end включительно"""
+    days = parse_days(day_of_week)
+    if not days or start > end:
+        return
+    day = start
+    while day <= end:
+        if day.weekday() in days:
+            starts_at = datetime.combine(day, start_time)
+            ends_at = datetime.combine(day, end_time)
+            if ends_at <= starts_at:
+                # Занятие через полночь
+                ends_at += timedelta(days=1)
+            yield starts_at, ends_at
+        day += timedelta(days=1)
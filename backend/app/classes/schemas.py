@@ -1,7 +1,7 @@
 from pydantic import BaseModel, ConfigDict, field_validator
 from typing import Optional, List
 from datetime import datetime, time
-from app.classes.models import DifficultyLevel, ClassStatus
+from app.classes.models import DifficultyLevel, ClassStatus, OccurrenceStatus
 
 class ClassBase(BaseModel):
     name: str
@@ -107,3 +107,26 @@ class ClassParticipantOut(BaseModel):
     booked_by_parent: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+class OccurrenceClassOut(BaseModel):
+    id: int
+    name: str
+    difficulty_level: DifficultyLevel
+    max_capacity: int
+    price_per_class: int
+    coach: Optional[CoachOut] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class ClassOccurrenceOut(BaseModel):
+    id: int
+    class_id: int
+    coach_id: int
+    starts_at: datetime
+    ends_at: datetime
+    status: OccurrenceStatus
+    capacity: int
+    seats_taken: int
+    class_obj: Optional[OccurrenceClassOut] = None
+
+    model_config = ConfigDict(from_attributes=True)
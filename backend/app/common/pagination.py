@@ -0,0 +1,197 @@
+"""Курсорная (keyset) пагинация списков.
+
+Тело ответа - JSON-массив, курсор следующей страницы - в заголовке
+X-Next-Cursor. Списки, которые раньше отдавались целиком (бронирования,
+запросы на тренировки, тренеры, пользователи, отзывы, достижения и турниры
+спортсмена, участники турнира), без limit по-прежнему отдаются целиком
+(optional_page_params): клиенты, не читающие X-Next-Cursor, не теряют
+строки. У остальных сохранён прежний размер по умолчанию (paged).
+"""
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+from fastapi import Query
+from sqlalchemy import and_, false, or_, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import Select
+
+T = TypeVar("T")
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 100
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Ключ сортировки: (колонка модели, по убыванию). Последний ключ должен быть уникальным (обычно id)
+OrderKey = Tuple[Any, bool]
+
+
+class InvalidCursor(ValueError):
+    """Курсор повреждён или не подходит к сортировке списка"""
+
+
+@dataclass
+class PageParams:
+    cursor: Optional[str] = None
+    limit: Optional[int] = DEFAULT_LIMIT  # None - без ограничения, до конца списка
+
+
+@dataclass
+class Page(Generic[T]):
+    items: List[T] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+    def headers(self) -> Dict[str, str]:
+        """Заголовок со ссылкой на следующую страницу (тело ответа остаётся списком)"""
+        return {NEXT_CURSOR_HEADER: self.next_cursor} if self.next_cursor else {}
+
+
+def paged(default_limit: Optional[int] = DEFAULT_LIMIT):
+    """Зависимость FastAPI с параметрами курсорной пагинации.
+
+    default_limit - размер страницы без limit; None - весь список, страницы
+    по X-Next-Cursor только у клиентов, передающих limit.
+    Старые skip/offset принимаются только нулевыми (первая страница),
+    иначе 400: смещения курсор не заменяет.
+    """
+
+    def dependency(
+        cursor: Optional[str] = Query(None, description="Курсор следующей страницы из заголовка X-Next-Cursor"),
+        limit: Optional[int] = Query(default_limit, ge=1, le=MAX_LIMIT, description="Размер страницы"),
+        skip: Optional[int] = Query(None, ge=0, deprecated=True, description="Устарело: только 0, далее - cursor"),
+        offset: Optional[int] = Query(None, ge=0, deprecated=True, description="Устарело: только 0, далее - cursor"),
+    ) -> PageParams:
+        if skip or offset:
+            raise InvalidCursor("skip/offset pagination is no longer supported: pass the cursor from the X-Next-Cursor header")
+        return PageParams(cursor=cursor, limit=limit)
+
+    return dependency
+
+
+page_params = paged()
+# Для списков, которые до пагинации отдавались целиком
+optional_page_params = paged(None)
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise InvalidCursor("Invalid cursor")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(payload)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursor("Invalid cursor")
+    if not isinstance(values, list):
+        raise InvalidCursor("Invalid cursor")
+    return [_decode_value(value) for value in values]
+
+
+def _nullable(column) -> bool:
+    return bool(getattr(column, "nullable", False))
+
+
+def _ordered(column, descending: bool):
+    # NULL - больше любого значения, как по умолчанию в PostgreSQL (в SQLite наоборот):
+    # явный NULLS FIRST/LAST даёт один порядок в обеих базах и совпадает с индексом
+    if descending:
+        return column.desc().nulls_first() if _nullable(column) else column.desc()
+    return column.asc().nulls_last() if _nullable(column) else column.asc()
+
+
+def _beyond(column, descending: bool, value: Any):
+    """Строки, идущие после value по одной колонке (NULL - наибольшее значение)"""
+    if value is None:
+        # По убыванию NULL идут первыми, за ними - все значения; по возрастанию NULL последние
+        return column.is_not(None) if descending else false()
+    if descending:
+        return column < value
+    return or_(column > value, column.is_(None)) if _nullable(column) else column > value
+
+
+def _equal(column, value: Any):
+    return column.is_(None) if value is None else column == value
+
+
+def _after(order_by: Sequence[OrderKey], values: Sequence[Any]):
+    """Условие "строго после курсора" для заданного порядка"""
+    directions = {descending for _, descending in order_by}
+    lead, descending = order_by[0]
+    if (
+        len(directions) == 1
+        and None not in values
+        and not any(_nullable(column) for column, _ in order_by[1:])
+    ):
+        # Одно направление - сравнение кортежей, его Postgres обслуживает составным индексом.
+        # Строки с NULL в первой колонке сравнение не пропускает: по убыванию они
+        # уже были (NULL первыми), по возрастанию добавляются явно
+        columns = tuple_(*[column for column, _ in order_by])
+        bound = tuple_(*values)
+        if descending:
+            return columns < bound
+        after = columns > bound
+        return or_(after, lead.is_(None)) if _nullable(lead) else after
+
+    clauses = []
+    for i, (column, descending) in enumerate(order_by):
+        equal = [_equal(order_by[j][0], values[j]) for j in range(i)]
+        clauses.append(and_(*equal, _beyond(column, descending, values[i])))
+    return or_(*clauses)
+
+
+async def paginate(
+    db: AsyncSession,
+    query: Select,
+    order_by: Sequence[OrderKey],
+    page: Optional[PageParams] = None,
+) -> Page:
+    """Выполнить запрос с keyset-пагинацией.
+
+    Вместо OFFSET запрос продолжается со значений ключей последней строки
+    предыдущей страницы, поэтому стоимость не растёт с номером страницы.
+    """
+    page = page or PageParams()
+    if page.cursor:
+        values = decode_cursor(page.cursor)
+        if len(values) != len(order_by):
+            raise InvalidCursor("Invalid cursor")
+        query = query.where(_after(order_by, values))
+
+    query = query.order_by(*[_ordered(column, descending) for column, descending in order_by])
+    if page.limit is not None:
+        query = query.limit(page.limit + 1)
+
+    result = await db.execute(query)
+    items = list(result.scalars().all())
+
+    next_cursor = None
+    if page.limit is not None and len(items) > page.limit:
+        items = items[:page.limit]
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column, _ in order_by])
+    return Page(items=items, next_cursor=next_cursor)
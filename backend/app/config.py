@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Dict, List, Optional
 import os
 from pathlib import Path
 
@@ -9,9 +10,74 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     DATABASE_URL: str
     ALEMBIC_DATABASE_URL: str
+    # Реплика только для чтения (необязательно): на неё идут GET-списки
+    DATABASE_REPLICA_URL: Optional[str] = None
+    # Сколько секунд после записи чтения пользователя идут в основную базу
+    READ_YOUR_WRITES_SECONDS: float = 5.0
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
 
+    # Логирование: запись в stdout в фоновом потоке (app.core.log)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" или "text"
+    LOG_LEVELS: Dict[str, str] = {}  # уровни по модулям, например {"app.chat": "DEBUG"}
+    LOG_SAMPLE_RATES: Dict[str, float] = {}  # доля записей INFO, например {"uvicorn.access": 0.1}
+    SQL_ECHO: bool = False  # логировать все SQL-запросы (sqlalchemy.engine)
+
+    # Журнал медленных запросов (выключен по умолчанию)
+    SLOW_QUERY_LOG_ENABLED: bool = False
+    SLOW_QUERY_THRESHOLD_MS: int = 200
+    SLOW_QUERY_LOG_SIZE: int = 100
+
+    # Профилирование отдельных запросов по заголовку (только главный тренер)
+    PROFILING_ENABLED: bool = True
+    PROFILE_HEADER: str = "X-Profile"
+    PROFILE_SAMPLE_INTERVAL_MS: int = 5
+    PROFILE_STORE_SIZE: int = 20
+
+    # Кэш данных, которые почти не меняются (списки занятий, товаров, тренеров)
+    CACHE_ENABLED: bool = True
+    CACHE_BACKEND: str = "memory"  # "memory" или "redis"
+    CACHE_REDIS_URL: str = "redis://localhost:6379/0"  # memory:// - замена Redis в памяти
+    CACHE_DEFAULT_TTL: int = 60
+    CACHE_MAX_ENTRIES: int = 1024
+    # Объединять одинаковые одновременные запросы чтения в один запрос к базе
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # POST /batch: несколько запросов API за один запрос
+    BATCH_MAX_REQUESTS: int = 20
+    BATCH_CONCURRENCY: int = 4  # одновременных подзапросов (каждый берёт соединение из пула)
+
+    # Фоновые задачи (таблица jobs): воркер в процессе uvicorn или python -m app.jobs.worker
+    JOBS_WORKER_ENABLED: bool = True
+    JOBS_CONCURRENCY: int = 4
+    JOBS_POLL_INTERVAL_SECONDS: float = 1.0
+    JOBS_LEASE_SECONDS: int = 300  # после этого задачу running заберёт другой воркер
+    JOBS_MAX_ATTEMPTS: int = 5
+    JOBS_RETRY_BASE_SECONDS: float = 10.0  # задержка повтора растёт вдвое с каждой попыткой
+    JOBS_RETRY_MAX_SECONDS: float = 3600.0
+    JOBS_RETENTION_DAYS: int = 30  # выполненные задачи старше этого удаляются (jobs.purge_done)
+    JOBS_RETENTION_INTERVAL_SECONDS: int = 3600
+    JOBS_RETENTION_BATCH_SIZE: int = 1000  # строк в одном DELETE
+
+    # Расписание: время занятий местное, сервер работает в UTC
+    CLUB_UTC_OFFSET_HOURS: float = 5.0  # Казахстан, UTC+5 без перехода на летнее время
+    CLASS_OCCURRENCE_HORIZON_DAYS: int = 56  # на сколько дней вперёд создаются class_occurrences
+    CLASS_OCCURRENCE_EXTEND_INTERVAL_SECONDS: int = 3600
+    CLASS_SCHEDULE_MAX_DAYS: int = 62  # наибольший диапазон GET /classes/schedule
+    BOOKING_SERIES_MAX_DAYS: int = 186  # серия бронирований - не больше полугода
+    BOOKING_MAX_DAYS_AHEAD: int = 186  # на сколько дней вперёд можно бронировать и искать свободное время
+    BOOKING_DASHBOARD_MAX_DAYS: int = 92  # наибольший диапазон панели бронирований тренера
+    BOOKING_BULK_MAX: int = 100  # бронирований в одном массовом подтверждении/отклонении
+    BOOKING_SWEEP_INTERVAL_SECONDS: int = 900
+    BOOKING_SWEEP_AFTER_HOURS: int = 3  # через сколько часов после начала занятия бронирование закрывается
+    BOOKING_SWEEP_BATCH_SIZE: int = 500  # строк в одной транзакции - блокировки держатся недолго
+    BOOKING_SWEEP_MAX_BATCHES: int = 200  # за один запуск; остальное - в следующий
+    TRAINING_REMINDER_INTERVAL_SECONDS: int = 300
+    TRAINING_REMINDER_HOURS: List[int] = [24, 2]  # за сколько часов до занятия напоминать
+    COACH_DEFAULT_WORKING_HOURS: str = "09:00-21:00"  # для тренеров без своего рабочего времени
+    FREE_SLOTS_MAX_DAYS: int = 31  # наибольший диапазон поиска свободного времени тренера
+
     class Config:
         env_file = BASE_DIR / ".env"
         extra = "allow"
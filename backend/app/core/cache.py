@@ -0,0 +1,320 @@
+import asyncio
+import functools
+import inspect
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.common.pagination import Page
+from app.config import settings
+from app.core.singleflight import call_key, single_flight, to_schema
+
+logger = logging.getLogger(__name__)
+
+# Теги, ожидающие инвалидации после фиксации транзакции (в session.info)
+CACHE_TAGS_KEY = "cache_tags"
+
+# Обёртка для результатов Page в сохранённом JSON
+PAGE_KEY = "__page__"
+
+# Неявный тег всех записей: его версия сбрасывает весь кэш
+ALL_TAG = "*"
+
+
+class CacheBackend(ABC):
+    """Хранилище кэша.
+
+    Инвалидация по тегам сделана через версии: ключ записи включает текущие
+    версии её тегов, инвалидация увеличивает версию, и старые записи
+    становятся недостижимы (вытесняются LRU или истекают по TTL).
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        ...
+
+    @abstractmethod
+    async def get_versions(self, tags: List[str]) -> List[int]:
+        ...
+
+    @abstractmethod
+    async def bump(self, tags: Iterable[str]) -> None:
+        ...
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class MemoryBackend(CacheBackend):
+    """LRU с TTL в памяти процесса"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        # Версии тегов не вытесняются: иначе сброс версии вернул бы старые записи
+        self._versions: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_versions(self, tags: List[str]) -> List[int]:
+        return [self._versions.get(tag, 0) for tag in tags]
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+        if ALL_TAG in tags:
+            self._entries.clear()
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+
+class RedisBackend(CacheBackend):
+    """Redis (клиент redis.asyncio или совместимый с ним)"""
+
+    name = "redis"
+
+    def __init__(self, client: Any, prefix: str = "cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        if url.startswith("memory://"):
+            return cls(InMemoryRedis())
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        return cls(redis.from_url(url))
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def get_versions(self, tags: List[str]) -> List[int]:
+        values = await self.client.mget([self._tag_key(tag) for tag in tags])
+        return [int(value) if value is not None else 0 for value in values]
+
+    async def bump(self, tags: Iterable[str]) -> None:
+        for tag in tags:
+            await self.client.incr(self._tag_key(tag))
+
+
+class InMemoryRedis:
+    """Замена Redis в памяти с тем же подмножеством API (get/set/mget/incr).
+
+    Для локальной проверки RedisBackend без сервера: CACHE_REDIS_URL=memory://
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[Optional[float], bytes]] = {}
+
+    def _get(self, key: str) -> Optional[bytes]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self._get(key)
+
+    async def set(self, key: str, value: Any, ex: Optional[int] = None) -> bool:
+        expires_at = time.monotonic() + ex if ex else None
+        self._data[key] = (expires_at, value if isinstance(value, bytes) else str(value).encode())
+        return True
+
+    async def mget(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [self._get(key) for key in keys]
+
+    async def incr(self, key: str) -> int:
+        value = int(self._get(key) or 0) + 1
+        self._data[key] = (None, str(value).encode())
+        return value
+
+
+class Cache:
+    """Кэш результатов crud-функций с метриками попаданий"""
+
+    def __init__(self, backend: CacheBackend, enabled: bool = True, default_ttl: int = 60):
+        self.backend = backend
+        self.enabled = enabled
+        self.default_ttl = default_ttl
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.errors: Counter = Counter()
+        self._pending: Set[asyncio.Task] = set()
+
+    def cached(self, schema: Any, tags: Tuple[str, ...], ttl: Optional[int] = None) -> Callable:
+        """Декоратор для crud-функций чтения вида f(db, *args).
+
+        Результат (список, объект или Page) переводится в схему ответа и
+        хранится как JSON, поэтому при попадании возвращаются схемы pydantic,
+        а не ORM-объекты. Исходная функция доступна как .uncached - для
+        проверок внутри транзакций записи, где кэш не годится.
+        """
+        def decorator(func: Callable) -> Callable:
+            name = f"{func.__module__}.{func.__qualname__}"
+            adapter = TypeAdapter(schema)
+            signature = inspect.signature(func)
+            all_tags = [ALL_TAG, *tags]
+
+            @functools.wraps(func)
+            async def wrapper(db, *args, **kwargs):
+                if not self.enabled:
+                    return await func(db, *args, **kwargs)
+
+                digest = call_key(signature, db, args, kwargs)
+                key = None
+                try:
+                    versions = await self.backend.get_versions(all_tags)
+                    key = f"{name}:{'.'.join(map(str, versions))}:{digest}"
+                    payload = await self.backend.get(key)
+                except Exception as e:
+                    # Недоступный кэш не должен ронять запрос - идём в базу
+                    self.errors[name] += 1
+                    logger.warning("Cache read failed for %s: %s", name, e)
+                    payload = None
+
+                if payload is not None:
+                    self.hits[name] += 1
+                    return self._load(adapter, payload)
+
+                self.misses[name] += 1
+
+                async def fill():
+                    value = to_schema(adapter, await func(db, *args, **kwargs))
+                    if key is not None:
+                        try:
+                            await self.backend.set(key, self._dump(adapter, value), ttl or self.default_ttl)
+                        except Exception as e:
+                            self.errors[name] += 1
+                            logger.warning("Cache write failed for %s: %s", name, e)
+                    return value
+
+                # Одновременные промахи по одному ключу делают один запрос к базе
+                return await single_flight.do(name, key or digest, fill)
+
+            wrapper.uncached = func
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    def _dump(adapter: TypeAdapter, value: Any) -> bytes:
+        if isinstance(value, Page):
+            return orjson.dumps({PAGE_KEY: [adapter.dump_python(value.items, mode="json"), value.next_cursor]})
+        return adapter.dump_json(value)
+
+    @staticmethod
+    def _load(adapter: TypeAdapter, payload: bytes) -> Any:
+        data = orjson.loads(payload)
+        if isinstance(data, dict) and PAGE_KEY in data:
+            items, next_cursor = data[PAGE_KEY]
+            return Page(items=adapter.validate_python(items), next_cursor=next_cursor)
+        return adapter.validate_python(data)
+
+    async def invalidate_tags(self, tags: Iterable[str], repeat_after: Optional[float] = None) -> None:
+        """Сбросить записи с тегами.
+
+        repeat_after - повторить сброс через столько секунд: запрос, читавший
+        отстающую реплику в момент записи, мог успеть положить старые данные.
+        """
+        tags = list(tags)
+        try:
+            await self.backend.bump(tags)
+        except Exception as e:
+            logger.warning("Cache invalidation failed for %s: %s", tags, e)
+        if repeat_after:
+            loop = asyncio.get_running_loop()
+            loop.call_later(repeat_after, self._schedule_invalidation, tags)
+
+    def _schedule_invalidation(self, tags: List[str]) -> None:
+        task = asyncio.ensure_future(self.invalidate_tags(tags))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def clear(self) -> None:
+        await self.invalidate_tags([ALL_TAG])
+
+    def stats(self) -> Dict[str, Any]:
+        names = sorted(set(self.hits) | set(self.misses) | set(self.errors))
+        functions = []
+        for name in names:
+            total = self.hits[name] + self.misses[name]
+            functions.append({
+                "name": name,
+                "hits": self.hits[name],
+                "misses": self.misses[name],
+                "errors": self.errors[name],
+                "hit_ratio": round(self.hits[name] / total, 3) if total else 0.0,
+            })
+        return {
+            "enabled": self.enabled,
+            "backend": self.backend.name,
+            "entries": self.backend.size(),
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "functions": functions,
+        }
+
+    def reset_stats(self) -> None:
+        self.hits.clear()
+        self.misses.clear()
+        self.errors.clear()
+
+
+def invalidate(db, *tags: str) -> None:
+    """Пометить теги для сброса после фиксации транзакции запроса (см. get_db).
+
+    Сброс до COMMIT позволил бы параллельному запросу снова закэшировать
+    старые данные.
+    """
+    db.info.setdefault(CACHE_TAGS_KEY, set()).update(tags)
+
+
+def _make_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "redis":
+        return RedisBackend.from_url(settings.CACHE_REDIS_URL)
+    return MemoryBackend(settings.CACHE_MAX_ENTRIES)
+
+
+cache = Cache(_make_backend(), enabled=settings.CACHE_ENABLED, default_ttl=settings.CACHE_DEFAULT_TTL)
+cached = cache.cached
@@ -0,0 +1,131 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import orjson
+from fastapi import Request, Response
+from sqlalchemy import func, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Источник данных ответа: модель целиком или (модель, условие WHERE)
+Source = Union[type, Tuple[type, Any]]
+
+# Клиент должен перепроверять ответ при каждом использовании (If-None-Match)
+CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_values(header: str) -> Sequence[str]:
+    """Список ETag из If-None-Match без префикса слабого сравнения W/"""
+    return [value.strip().removeprefix("W/") for value in header.split(",") if value.strip()]
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    values = _etag_values(if_none_match)
+    return "*" in values or etag.removeprefix("W/") in values
+
+
+@dataclass
+class Validators:
+    etag: str
+    last_modified: Optional[datetime]
+
+    def headers(self) -> Dict[str, str]:
+        headers = {"ETag": self.etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(self.last_modified.replace(tzinfo=timezone.utc), usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """Есть ли у клиента актуальная версия ответа.
+
+        Решение принимается только по If-None-Match: Last-Modified не замечает
+        удалённых строк (max(updated_at) при удалении не растёт), а ETag
+        учитывает и число строк.
+        """
+        return etag_matches(request.headers.get("if-none-match"), self.etag)
+
+    def not_modified(self) -> Response:
+        """Ответ 304 без тела - схемы и JSON не строятся"""
+        return Response(status_code=304, headers=self.headers())
+
+
+async def compute_validators(db: AsyncSession, request: Request, *sources: Source) -> Validators:
+    """ETag и Last-Modified по max(updated_at) и count(*) источников.
+
+    Все источники считаются одним запросом. В ETag входят также путь и
+    параметры запроса: разные страницы и фильтры получают разные ETag.
+    """
+    subqueries = []
+    for source in sources:
+        model, where = source if isinstance(source, tuple) else (source, None)
+        query = select(func.max(model.updated_at), func.count()).select_from(model)
+        if where is not None:
+            query = query.where(where)
+        subqueries.append(query.subquery())
+
+    # Однострочные подзапросы соединяются без условия - один запрос к базе
+    from_clause = subqueries[0]
+    for subquery in subqueries[1:]:
+        from_clause = from_clause.join(subquery, true())
+    row = (await db.execute(select(*[column for subquery in subqueries for column in subquery.c]).select_from(from_clause))).one()
+    stamps = list(row[0::2])
+    counts = list(row[1::2])
+
+    payload = orjson.dumps(
+        [request.url.path, sorted(request.query_params.multi_items()), stamps, counts],
+        default=str,
+    )
+    etag = f'W/"{hashlib.sha1(payload).hexdigest()[:20]}"'
+    last_modified = max((stamp for stamp in stamps if stamp is not None), default=None)
+    return Validators(etag=etag, last_modified=last_modified)
+
+
+class ConditionalGetMiddleware:
+    """ASGI middleware: 304 для GET-ответов с ETag, совпавшим с If-None-Match.
+
+    Эндпоинты с compute_validators отвечают 304 сами, до построения тела.
+    Middleware подстраховывает ответы, где ETag выставлен иначе: тело уже
+    построено, но по сети не передаётся.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = next(
+            (value.decode("latin-1") for name, value in scope["headers"] if name == b"if-none-match"),
+            None,
+        )
+        if not if_none_match:
+            await self.app(scope, receive, send)
+            return
+
+        suppress_body = False
+
+        async def send_conditional(message):
+            nonlocal suppress_body
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = message.get("headers", [])
+                etag = next((value.decode("latin-1") for name, value in headers if name == b"etag"), None)
+                if etag and etag_matches(if_none_match, etag):
+                    suppress_body = True
+                    message = {
+                        "type": "http.response.start",
+                        "status": 304,
+                        "headers": [(name, value) for name, value in headers if name != b"content-length" and name != b"content-type"],
+                    }
+            elif message["type"] == "http.response.body" and suppress_body:
+                if message.get("more_body", False):
+                    return
+                message = {"type": "http.response.body", "body": b""}
+            await send(message)
+
+        await self.app(scope, receive, send_conditional)
@@ -0,0 +1,170 @@
+import types
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union, get_args, get_origin
+
+from fastapi import HTTPException, Query, status
+from pydantic import ConfigDict, create_model
+from sqlalchemy import inspect
+from sqlalchemy.orm import RelationshipProperty, load_only, selectinload
+
+from app.core.responses import _unwrap
+
+
+@dataclass(frozen=True)
+class FieldSet:
+    """Поля ответа, выбранные параметром fields=.
+
+    items - пары (имя поля, вложенный FieldSet); None вместо вложенного
+    набора означает поле целиком. Неизменяемый, чтобы кэшировать по нему
+    суженные схемы.
+    """
+
+    items: Tuple[Tuple[str, Optional["FieldSet"]], ...]
+
+    @classmethod
+    def parse(cls, value: str) -> Optional["FieldSet"]:
+        """"id,class_obj.name" -> {id, class_obj: {name}}; пустая строка - None"""
+        tree: Dict[str, Optional[dict]] = {}
+        for path in value.split(","):
+            names = [name.strip() for name in path.split(".")]
+            if not all(names):
+                continue
+            node = tree
+            for name in names[:-1]:
+                if name in node and node[name] is None:
+                    # Поле уже выбрано целиком
+                    break
+                node = node.setdefault(name, {})
+            else:
+                node[names[-1]] = None
+        return cls._freeze(tree) if tree else None
+
+    @classmethod
+    def _freeze(cls, tree: Dict[str, Optional[dict]]) -> "FieldSet":
+        return cls(tuple(sorted((name, cls._freeze(child) if child else None) for name, child in tree.items())))
+
+    @property
+    def names(self) -> List[str]:
+        return [name for name, _ in self.items]
+
+    def child(self, name: str) -> Optional["FieldSet"]:
+        return dict(self.items).get(name)
+
+
+def _check(model: type, fields: FieldSet, prefix: str = "") -> None:
+    for name, child in fields.items:
+        field = model.model_fields.get(name)
+        if field is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown field: {prefix}{name}")
+        if child is not None:
+            kind, nested = _unwrap(field.annotation)
+            if kind is None:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Field has no subfields: {prefix}{name}")
+            _check(nested, child, f"{prefix}{name}.")
+
+
+def sparse_fields(schema: Any) -> Callable[..., Optional[FieldSet]]:
+    """Зависимость FastAPI: параметр fields= для схемы ответа schema.
+
+    Вложенные поля через точку: fields=id,status,class_obj.name.
+    Без параметра возвращает None - ответ полный.
+    """
+    _, model = _unwrap(schema)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description="Поля ответа через запятую, вложенные через точку (id,status,class_obj.name)"),
+    ) -> Optional[FieldSet]:
+        if fields is None:
+            return None
+        field_set = FieldSet.parse(fields)
+        if field_set is not None:
+            _check(model, field_set)
+        return field_set
+
+    return dependency
+
+
+def _with_nested(annotation: Any, nested: type) -> Any:
+    """Заменить схему в аннотации поля (Optional[X], List[X], X) на nested"""
+    if get_origin(annotation) in (Union, types.UnionType):
+        (arg,) = [arg for arg in get_args(annotation) if arg is not type(None)]
+        return Optional[_with_nested(arg, nested)]
+    if get_origin(annotation) in (list, List):
+        return List[nested]
+    return nested
+
+
+@lru_cache(maxsize=None)
+def _pruned_model(model: type, fields: FieldSet) -> type:
+    definitions = {}
+    selected = dict(fields.items)
+    # Порядок полей - как в полной схеме
+    for name, field in model.model_fields.items():
+        if name not in selected:
+            continue
+        child = selected[name]
+        annotation = field.annotation
+        if child is not None:
+            _, nested = _unwrap(annotation)
+            annotation = _with_nested(annotation, _pruned_model(nested, child))
+        default = ... if field.is_required() else field.get_default(call_default_factory=True)
+        definitions[name] = (annotation, default)
+    return create_model(f"{model.__name__}Fields", __config__=ConfigDict(from_attributes=True), **definitions)
+
+
+def prune(schema: Any, fields: Optional[FieldSet]) -> Any:
+    """Схема ответа только с выбранными полями (для serialize).
+
+    Валидаторы входных данных в суженную схему не переносятся: данные
+    пришли из БД. Невыбранные атрибуты ORM не читаются, поэтому не
+    вызывают ленивую загрузку.
+    """
+    if fields is None:
+        return schema
+    _, model = _unwrap(schema)
+    return _with_nested(schema, _pruned_model(model, fields))
+
+
+def _level_options(model: type, relations: Dict[str, dict], fields: Optional[FieldSet], keep: Iterable[Any]) -> List[Any]:
+    mapper = inspect(model)
+    options: List[Any] = []
+
+    # Поле, которого нет в модели (свойство схемы), может зависеть от чего
+    # угодно - такой уровень грузим полностью
+    if fields is not None and all(name in mapper.attrs for name in fields.names):
+        columns = list(keep)
+        for name in fields.names:
+            prop = mapper.attrs[name]
+            if isinstance(prop, RelationshipProperty):
+                # FK нужен для загрузки связи (или поиска в identity map)
+                columns.extend(mapper.get_property_by_column(column).class_attribute for column in prop.local_columns)
+            else:
+                columns.append(prop.class_attribute)
+        options.append(load_only(*columns))
+        relations = {name: sub for name, sub in relations.items() if name in fields.names}
+    else:
+        fields = None
+
+    for name, sub in relations.items():
+        loader = selectinload(getattr(model, name))
+        child_fields = fields.child(name) if fields is not None else None
+        child_options = _level_options(mapper.attrs[name].mapper.class_, sub, child_fields, ())
+        options.append(loader.options(*child_options) if child_options else loader)
+    return options
+
+
+def select_options(model: type, relations: Iterable[str], fields: Optional[FieldSet], keep: Iterable[Any] = ()) -> List[Any]:
+    """Опции загрузки списка под выбранные поля.
+
+    relations - связи для полного ответа ("athlete", "class_obj.coach").
+    С fields колонки сужаются до выбранных (load_only), а невыбранные связи
+    не загружаются. keep - колонки, нужные самой crud-функции (ключи
+    сортировки для курсора). Без fields - обычный selectinload всех связей.
+    """
+    tree: Dict[str, dict] = {}
+    for path in relations:
+        node = tree
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+    return _level_options(model, tree, fields, keep)
@@ -0,0 +1,82 @@
+from bisect import bisect_left
+from datetime import datetime
+from typing import Generic, Iterable, List, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class IntervalIndex(Generic[T]):
+    """Неизменяемый индекс полуоткрытых интервалов [start, end) с данными.
+
+    Интервалы отсортированы по началу, для каждой позиции хранится
+    наибольший конец среди интервалов до неё. Поиск пересечений: bisect до
+    первого интервала, начинающегося после конца запроса, и обратный проход,
+    пока наибольший конец левее ещё правее начала запроса - O(log n + k)
+    для расписаний без очень длинных интервалов.
+    """
+
+    def __init__(self, intervals: Iterable[Tuple[datetime, datetime, T]]):
+        self._intervals = sorted(intervals, key=lambda interval: interval[0])
+        self._starts = [start for start, _, _ in self._intervals]
+        self._max_ends: List[datetime] = []
+        for _, end, _ in self._intervals:
+            self._max_ends.append(max(end, self._max_ends[-1]) if self._max_ends else end)
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def spans(self) -> List[Tuple[datetime, datetime]]:
+        """Все интервалы по возрастанию начала, без данных"""
+        return [(start, end) for start, end, _ in self._intervals]
+
+    def overlapping(self, start: datetime, end: datetime) -> List[T]:
+        """Данные интервалов, пересекающихся с [start, end), по возрастанию начала"""
+        found = []
+        i = bisect_left(self._starts, end) - 1
+        while i >= 0 and self._max_ends[i] > start:
+            _, interval_end, item = self._intervals[i]
+            if interval_end > start:
+                found.append(item)
+            i -= 1
+        found.reverse()
+        return found
+
+
+def merge(intervals: Iterable[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """Объединить пересекающиеся и соприкасающиеся интервалы"""
+    merged: List[Tuple[datetime, datetime]] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract(
+    windows: Iterable[Tuple[datetime, datetime]],
+    busy: Iterable[Tuple[datetime, datetime]],
+) -> List[Tuple[datetime, datetime]]:
+    """Части windows, не покрытые busy.
+
+    Оба списка объединяются и сортируются, затем один проход двумя
+    указателями: O((n + m) log(n + m)) на сортировку и линейное вычитание.
+    """
+    busy = merge(busy)
+    free: List[Tuple[datetime, datetime]] = []
+    i = 0
+    for start, end in merge(windows):
+        # Занятость, закончившаяся до окна, не нужна и следующим окнам
+        while i < len(busy) and busy[i][1] <= start:
+            i += 1
+        cursor = start
+        j = i
+        while j < len(busy) and busy[j][0] < end:
+            if busy[j][0] > cursor:
+                free.append((cursor, busy[j][0]))
+            cursor = max(cursor, busy[j][1])
+            j += 1
+        if cursor < end:
+            free.append((cursor, end))
+    return free
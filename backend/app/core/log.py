@@ -0,0 +1,141 @@
+import atexit
+import logging
+import queue
+import random
+import sys
+import traceback
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+import orjson
+
+from app.config import settings
+
+# Атрибуты LogRecord, которые не считаются пользовательскими полями (extra=...)
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# Логгеры uvicorn настраивает сам и пишет в stdout синхронно - переводим в очередь
+_UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_listener: Optional[QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    """Одна запись - одна строка JSON; поля из extra=... попадают в запись как есть"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+# Аргументы, которые безопасно форматировать позже в другом потоке: неизменяемые
+_PRIMITIVES = (str, int, float, bool, type(None))
+
+
+def _deferrable(record: logging.LogRecord) -> bool:
+    if not isinstance(record.msg, str):
+        return False
+    args = record.args
+    if isinstance(args, dict):
+        args = args.values()
+    return all(isinstance(arg, _PRIMITIVES) for arg in args or ())
+
+
+class DeferredQueueHandler(QueueHandler):
+    """QueueHandler без форматирования в потоке event loop.
+
+    Стандартный prepare() форматирует сообщение при вызове logger.info(...),
+    то есть на event loop. Очередь здесь внутри процесса, поэтому запись с
+    аргументами-примитивами передаётся как есть, а msg % args и JSON собирает
+    поток QueueListener. Остальные аргументы (объекты ORM, списки) к тому
+    времени могут измениться или требовать сессию - их сообщение
+    форматируется сразу. Трассировку исключения тоже: кадры стека нельзя
+    читать из другого потока после того, как они продолжили выполняться.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if not _deferrable(record):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = "".join(traceback.format_exception(*record.exc_info)).rstrip()
+            record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает долю записей INFO и ниже для шумных логгеров (LOG_SAMPLE_RATES).
+
+    Предупреждения и ошибки проходят всегда.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        return rate is None or random.random() < rate
+
+    def _rate(self, name: str) -> Optional[float]:
+        # Ближайший родитель: "app.chat" действует и на "app.chat.websocket"
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return None
+
+
+def setup_logging() -> None:
+    """Настроить логирование приложения: очередь + фоновый поток записи.
+
+    Вызов на event loop только кладёт запись в очередь; форматирование и
+    запись в stdout выполняет QueueListener в отдельном потоке. Повторный
+    вызов ничего не делает.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JSONFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    if settings.LOG_SAMPLE_RATES:
+        queue_handler.addFilter(SamplingFilter(settings.LOG_SAMPLE_RATES))
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    for name in _UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    # SQL через общий конвейер; echo=True у движка добавил бы свой синхронный handler
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if settings.SQL_ECHO else logging.WARNING)
+
+    for name, level in settings.LOG_LEVELS.items():
+        logging.getLogger(name).setLevel(level.upper())
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_HEADER = settings.PROFILE_HEADER.lower().encode("latin-1")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for marker in ("site-packages", "app"):
+        index = filename.rfind(os.sep + marker + os.sep)
+        if index != -1:
+            filename = filename[index + 1:]
+            break
+    # ';' - разделитель кадров в свёрнутом формате
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})".replace(";", ":")
+
+
+class StackSampler:
+    """Сэмплирующий профилировщик: фоновый поток периодически снимает стек потока event loop.
+
+    Стеки копятся в свёрнутом формате (folded stacks), который понимают
+    flamegraph.pl, speedscope и inferno. Поток event loop общий, поэтому
+    в профиль попадают и сопрограммы параллельных запросов.
+    """
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stop.set()
+        # Поток может дописывать последний стек: ждём его вне event loop
+        await asyncio.to_thread(self._thread.join)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+                self.samples += 1
+
+    def folded(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class ProfileStore:
+    """Ограниченное локальное хранилище профилей (старые вытесняются)"""
+
+    def __init__(self, size: int):
+        self._profiles: Deque[Dict[str, Any]] = deque(maxlen=size)
+
+    def add(self, profile: Dict[str, Any]) -> None:
+        self._profiles.append(profile)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return list(reversed(self._profiles))
+
+    def get(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        for profile in self._profiles:
+            if profile["id"] == profile_id:
+                return profile
+        return None
+
+
+profile_store = ProfileStore(settings.PROFILE_STORE_SIZE)
+
+
+async def _authorize(scope) -> Optional[int]:
+    """Вернуть id главного тренера по Bearer-токену запроса или None"""
+    from fastapi import HTTPException, Request
+    from app.database import AsyncSessionLocal
+    from app.deps import get_current_user
+
+    authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    async with AsyncSessionLocal() as db:
+        try:
+            user = await get_current_user(request=Request(scope), token=token, db=db)
+        except HTTPException:
+            return None
+        return user.id if user.is_head_coach else None
+
+
+class ProfilingMiddleware:
+    """ASGI middleware: профилирует запрос, если передан заголовок PROFILE_HEADER.
+
+    Без заголовка запрос проходит напрямую - только проверка заголовков.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not any(name == _HEADER for name, _ in scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        user_id = await _authorize(scope)
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_with_profile_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode("latin-1"))
+                ]
+            await send(message)
+
+        sampler = StackSampler(threading.get_ident(), settings.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        started_at = datetime.utcnow()
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            await sampler.stop()
+            duration_ms = (time.perf_counter() - started) * 1000
+            profile_store.add({
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "user_id": user_id,
+                "started_at": started_at,
+                "duration_ms": round(duration_ms, 2),
+                "samples": sampler.samples,
+                "interval_ms": settings.PROFILE_SAMPLE_INTERVAL_MS,
+                "folded": sampler.folded(),
+            })
+            logger.info("Profiled %s %s in %.1f ms (%s)", scope["method"], scope["path"], duration_ms, profile_id)
@@ -0,0 +1,70 @@
+import time
+from typing import Dict, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.security import decode_access_token
+
+# Флаг в session.info: в транзакции были записи
+WROTE_KEY = "wrote"
+
+# Выше этого числа записей устаревшие окна вычищаются
+MAX_TRACKED_USERS = 10_000
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush(session, flush_context):
+    session.info[WROTE_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dml(orm_execute_state):
+    # insert_returning / update_returning пишут мимо flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE_KEY] = True
+
+
+def request_subject(request: Request) -> Optional[str]:
+    """ИИН из Bearer-токена запроса (без обращения к базе) или None"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_access_token(token)
+    return payload.get("sub") if payload else None
+
+
+class ReadYourWrites:
+    """Окна read-your-writes: после записи пользователь какое-то время читает с основной базы.
+
+    Реплика отстаёт на доли секунды, и без окна пользователь мог бы не увидеть
+    только что созданную запись. Состояние хранится в памяти процесса
+    (приложение запускается одним процессом uvicorn).
+    """
+
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._until: Dict[str, float] = {}
+
+    def mark(self, subject: str) -> None:
+        now = time.monotonic()
+        self._until[subject] = now + self.window_seconds
+        if len(self._until) > MAX_TRACKED_USERS:
+            self._until = {key: until for key, until in self._until.items() if until > now}
+
+    def is_recent(self, subject: str) -> bool:
+        until = self._until.get(subject)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            self._until.pop(subject, None)
+            return False
+        return True
+
+    def clear(self) -> None:
+        self._until.clear()
+
+
+read_your_writes = ReadYourWrites(settings.READ_YOUR_WRITES_SECONDS)
@@ -0,0 +1,121 @@
+import types
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union, get_args, get_origin
+
+from fastapi.responses import Response
+from pydantic import BaseModel, EmailStr, TypeAdapter
+
+_MISSING = object()
+
+
+@lru_cache(maxsize=None)
+def _adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def _unwrap(annotation: Any) -> Tuple[Optional[str], Any]:
+    """Определить, что лежит в поле: вложенная схема, список схем или обычное значение"""
+    if get_origin(annotation) in (Union, types.UnionType):
+        args = [arg for arg in get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            return None, None
+        annotation = args[0]
+    if get_origin(annotation) in (list, List):
+        (item,) = get_args(annotation) or (Any,)
+        if isinstance(item, type) and issubclass(item, BaseModel):
+            return "list", item
+        return None, None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return "model", annotation
+    return None, None
+
+
+@lru_cache(maxsize=None)
+def _is_constructible(model: type) -> bool:
+    """Можно ли собрать схему без валидации.
+
+    Валидаторы mode="after" только проверяют данные, уже проверенные при
+    записи в БД, их пропускаем. Валидаторы before/wrap/plain и model_validator
+    преобразуют значение - такие схемы валидируем как обычно.
+    """
+    decorators = model.__pydantic_decorators__
+    if decorators.model_validators:
+        return False
+    if any(d.info.mode != "after" for d in decorators.field_validators.values()):
+        return False
+    for field in model.model_fields.values():
+        kind, nested = _unwrap(field.annotation)
+        if kind and not _is_constructible(nested):
+            return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def _has_checks(model: type) -> bool:
+    """Есть ли в схеме проверки входных данных (валидаторы, EmailStr)"""
+    if model.__pydantic_decorators__.field_validators:
+        return True
+    for field in model.model_fields.values():
+        kind, nested = _unwrap(field.annotation)
+        if kind and _has_checks(nested):
+            return True
+        annotation = field.annotation
+        if get_origin(annotation) in (Union, types.UnionType):
+            if EmailStr in get_args(annotation):
+                return True
+        elif annotation is EmailStr:
+            return True
+    return False
+
+
+@lru_cache(maxsize=None)
+def _plan(model: type) -> Tuple[Tuple[str, Optional[str], Any, Any], ...]:
+    plan = []
+    for name, field in model.model_fields.items():
+        kind, nested = _unwrap(field.annotation)
+        default = _MISSING if field.is_required() else field.get_default(call_default_factory=True)
+        plan.append((name, kind, nested, default))
+    return tuple(plan)
+
+
+def _construct(model: type, obj: Any) -> BaseModel:
+    values = {}
+    for name, kind, nested, default in _plan(model):
+        value = getattr(obj, name, _MISSING)
+        if value is _MISSING:
+            if default is _MISSING:
+                raise AttributeError(f"{type(obj).__name__} has no attribute {name!r} required by {model.__name__}")
+            value = list(default) if isinstance(default, list) else default
+        elif value is not None and kind == "model":
+            value = _construct(nested, value)
+        elif value is not None and kind == "list":
+            value = [_construct(nested, item) for item in value]
+        values[name] = value
+    return model.model_construct(**values)
+
+
+def serialize(schema: Any, content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Сериализовать ORM-объекты сразу в JSON-байты.
+
+    Стандартный путь FastAPI валидирует объекты по response_model, выгружает
+    их в dict, прогоняет через jsonable_encoder и только потом кодирует JSON.
+    Здесь схемы собираются напрямую из атрибутов ORM (без повторной проверки
+    данных из БД), а JSON пишет pydantic-core. Схемы без проверок валидируются
+    from_attributes в pydantic-core - это быстрее сборки в Python.
+    response_model в декораторе оставляем для документации OpenAPI.
+    """
+    adapter = _adapter(schema)
+    kind, model = _unwrap(schema)
+    if kind and _has_checks(model) and _is_constructible(model):
+        if kind == "list":
+            data = [_construct(model, item) for item in content]
+        else:
+            data = _construct(model, content)
+    else:
+        data = adapter.validate_python(content, from_attributes=True)
+    return Response(
+        content=adapter.dump_json(data),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
@@ -0,0 +1,156 @@
+import asyncio
+import dataclasses
+import functools
+import hashlib
+import inspect
+from collections import Counter
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.common.pagination import Page
+from app.config import settings
+from app.database import replica_engine
+
+
+def _key_part(value: Any) -> Any:
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def session_source(db: Any) -> str:
+    """"replica" для сессий реплики (get_read_db), иначе "primary".
+
+    Без DATABASE_REPLICA_URL сессии реплики работают с основной базой
+    и тоже считаются primary.
+    """
+    bind = getattr(db, "bind", None)
+    return "replica" if replica_engine is not None and bind is replica_engine else "primary"
+
+
+def call_key(signature: inspect.Signature, db: Any, args: tuple, kwargs: dict) -> str:
+    """Ключ вызова crud-функции f(db, ...) по нормализованным аргументам.
+
+    Аргументы приводятся к именованным с подставленными значениями по
+    умолчанию, поэтому f(db), f(db, 6) и f(db, limit=6) дают один ключ.
+    От сессии в ключ входит только база (основная или реплика): реплика может
+    отставать, и её результат не должен доставаться чтениям с основной.
+    Если результат зависит от того, кто спрашивает, crud-функция получает это
+    явным аргументом (user_id и т.п.), и он попадает в ключ - чужие данные
+    между пользователями не смешиваются.
+    """
+    bound = signature.bind(None, *args, **kwargs)
+    bound.apply_defaults()
+    arguments = list(bound.arguments.items())[1:]
+    payload = orjson.dumps([session_source(db), *([name, _key_part(value)] for name, value in arguments)], default=str)
+    return hashlib.sha1(payload).hexdigest()
+
+
+def to_schema(adapter: TypeAdapter, result: Any) -> Any:
+    """Перевести ORM-результат (список, объект или Page) в схемы ответа.
+
+    Схемы не привязаны к сессии, их можно отдавать другим запросам.
+    """
+    if isinstance(result, Page):
+        return Page(items=adapter.validate_python(result.items, from_attributes=True), next_cursor=result.next_cursor)
+    return adapter.validate_python(result, from_attributes=True)
+
+
+class SingleFlight:
+    """Объединение одинаковых одновременных запросов.
+
+    Первый вызов с ключом выполняет запрос, остальные, пришедшие пока он
+    не закончился, ждут его результат (или исключение) вместо своего запроса.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.executed: Counter = Counter()
+        self.shared: Counter = Counter()
+
+    async def do(self, name: str, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await fn()
+
+        flight_key = f"{name}:{key}"
+        while True:
+            future = self._inflight.get(flight_key)
+            if future is None:
+                break
+            self.shared[name] += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # Запрос-лидер отменён (клиент отключился) - выполняем сами
+                self.shared[name] -= 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[flight_key] = future
+        self.executed[name] += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Исключение уже получит сам лидер; без этого asyncio ругается,
+            # если ожидающих не было
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(flight_key, None)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        functions = []
+        for name in sorted(set(self.executed) | set(self.shared)):
+            total = self.executed[name] + self.shared[name]
+            functions.append({
+                "name": name,
+                "executed": self.executed[name],
+                "shared": self.shared[name],
+                "coalescing_ratio": round(self.shared[name] / total, 3) if total else 0.0,
+            })
+        return functions
+
+    def reset_stats(self) -> None:
+        self.executed.clear()
+        self.shared.clear()
+
+
+single_flight = SingleFlight(enabled=settings.SINGLE_FLIGHT_ENABLED)
+
+
+def coalesced(schema: Any) -> Callable:
+    """Декоратор для crud-функций чтения f(db, ...) без кэширования.
+
+    Одновременные вызовы с одинаковыми аргументами выполняют один запрос к
+    базе; результат переводится в schema, чтобы ожидающие запросы не
+    получили ORM-объекты чужой сессии.
+    """
+    def decorator(func: Callable) -> Callable:
+        name = f"{func.__module__}.{func.__qualname__}"
+        adapter = TypeAdapter(schema)
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(db, *args, **kwargs):
+            async def run():
+                return to_schema(adapter, await func(db, *args, **kwargs))
+            return await single_flight.do(name, call_key(signature, db, args, kwargs), run)
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
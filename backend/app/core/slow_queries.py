@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from itertools import count
+from typing import Any, Deque, Dict, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Планы строим только для читающих запросов - EXPLAIN без ANALYZE их не выполняет
+EXPLAINABLE_PREFIXES = ("select", "with")
+
+# Не больше стольких EXPLAIN одновременно, чтобы не забирать пул соединений под нагрузкой
+MAX_PENDING_EXPLAINS = 4
+
+SKIP_OPTION = "slow_query_log_skip"
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Заменить значения параметров на их типы (ИИН, email и пароли не попадают в журнал)"""
+    if parameters is None:
+        return None
+    if isinstance(parameters, dict):
+        return {key: f"<{type(value).__name__}>" for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [f"<{type(value).__name__}>" for value in parameters]
+    return f"<{type(parameters).__name__}>"
+
+
+class SlowQueryLog:
+    """Кольцевой буфер медленных запросов с асинхронным получением плана"""
+
+    def __init__(self, threshold_ms: int, size: int):
+        self.threshold_ms = threshold_ms
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=size)
+        self._ids = count(1)
+        self._engine: Optional[AsyncEngine] = None
+        self._pending: Set[asyncio.Task] = set()
+
+    def install(self, engine: AsyncEngine) -> None:
+        """Подключить журнал к движку"""
+        self._engine = engine
+        event.listen(engine.sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine.sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine.sync_engine, "handle_error", self._handle_error)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Записи журнала, самые свежие первыми"""
+        return list(reversed(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_started", []).append(time.perf_counter())
+
+    def _handle_error(self, exception_context):
+        # after_cursor_execute не вызывается для упавшего запроса: без этого время
+        # его начала осталось бы в стеке, и следующий запрос получил бы чужое
+        conn = exception_context.connection
+        if conn is None or getattr(exception_context, "execution_context", None) is None:
+            return
+        started = conn.info.get("slow_query_started")
+        if started:
+            started.pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["slow_query_started"].pop()
+        duration_ms = (time.perf_counter() - started) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        if context is not None and context.execution_options.get(SKIP_OPTION):
+            return
+
+        entry = {
+            "id": next(self._ids),
+            "statement": statement,
+            "parameters": redact_parameters(parameters),
+            "duration_ms": round(duration_ms, 2),
+            "executemany": executemany,
+            "captured_at": datetime.utcnow(),
+            "plan": None,
+            "plan_error": None,
+        }
+        self._entries.append(entry)
+        logger.warning("Slow query %.1f ms: %s", duration_ms, statement.split("\n", 1)[0])
+
+        if not executemany and statement.lstrip().lower().startswith(EXPLAINABLE_PREFIXES):
+            self._schedule_explain(entry, statement, parameters)
+
+    def _schedule_explain(self, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        if self._engine is None or len(self._pending) >= MAX_PENDING_EXPLAINS:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = loop.create_task(self._explain(entry, statement, parameters))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _explain(self, entry: Dict[str, Any], statement: str, parameters: Any) -> None:
+        """Получить план отдельным соединением, не задерживая исходный запрос"""
+        try:
+            async with self._engine.connect() as conn:
+                result = await conn.exec_driver_sql(
+                    f"EXPLAIN (ANALYZE off) {statement}",
+                    parameters,
+                    execution_options={SKIP_OPTION: True},
+                )
+                entry["plan"] = "\n".join(row[0] for row in result)
+        except Exception as e:
+            # Берём исходную ошибку драйвера: текст SQLAlchemy содержит значения параметров
+            entry["plan_error"] = str(getattr(e, "orig", None) or e)
+
+
+slow_query_log = SlowQueryLog(settings.SLOW_QUERY_THRESHOLD_MS, settings.SLOW_QUERY_LOG_SIZE)
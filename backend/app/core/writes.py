@@ -0,0 +1,124 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type, TypeVar
+
+from sqlalchemy import inspect, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import object_mapper
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+T = TypeVar("T")
+
+
+def _tree(paths: Iterable[str]) -> Dict[str, dict]:
+    """("class_obj.coach", "athlete") -> {"class_obj": {"coach": {}}, "athlete": {}}"""
+    tree: Dict[str, dict] = {}
+    for path in paths:
+        node = tree
+        for name in path.split("."):
+            node = node.setdefault(name, {})
+    return tree
+
+
+async def hydrate(db: AsyncSession, objects: Sequence[Any], paths: Iterable[str]) -> None:
+    """Заполнить связи many-to-one у объектов.
+
+    Связанные объекты сначала ищутся в identity map сессии: пользователь из
+    get_current_user и сущности, загруженные роутером для проверок, уже там.
+    Недостающие догружаются одним SELECT ... IN на тип.
+    """
+    await _hydrate(db, [obj for obj in objects if obj is not None], _tree(paths))
+
+
+async def _hydrate(db: AsyncSession, objects: List[Any], tree: Dict[str, dict]) -> None:
+    if not objects:
+        return
+
+    for name, children in tree.items():
+        prop = object_mapper(objects[0]).relationships[name]
+        if prop.uselist or len(prop.local_columns) != 1:
+            raise ValueError(f"hydrate supports only simple many-to-one relationships, got {name!r}")
+        (local_column,) = prop.local_columns
+        fk_attr = object_mapper(objects[0]).get_property_by_column(local_column).key
+        target = prop.mapper.class_
+
+        found: Dict[Any, Any] = {}
+        missing = set()
+        for obj in objects:
+            ident = getattr(obj, fk_attr)
+            if ident is None or ident in found:
+                continue
+            cached = db.sync_session.identity_map.get(identity_key(target, ident))
+            if cached is not None:
+                found[ident] = cached
+            else:
+                missing.add(ident)
+
+        if missing:
+            (pk,) = inspect(target).primary_key
+            result = await db.execute(select(target).where(pk.in_(missing)))
+            for related in result.scalars():
+                found[getattr(related, pk.key)] = related
+
+        for obj in objects:
+            set_committed_value(obj, name, found.get(getattr(obj, fk_attr)))
+
+        if children:
+            await _hydrate(db, list(found.values()), children)
+
+
+async def insert_returning(db: AsyncSession, model: Type[T], values: Dict[str, Any], load: Iterable[str] = ()) -> T:
+    """INSERT ... RETURNING одним запросом вместо add + commit + refresh + повторного SELECT"""
+    result = await db.execute(insert(model).values(**values).returning(model))
+    obj = result.scalar_one()
+    await hydrate(db, [obj], load)
+    return obj
+
+
+async def insert_many_returning(db: AsyncSession, model: Type[T], rows: List[Dict[str, Any]], load: Iterable[str] = ()) -> List[T]:
+    """Многострочный INSERT ... VALUES (...), (...) RETURNING одним запросом"""
+    if not rows:
+        return []
+    result = await db.execute(insert(model).values(rows).returning(model))
+    objects = list(result.scalars().all())
+    await hydrate(db, objects, load)
+    return objects
+
+
+async def update_returning(
+    db: AsyncSession,
+    model: Type[T],
+    ident: Any,
+    values: Dict[str, Any],
+    load: Iterable[str] = (),
+    where: Iterable[Any] = (),
+) -> Optional[T]:
+    """UPDATE ... WHERE id = ... RETURNING. Возвращает None, если строки нет.
+
+    where - дополнительные условия (например, допустимый исходный статус):
+    проверка и запись одним запросом, без гонки с параллельным изменением.
+    Объект, уже загруженный в сессию, обновляется на месте (synchronize_session
+    по умолчанию), его загруженные связи сохраняются.
+    """
+    (pk,) = inspect(model).primary_key
+    result = await db.execute(
+        update(model)
+        .where(pk == ident, *where)
+        .values(**values)
+        .returning(model)
+    )
+    obj = result.scalar_one_or_none()
+    await hydrate(db, [obj], load)
+    return obj
+
+
+def dialect_insert(db: AsyncSession, model: Type[T]):
+    """insert() диалекта базы сессии - с on_conflict_do_nothing/on_conflict_do_update.
+
+    В приложении это PostgreSQL; SQLite поддерживает тот же ON CONFLICT и
+    используется для локальных проверок.
+    """
+    if db.bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+        return sqlite_insert(model)
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    return pg_insert(model)
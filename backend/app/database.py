@@ -1,13 +1,31 @@
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.config import settings
+from app.core.slow_queries import slow_query_log
 
 Base = declarative_base()
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+# SQL в лог включается настройкой SQL_ECHO (app.core.log), не echo=True
+engine = create_async_engine(settings.DATABASE_URL)
+
+if settings.SLOW_QUERY_LOG_ENABLED:
+    slow_query_log.install(engine)
 
 AsyncSessionLocal = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
     expire_on_commit=False,
+)
+
+# Без DATABASE_REPLICA_URL сессии "реплики" работают с основной базой
+replica_engine = (
+    create_async_engine(settings.DATABASE_REPLICA_URL)
+    if settings.DATABASE_REPLICA_URL
+    else None
+)
+
+ReplicaSessionLocal = async_sessionmaker(
+    bind=replica_engine or engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
 )
\ No newline at end of file
@@ -1,23 +1,74 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import AsyncSessionLocal
+from app.database import AsyncSessionLocal, ReplicaSessionLocal, replica_engine
+from app.core.replica import WROTE_KEY, read_your_writes, request_subject
+from app.core.cache import CACHE_TAGS_KEY, cache
+from app.jobs.crud import JOBS_ENQUEUED_KEY
+from app.jobs.worker import worker
+from app.config import settings
 from app.core.security import decode_access_token
 from app.users import crud
 from app.users.schemas import UserRole
 
 # Database dependency
-async def get_db():
-    async with AsyncSessionLocal() as session:  
+async def get_db(request: Request):
+    """Сессия на запрос с одной транзакцией (unit of work).
+
+    crud-функции только делают flush; фиксация происходит здесь один раз после
+    обработчика, при любом исключении (включая HTTPException) - откат.
+    """
+    async with AsyncSessionLocal() as session:
+        try:
+            yield session
+        except BaseException:
+            await session.rollback()
+            raise
+        else:
+            await session.commit()
+            tags = session.info.pop(CACHE_TAGS_KEY, None)
+            if tags:
+                await cache.invalidate_tags(
+                    tags,
+                    repeat_after=settings.READ_YOUR_WRITES_SECONDS if replica_engine is not None else None,
+                )
+            if session.info.pop(JOBS_ENQUEUED_KEY, False):
+                worker.wake()
+            if session.info.pop(WROTE_KEY, False) and replica_engine is not None:
+                subject = request_subject(request)
+                if subject:
+                    read_your_writes.mark(subject)
+
+async def get_read_db(request: Request):
+    """Сессия для GET-эндпоинтов, которые только читают.
+
+    Если настроена реплика, запросы идут на неё, кроме пользователей,
+    писавших в последние READ_YOUR_WRITES_SECONDS: им отвечает основная база.
+    """
+    session_factory = ReplicaSessionLocal
+    if replica_engine is not None:
+        subject = request_subject(request)
+        if subject and read_your_writes.is_recent(subject):
+            session_factory = AsyncSessionLocal
+    async with session_factory() as session:
         yield session
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="users/login")
 
+# Ключ ASGI scope с пользователем, уже аутентифицированным запросом /batch
+BATCH_USER_KEY = "batch_user"
+
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
     db: AsyncSession = Depends(get_db)
 ):
+    # Подзапрос чтения из /batch: токен проверен запросом пакета
+    batch_user = request.scope.get(BATCH_USER_KEY)
+    if batch_user is not None:
+        return batch_user
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -50,6 +101,15 @@ def get_current_user_by_role(required_role: UserRole):
         return user
     return role_checker
 
+async def get_current_head_coach(user=Depends(get_current_user)):
+    """Доступ только для главного тренера (служебные эндпоинты)"""
+    if not user.is_head_coach:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only head coach can access this endpoint",
+        )
+    return user
+
 # Асинхронная функция аутентификации для WebSocket
 async def get_current_user_websocket(token: str):
     """Authenticate user for WebSocket connections"""
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from app.feedback import crud, schemas
 from app.deps import get_db, get_current_user
+from app.common.pagination import PageParams, optional_page_params
 
 router = APIRouter()
 
@@ -17,7 +18,11 @@ async def post_feedback(
 @router.get("/trainer/{trainer_id}", response_model=List[schemas.FeedbackResponse])
 async def get_trainer_feedback(
     trainer_id: int,
+    response: Response,
+    page: PageParams = Depends(optional_page_params),
     db: AsyncSession = Depends(get_db),
     current_user=Depends(get_current_user)
 ):
-    return await crud.get_feedback_for_trainer(db, trainer_id)
+    feedbacks = await crud.get_feedback_for_trainer(db, trainer_id, page)
+    response.headers.update(feedbacks.headers())
+    return feedbacks.items
@@ -0,0 +1 @@
+# Background jobs module (DB-backed queue)
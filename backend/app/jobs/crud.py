@@ -0,0 +1,195 @@
+import random
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.writes import dialect_insert
+from app.jobs.models import Job, JobStatus
+from app.common.pagination import Page, PageParams, paginate
+
+# Флаг в session.info: в транзакции поставлены задачи - разбудить воркер после COMMIT
+JOBS_ENQUEUED_KEY = "jobs_enqueued"
+
+# last_error задачи, аренда которой истекла на последней попытке
+LEASE_EXPIRED_ERROR = "Lease expired on the last attempt: the worker did not finish the job"
+
+
+async def enqueue(
+    db: AsyncSession,
+    name: str,
+    payload: Optional[Dict[str, Any]] = None,
+    key: Optional[str] = None,
+    run_at: Optional[datetime] = None,
+    max_attempts: Optional[int] = None,
+) -> None:
+    """Поставить задачу в очередь в текущей транзакции.
+
+    Задача видна воркеру только после COMMIT запроса и пропадает вместе с
+    его откатом. key - ключ идемпотентности: задача с уже использованным
+    ключом не создаётся (INSERT ... ON CONFLICT DO NOTHING).
+    """
+    stmt = dialect_insert(db, Job).values(
+        name=name,
+        payload=payload or {},
+        idempotency_key=key,
+        run_at=run_at or datetime.utcnow(),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+    if key is not None:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Job.idempotency_key])
+    await db.execute(stmt)
+    db.info[JOBS_ENQUEUED_KEY] = True
+
+
+async def enqueue_many(db: AsyncSession, name: str, jobs: List[Tuple[Dict[str, Any], str]]) -> None:
+    """Поставить пачку однотипных задач одним многострочным INSERT.
+
+    jobs - пары (payload, ключ идемпотентности); задачи с уже
+    использованными ключами пропускаются, как в enqueue.
+    """
+    if not jobs:
+        return
+    now = datetime.utcnow()
+    rows = [
+        {
+            "name": name,
+            "payload": payload,
+            "idempotency_key": key,
+            "run_at": now,
+            "max_attempts": settings.JOBS_MAX_ATTEMPTS,
+        }
+        for payload, key in jobs
+    ]
+    await db.execute(
+        dialect_insert(db, Job).values(rows).on_conflict_do_nothing(index_elements=[Job.idempotency_key])
+    )
+    db.info[JOBS_ENQUEUED_KEY] = True
+
+
+async def claim_jobs(db: AsyncSession, limit: int) -> List[Job]:
+    """Взять до limit готовых задач и продлить их аренду.
+
+    FOR UPDATE SKIP LOCKED: параллельные воркеры (в других процессах)
+    пропускают строки, которые уже берёт кто-то другой, и не ждут их.
+    Задачи running с истёкшей арендой (воркер упал) забираются снова, если
+    попытки не кончились, иначе переводятся в failed.
+    """
+    now = datetime.utcnow()
+    expired = and_(Job.status == JobStatus.running, Job.locked_until < now)
+    # Задача, на которой воркер падает каждый раз, не должна забираться бесконечно
+    await db.execute(
+        update(Job)
+        .where(expired, Job.attempts >= Job.max_attempts)
+        .values(status=JobStatus.failed, locked_until=None, finished_at=now, updated_at=now, last_error=LEASE_EXPIRED_ERROR)
+        .execution_options(synchronize_session=False)
+    )
+    ready = (
+        select(Job.id)
+        .where(
+            or_(
+                and_(Job.status == JobStatus.pending, Job.run_at <= now),
+                and_(expired, Job.attempts < Job.max_attempts),
+            )
+        )
+        .order_by(Job.run_at, Job.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(Job)
+        .where(Job.id.in_(ready.scalar_subquery()))
+        .values(
+            status=JobStatus.running,
+            attempts=Job.attempts + 1,
+            locked_until=now + timedelta(seconds=settings.JOBS_LEASE_SECONDS),
+            updated_at=now,
+        )
+        .returning(Job)
+        .execution_options(synchronize_session=False)
+    )
+    return list(result.scalars().all())
+
+
+async def complete_job(db: AsyncSession, job_id: int) -> None:
+    """Отметить задачу выполненной (в транзакции обработчика)"""
+    now = datetime.utcnow()
+    await db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(status=JobStatus.done, locked_until=None, finished_at=now, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def purge_done_jobs(db: AsyncSession, before: datetime, limit: int) -> int:
+    """Удалить до limit выполненных задач, завершённых раньше before.
+
+    Ключи идемпотентности удалённых задач снова свободны: срок хранения
+    должен быть больше, чем интервал, в котором задачу могут поставить повторно.
+    """
+    batch = (
+        select(Job.id)
+        .where(Job.status == JobStatus.done, Job.finished_at < before)
+        .order_by(Job.finished_at)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    result = await db.execute(delete(Job).where(Job.id.in_(batch)).execution_options(synchronize_session=False))
+    return result.rowcount
+
+
+def retry_delay(attempts: int) -> float:
+    """Экспоненциальная задержка перед повтором со случайным разбросом"""
+    delay = min(settings.JOBS_RETRY_MAX_SECONDS, settings.JOBS_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+async def fail_job(db: AsyncSession, job_id: int, attempts: int, max_attempts: int, error: str) -> JobStatus:
+    """Записать ошибку: повтор позже или failed, если попытки кончились"""
+    now = datetime.utcnow()
+    if attempts >= max_attempts:
+        values = {"status": JobStatus.failed, "finished_at": now}
+    else:
+        values = {"status": JobStatus.pending, "run_at": now + timedelta(seconds=retry_delay(attempts))}
+    await db.execute(
+        update(Job)
+        .where(Job.id == job_id)
+        .values(locked_until=None, last_error=error, updated_at=now, **values)
+        .execution_options(synchronize_session=False)
+    )
+    return values["status"]
+
+
+async def get_job_stats(db: AsyncSession) -> List[Dict[str, Any]]:
+    """Число задач по обработчику и статусу"""
+    result = await db.execute(
+        select(Job.name, Job.status, func.count())
+        .group_by(Job.name, Job.status)
+        .order_by(Job.name, Job.status)
+    )
+    return [{"name": name, "status": status, "count": count} for name, status, count in result.all()]
+
+
+async def get_jobs(db: AsyncSession, status: Optional[JobStatus] = None, page: Optional[PageParams] = None) -> Page[Job]:
+    """Список задач, новые первыми"""
+    query = select(Job)
+    if status:
+        query = query.where(Job.status == status)
+    return await paginate(db, query, [(Job.created_at, True), (Job.id, True)], page)
+
+
+async def retry_job(db: AsyncSession, job_id: int) -> Optional[Job]:
+    """Вернуть задачу failed в очередь с новым набором попыток"""
+    result = await db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.status == JobStatus.failed)
+        .values(status=JobStatus.pending, attempts=0, run_at=datetime.utcnow(), finished_at=None, updated_at=datetime.utcnow())
+        .returning(Job)
+    )
+    job = result.scalar_one_or_none()
+    if job:
+        db.info[JOBS_ENQUEUED_KEY] = True
+    return job
@@ -0,0 +1,6 @@
+# Модули с обработчиками задач: импорт регистрирует их в app.jobs.registry
+from app.progress import jobs as progress_jobs  # noqa: F401
+from app.notifications import jobs as notifications_jobs  # noqa: F401
+from app.classes import jobs as classes_jobs  # noqa: F401
+from app.bookings import jobs as bookings_jobs  # noqa: F401
+from app.jobs import retention as jobs_retention  # noqa: F401
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, Enum as SqlEnum, DateTime, Text, JSON, Index, text
+from app.database import Base
+from enum import Enum
+from datetime import datetime
+
+class JobStatus(str, Enum):
+    pending = "pending"  # ждёт run_at
+    running = "running"  # взята воркером до locked_until
+    done = "done"
+    failed = "failed"  # исчерпаны попытки
+
+class Job(Base):
+    """Фоновая задача: пишется в транзакции запроса, выполняется воркером"""
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Выборка готовых задач воркером и возврат задач с истёкшей арендой
+        Index("ix_jobs_pending_run_at", "run_at", "id", postgresql_where=text("status = 'pending'")),
+        Index("ix_jobs_running_locked_until", "locked_until", postgresql_where=text("status = 'running'")),
+        # Удаление старых выполненных задач (jobs.purge_done)
+        Index("ix_jobs_done_finished_at", "finished_at", postgresql_where=text("status = 'done'")),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)  # имя обработчика, например "progress.tournament_achievement"
+    payload = Column(JSON, nullable=False, default=dict)  # именованные аргументы обработчика
+    # Повторная постановка задачи с тем же ключом игнорируется
+    idempotency_key = Column(String, unique=True, nullable=True)
+
+    status = Column(SqlEnum(JobStatus), nullable=False, default=JobStatus.pending)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # не раньше этого времени
+    locked_until = Column(DateTime, nullable=True)  # аренда воркера; после неё задачу заберёт другой
+    last_error = Column(Text, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
@@ -0,0 +1,40 @@
+from typing import Awaitable, Callable, Dict, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Обработчик получает сессию воркера и payload задачи именованными аргументами
+JobHandler = Callable[..., Awaitable[None]]
+
+HANDLERS: Dict[str, JobHandler] = {}
+
+# Периодические задачи: имя -> интервал в секундах
+SCHEDULES: Dict[str, float] = {}
+
+
+def job(name: str, every: Optional[float] = None) -> Callable[[JobHandler], JobHandler]:
+    """Зарегистрировать обработчик задачи: async def handler(db, **payload).
+
+    Обработчик выполняется в одной транзакции с отметкой о выполнении
+    задачи, поэтому записи в базу происходят ровно один раз. Внешние эффекты
+    (push и т.п.) при повторе после сбоя могут выполниться ещё раз.
+    Переданную сессию обработчик не фиксирует сам: работу, которую нужно
+    фиксировать частями (пачки периодической очистки), он ведёт в своих
+    сессиях, и повтор должен быть к ним безопасен.
+    every - ставить задачу без аргументов раз в every секунд (см. Worker).
+    """
+    def decorator(handler: JobHandler) -> JobHandler:
+        if name in HANDLERS:
+            raise ValueError(f"Job handler {name!r} is already registered")
+        HANDLERS[name] = handler
+        if every is not None:
+            SCHEDULES[name] = every
+        return handler
+
+    return decorator
+
+
+async def run_handler(db: AsyncSession, name: str, payload: dict) -> None:
+    handler = HANDLERS.get(name)
+    if handler is None:
+        raise LookupError(f"No handler registered for job {name!r}")
+    await handler(db, **payload)
@@ -0,0 +1,32 @@
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.jobs import crud
+from app.jobs.registry import job
+
+logger = logging.getLogger(__name__)
+
+
+@job("jobs.purge_done", every=settings.JOBS_RETENTION_INTERVAL_SECONDS)
+async def purge_done(db: AsyncSession) -> None:
+    """Удалить выполненные задачи старше JOBS_RETENTION_DAYS.
+
+    Удаление идёт пачками, каждая в своей транзакции: таблица jobs не
+    блокируется надолго, а повтор после сбоя продолжит с оставшихся строк.
+    Задачи failed остаются для разбора и повтора из админки.
+    """
+    before = datetime.utcnow() - timedelta(days=settings.JOBS_RETENTION_DAYS)
+    purged = 0
+    while True:
+        async with AsyncSessionLocal() as batch:
+            count = await crud.purge_done_jobs(batch, before, settings.JOBS_RETENTION_BATCH_SIZE)
+            await batch.commit()
+        purged += count
+        if count < settings.JOBS_RETENTION_BATCH_SIZE:
+            break
+    if purged:
+        logger.info("Purged %s done jobs finished before %s", purged, before)
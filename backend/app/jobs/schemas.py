@@ -0,0 +1,24 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict, Optional
+from datetime import datetime
+from app.jobs.models import JobStatus
+
+class JobOut(BaseModel):
+    id: int
+    name: str
+    payload: Dict[str, Any]
+    idempotency_key: Optional[str] = None
+    status: JobStatus
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    last_error: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+class JobStatsOut(BaseModel):
+    name: str
+    status: JobStatus
+    count: int
@@ -0,0 +1,182 @@
+"""Воркер фоновых задач.
+
+Работает внутри процесса uvicorn (JOBS_WORKER_ENABLED, запускается в lifespan
+приложения) или отдельным процессом:
+    python -m app.jobs.worker
+Несколько воркеров (процессы uvicorn, отдельные воркеры) делят одну очередь:
+задачи разбираются через SELECT ... FOR UPDATE SKIP LOCKED.
+"""
+import asyncio
+import logging
+import signal
+import time
+from typing import Dict, Optional, Set
+
+from app.config import settings
+from app.core.cache import CACHE_TAGS_KEY, cache
+from app.database import AsyncSessionLocal
+from app.jobs import crud
+from app.jobs.models import Job
+from app.jobs.registry import SCHEDULES, run_handler
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Пул из concurrency асинхронных задач, опрашивающий таблицу jobs"""
+
+    def __init__(self, concurrency: int, poll_interval: float):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self._tasks: Set[asyncio.Task] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._runner: Optional[asyncio.Task] = None
+        self._stopping = False
+        # Последний интервал, за который поставлена каждая периодическая задача
+        self._periods: Dict[str, int] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._runner is not None and not self._runner.done()
+
+    def start(self) -> None:
+        # Регистрация обработчиков: импорт модулей с @job
+        import app.jobs.handlers  # noqa: F401
+
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._runner = asyncio.create_task(self._run(), name="jobs-worker")
+        logger.info("Job worker started (concurrency %s)", self.concurrency)
+
+    def wake(self) -> None:
+        """Проверить очередь сейчас, не дожидаясь интервала опроса"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Дождаться выполняемых задач; незавершённые за timeout отменяются
+        и после окончания аренды выполнятся снова"""
+        if self._runner is None:
+            return
+        self._stopping = True
+        self.wake()
+        await self._runner
+        if self._tasks:
+            _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        self._runner = None
+        logger.info("Job worker stopped")
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wake.clear()
+            await self._schedule_periodic()
+            claimed = await self._claim(self.concurrency - len(self._tasks))
+            for job in claimed:
+                task = asyncio.create_task(self._execute(job))
+                self._tasks.add(task)
+                task.add_done_callback(self._finished)
+            if claimed:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self, limit: int) -> list:
+        if limit <= 0:
+            return []
+        try:
+            async with AsyncSessionLocal() as db:
+                jobs = await crud.claim_jobs(db, limit)
+                await db.commit()
+                return jobs
+        except Exception:
+            logger.exception("Job polling failed")
+            return []
+
+    async def _schedule_periodic(self) -> None:
+        """Поставить периодические задачи, у которых начался новый интервал.
+
+        Ключ идемпотентности содержит номер интервала, поэтому несколько
+        воркеров ставят каждую задачу один раз за интервал.
+        """
+        now = time.time()
+        due = {
+            name: int(now // every)
+            for name, every in SCHEDULES.items()
+            if self._periods.get(name) != int(now // every)
+        }
+        if not due:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                for name, period in due.items():
+                    await crud.enqueue(db, name, key=f"periodic:{name}:{period}")
+                await db.commit()
+        except Exception:
+            logger.exception("Could not schedule periodic jobs")
+            return
+        self._periods.update(due)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        # Освободился слот - можно брать следующую задачу
+        self.wake()
+
+    async def _execute(self, job: Job) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                try:
+                    await run_handler(db, job.name, job.payload)
+                    await crud.complete_job(db, job.id)
+                except BaseException:
+                    await db.rollback()
+                    raise
+                await db.commit()
+                tags = db.info.pop(CACHE_TAGS_KEY, None)
+                if tags:
+                    await cache.invalidate_tags(tags)
+                if db.info.pop(crud.JOBS_ENQUEUED_KEY, False):
+                    self.wake()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await self._record_failure(job, e)
+
+    async def _record_failure(self, job: Job, error: Exception) -> None:
+        try:
+            async with AsyncSessionLocal() as db:
+                status = await crud.fail_job(db, job.id, job.attempts, job.max_attempts, f"{type(error).__name__}: {error}")
+                await db.commit()
+        except Exception:
+            logger.exception("Could not record failure of job %s", job.id)
+            return
+        logger.warning(
+            "Job %s (%s) failed on attempt %s/%s, now %s",
+            job.id, job.name, job.attempts, job.max_attempts, status.value,
+            exc_info=error,
+        )
+
+
+worker = Worker(concurrency=settings.JOBS_CONCURRENCY, poll_interval=settings.JOBS_POLL_INTERVAL_SECONDS)
+
+
+async def main() -> None:
+    from app.core.log import setup_logging
+
+    setup_logging()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    worker.start()
+    await stop.wait()
+    await worker.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,4 +1,6 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse
 from app.users.router import router as users_router
 from app.classes.router import router as classes_router  
 from app.bookings.router import router as bookings_router
@@ -8,14 +10,46 @@ from app.merchandise.router import router as merchandise_router
 from app.chat.router import router as chat_router
 from app.chat.websocket import websocket_endpoint
 from app.feedback.router import router as feedback_router
+from app.admin.router import router as admin_router
+from app.batch.router import router as batch_router
+from app.config import settings
+from app.core.log import setup_logging
+from app.jobs.worker import worker
+from app.core.profiling import ProfilingMiddleware
+from app.core.conditional import ConditionalGetMiddleware
+from app.common.pagination import InvalidCursor
 from app import models  # Import models to ensure they are registered
 
+setup_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Воркер фоновых задач в процессе приложения (или отдельно: python -m app.jobs.worker)
+    if settings.JOBS_WORKER_ENABLED:
+        worker.start()
+    yield
+    if settings.JOBS_WORKER_ENABLED:
+        await worker.stop()
+
 app = FastAPI(
     title="AIGA Connect API",
     description="MVP API для управления грэпплинг клубом",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
+@app.exception_handler(InvalidCursor)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursor):
+    return ORJSONResponse(status_code=400, content={"detail": str(exc)})
+
+# 304 Not Modified для GET-ответов с ETag, совпавшим с If-None-Match
+app.add_middleware(ConditionalGetMiddleware)
+
+# Профилирование запроса по заголовку X-Profile (только главный тренер)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
 app.include_router(users_router, prefix="/users", tags=["users"])
 app.include_router(classes_router, prefix="/classes", tags=["classes"])
 app.include_router(bookings_router, prefix="/bookings", tags=["bookings"])
@@ -33,4 +67,6 @@ async def websocket_chat_endpoint(websocket, room_id: int, token: str):
 def read_root():
     return {"message": "AIGA Connect - Грэпплинг клуб MVP backend", "version": "1.0.0"}
     
-app.include_router(feedback_router, prefix="/feedback", tags=["feedback"])
\ No newline at end of file
+app.include_router(feedback_router, prefix="/feedback", tags=["feedback"])
+app.include_router(admin_router, prefix="/admin", tags=["admin"])
+app.include_router(batch_router, prefix="/batch", tags=["batch"])
\ No newline at end of file
@@ -4,14 +4,19 @@ from sqlalchemy.orm import selectinload
 from sqlalchemy import and_, or_, desc, func, asc
 from typing import List, Optional
 from datetime import datetime
+import logging
 import re
 
 from app.merchandise.models import Product, ProductVariant, ProductCollection, ProductStatus
 from app.merchandise.schemas import (
     ProductCreate, ProductUpdate, ProductFilters, ProductListResponse,
     ProductVariantCreate, ProductVariantUpdate,
-    ProductCollectionCreate, ProductCollectionUpdate
+    ProductCollectionCreate, ProductCollectionUpdate,
+    ProductOut, ProductCollectionOut
 )
+from app.core.cache import cached, invalidate
+
+logger = logging.getLogger(__name__)
 
 # Product CRUD
 async def create_product(db: AsyncSession, product_data: ProductCreate) -> Product:
@@ -23,8 +28,8 @@ async def create_product(db: AsyncSession, product_data: ProductCreate) -> Produ
     
     product = Product(**product_data.model_dump())
     db.add(product)
-    await db.commit()
-    await db.refresh(product)
+    await db.flush()
+    invalidate(db, "merchandise")
     return product
 
 async def get_product(db: AsyncSession, product_id: int) -> Optional[Product]:
@@ -125,6 +130,7 @@ async def get_products_with_filters(
         pages=pages
     )
 
+@cached(List[ProductOut], tags=("merchandise",))
 async def get_featured_products(db: AsyncSession, limit: int = 6) -> List[Product]:
     """Получить рекомендуемые товары"""
     result = await db.execute(
@@ -150,8 +156,8 @@ async def update_product(db: AsyncSession, product_id: int, product_data: Produc
         setattr(product, field, value)
     
     product.updated_at = datetime.utcnow()
-    await db.commit()
-    await db.refresh(product)
+    await db.flush()
+    invalidate(db, "merchandise")
     return product
 
 async def delete_product(db: AsyncSession, product_id: int) -> bool:
@@ -165,7 +171,8 @@ async def delete_product(db: AsyncSession, product_id: int) -> bool:
         return False
     
     await db.delete(product)
-    await db.commit()
+    await db.flush()
+    invalidate(db, "merchandise")
     return True
 
 # Product Variant CRUD
@@ -179,8 +186,8 @@ async def create_product_variant(db: AsyncSession, variant_data: ProductVariantC
     if product:
         product.has_variants = True
     
-    await db.commit()
-    await db.refresh(variant)
+    await db.flush()
+    invalidate(db, "merchandise")
     return variant
 
 async def get_product_variants(db: AsyncSession, product_id: int) -> List[ProductVariant]:
@@ -197,10 +204,11 @@ async def create_collection(db: AsyncSession, collection_data: ProductCollection
     """Создать коллекцию"""
     collection = ProductCollection(**collection_data.model_dump())
     db.add(collection)
-    await db.commit()
-    await db.refresh(collection)
+    await db.flush()
+    invalidate(db, "merchandise")
     return collection
 
+@cached(List[ProductCollectionOut], tags=("merchandise",))
 async def get_collections(db: AsyncSession, is_featured: Optional[bool] = None) -> List[ProductCollection]:
     """Получить коллекции"""
     try:
@@ -221,8 +229,8 @@ async def get_collections(db: AsyncSession, is_featured: Optional[bool] = None)
                 valid_collections.append(collection)
         
         return valid_collections
-    except Exception as e:
-        print(f"Error in get_collections: {e}")
+    except Exception:
+        logger.exception("Error in get_collections")
         return []
 
 async def get_collection_with_products(db: AsyncSession, collection_id: int) -> Optional[ProductCollection]:
@@ -1,23 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.deps import get_db, get_current_user
+from app.deps import get_db, get_read_db, get_current_user
 from app.users.models import User, UserRole
 from app.merchandise import schemas, crud
+from app.merchandise.models import Product, ProductVariant, ProductCollection, ProductStatus
+from app.core.conditional import compute_validators
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 # Public endpoints (доступны всем)
 @router.get("/", response_model=schemas.ProductListResponse)
 async def get_products(
+    request: Request,
+    response: Response,
     category: Optional[schemas.ProductCategory] = Query(None, description="Фильтр по категории"),
     is_featured: Optional[bool] = Query(None, description="Только рекомендуемые товары"),
     search: Optional[str] = Query(None, description="Поиск по названию"),
     page: int = Query(1, ge=1, description="Номер страницы"),
     per_page: int = Query(20, ge=1, le=100, description="Товаров на странице"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить список товаров с фильтрами и пагинацией"""
+    # Фильтры входят в ETag через параметры запроса, сами отметки - по всем активным товарам
+    validators = await compute_validators(db, request, (Product, Product.status == ProductStatus.active))
+    if validators.matches(request):
+        return validators.not_modified()
     filters = schemas.ProductFilters(
         category=category,
         is_featured=is_featured,
@@ -26,15 +37,24 @@ async def get_products(
     )
     
     result = await crud.get_products_with_filters(db, filters, page, per_page)
+    response.headers.update(validators.headers())
     return result
 
 @router.get("/featured", response_model=List[schemas.ProductOut])
 async def get_featured_products(
+    request: Request,
+    response: Response,
     limit: int = Query(6, le=20, description="Количество товаров"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить рекомендуемые товары"""
+    validators = await compute_validators(
+        db, request, (Product, (Product.is_featured == True) & (Product.status == ProductStatus.active))
+    )
+    if validators.matches(request):
+        return validators.not_modified()
     products = await crud.get_featured_products(db, limit)
+    response.headers.update(validators.headers())
     return products
 
 @router.get("/categories", response_model=List[str])
@@ -45,58 +65,91 @@ async def get_product_categories():
 @router.get("/{product_id}", response_model=schemas.ProductWithVariants)
 async def get_product(
     product_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить товар по ID с вариантами"""
+    validators = await compute_validators(
+        db, request, (Product, Product.id == product_id), (ProductVariant, ProductVariant.product_id == product_id)
+    )
+    if validators.matches(request):
+        return validators.not_modified()
     product = await crud.get_product_with_variants(db, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
+    response.headers.update(validators.headers())
     return product
 
 @router.get("/slug/{slug}", response_model=schemas.ProductWithVariants)
 async def get_product_by_slug(
     slug: str,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить товар по slug с вариантами"""
+    validators = await compute_validators(
+        db, request, (Product, Product.slug == slug), (ProductVariant, ProductVariant.product.has(Product.slug == slug))
+    )
+    if validators.matches(request):
+        return validators.not_modified()
     product = await crud.get_product_by_slug(db, slug)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Product not found"
         )
+    response.headers.update(validators.headers())
     return product
 
 # Collections endpoints
 @router.get("/collections/", response_model=List[schemas.ProductCollectionOut])
 async def get_collections(
+    request: Request,
+    response: Response,
     is_featured: Optional[bool] = Query(None, description="Только рекомендуемые коллекции"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить список коллекций"""
+    validators = await compute_validators(db, request, (ProductCollection, ProductCollection.is_active == True))
+    if validators.matches(request):
+        return validators.not_modified()
     try:
         collections = await crud.get_collections(db, is_featured)
+        response.headers.update(validators.headers())
         return collections
-    except Exception as e:
-        print(f"Error getting collections: {e}")
+    except Exception:
+        logger.exception("Error getting collections")
         # Return empty list if there's an error
         return []
 
 @router.get("/collections/{collection_id}", response_model=schemas.ProductCollectionWithProducts)
 async def get_collection(
     collection_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить коллекцию с товарами"""
+    validators = await compute_validators(
+        db,
+        request,
+        (ProductCollection, ProductCollection.id == collection_id),
+        (Product, Product.collections.any(ProductCollection.id == collection_id)),
+    )
+    if validators.matches(request):
+        return validators.not_modified()
     collection = await crud.get_collection_with_products(db, collection_id)
     if not collection:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Collection not found"
         )
+    response.headers.update(validators.headers())
     return collection
 
 # Admin endpoints (только для тренеров)
@@ -1,23 +1,28 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from sqlalchemy import and_, or_, desc, func
+from sqlalchemy import and_, or_, desc, func, cast, literal, String
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 
-from app.notifications.models import Notification, PushToken, NotificationTemplate
+from app.bookings.models import Booking, BookingStatus
+from app.classes.models import Class, ClassOccurrence, OccurrenceStatus
+from app.config import settings
+from app.core.writes import dialect_insert
+from app.notifications.models import Notification, NotificationPriority, NotificationType, PushToken, NotificationTemplate
 from app.notifications.schemas import (
     NotificationCreate, NotificationUpdate, PushTokenCreate, 
     NotificationTemplateCreate, NotificationTemplateUpdate, BulkNotificationCreate
 )
+from app.common.pagination import Page, PageParams, paginate
 
 # Notification CRUD
 async def create_notification(db: AsyncSession, notification_data: NotificationCreate) -> Notification:
     """Создать уведомление"""
     notification = Notification(**notification_data.model_dump())
     db.add(notification)
-    await db.commit()
-    await db.refresh(notification)
+    await db.flush()
     return notification
 
 async def create_bulk_notifications(db: AsyncSession, bulk_data: BulkNotificationCreate) -> List[Notification]:
@@ -37,9 +42,7 @@ async def create_bulk_notifications(db: AsyncSession, bulk_data: BulkNotificatio
         notifications.append(notification)
         db.add(notification)
     
-    await db.commit()
-    for notification in notifications:
-        await db.refresh(notification)
+    await db.flush()
     return notifications
 
 async def get_notification(db: AsyncSession, notification_id: int) -> Optional[Notification]:
@@ -53,9 +56,8 @@ async def get_user_notifications(
     db: AsyncSession, 
     user_id: int, 
     unread_only: bool = False,
-    limit: int = 50,
-    offset: int = 0
-) -> List[Notification]:
+    page: Optional[PageParams] = None
+) -> Page[Notification]:
     """Получить уведомления пользователя"""
     query = select(Notification).where(Notification.user_id == user_id)
     
@@ -68,10 +70,7 @@ async def get_user_notifications(
         or_(Notification.expires_at.is_(None), Notification.expires_at > now)
     )
     
-    query = query.order_by(desc(Notification.created_at)).limit(limit).offset(offset)
-    
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await paginate(db, query, [(Notification.created_at, True), (Notification.id, True)], page)
 
 async def mark_notification_as_read(db: AsyncSession, notification_id: int, user_id: int) -> Optional[Notification]:
     """Отметить уведомление как прочитанное"""
@@ -85,8 +84,7 @@ async def mark_notification_as_read(db: AsyncSession, notification_id: int, user
     if notification and not notification.is_read:
         notification.is_read = True
         notification.read_at = datetime.utcnow()
-        await db.commit()
-        await db.refresh(notification)
+        await db.flush()
     
     return notification
 
@@ -109,7 +107,7 @@ async def mark_all_notifications_as_read(db: AsyncSession, user_id: int) -> int:
         notification.read_at = now
         count += 1
     
-    await db.commit()
+    await db.flush()
     return count
 
 async def get_unread_count(db: AsyncSession, user_id: int) -> int:
@@ -143,16 +141,18 @@ async def create_or_update_push_token(db: AsyncSession, token_data: PushTokenCre
         existing_token.is_active = True
         existing_token.last_used = datetime.utcnow()
         existing_token.updated_at = datetime.utcnow()
-        await db.commit()
-        await db.refresh(existing_token)
+        await db.flush()
         return existing_token
-    else:
-        # Создаем новый токен
-        push_token = PushToken(**token_data.model_dump())
-        db.add(push_token)
-        await db.commit()
-        await db.refresh(push_token)
-        return push_token
+
+    # Создаем новый токен в savepoint: при гонке двух регистраций одного токена
+    # откатывается только вставка, а не вся транзакция запроса
+    push_token = PushToken(**token_data.model_dump())
+    try:
+        async with db.begin_nested():
+            db.add(push_token)
+    except IntegrityError:
+        return await create_or_update_push_token(db, token_data)
+    return push_token
 
 async def get_user_push_tokens(db: AsyncSession, user_id: int) -> List[PushToken]:
     """Получить активные push токены пользователя"""
@@ -173,7 +173,7 @@ async def deactivate_push_token(db: AsyncSession, token: str) -> bool:
     if push_token:
         push_token.is_active = False
         push_token.updated_at = datetime.utcnow()
-        await db.commit()
+        await db.flush()
         return True
     return False
 
@@ -182,8 +182,7 @@ async def create_notification_template(db: AsyncSession, template_data: Notifica
     """Создать шаблон уведомления"""
     template = NotificationTemplate(**template_data.model_dump())
     db.add(template)
-    await db.commit()
-    await db.refresh(template)
+    await db.flush()
     return template
 
 async def get_notification_template(db: AsyncSession, notification_type: str) -> Optional[NotificationTemplate]:
@@ -198,6 +197,82 @@ async def get_all_notification_templates(db: AsyncSession) -> List[NotificationT
     result = await db.execute(select(NotificationTemplate))
     return result.scalars().all()
 
+# Напоминания о тренировках
+TRAINING_REMINDER_TEXT = {
+    "title": "Напоминание о тренировке",
+    "message": "Занятие «{class_name}» начнётся {class_date}",
+}
+
+# Строк уведомлений в одном INSERT (лимит параметров запроса PostgreSQL)
+REMINDER_INSERT_CHUNK = 1000
+
+def _reminder_key(hours: int):
+    """Ключ напоминания в SQL: "training-reminder:{booking_id}:{hours}h" """
+    return literal("training-reminder:", String) + cast(Booking.id, String) + literal(f":{hours}h", String)
+
+async def create_training_reminders(db: AsyncSession, now: datetime) -> int:
+    """Создать напоминания о подтверждённых бронированиях на запланированные
+    (не отменённые) занятия, попавшие в окна TRAINING_REMINDER_HOURS.
+
+    now - местное время клуба (как class_date). Занятие получает напоминание
+    самого узкого окна, в которое попало: за 24 часа, затем за 2. Выборка -
+    один запрос на окно без уже напомненных (NOT EXISTS по dedupe_key),
+    вставка - многострочный INSERT ... ON CONFLICT DO NOTHING, поэтому
+    параллельные и повторные запуски не дублируют уведомления.
+    Отправки push пока нет: напоминания читаются через GET /notifications.
+    Возвращает число созданных уведомлений.
+    """
+    template = await get_notification_template(db, NotificationType.training_reminder.value)
+    created_at = datetime.utcnow()
+    rows = []
+    lower = now
+    for hours in sorted(set(settings.TRAINING_REMINDER_HOURS)):
+        upper = now + timedelta(hours=hours)
+        reminded = select(Notification.id).where(Notification.dedupe_key == _reminder_key(hours)).exists()
+        result = await db.execute(
+            select(Booking.id, Booking.athlete_id, Booking.booked_by_parent_id, Booking.class_date, Class.name)
+            .join(Class, Class.id == Booking.class_id)
+            # Об отменённых занятиях не напоминаем
+            .join(ClassOccurrence, ClassOccurrence.id == Booking.occurrence_id)
+            .where(
+                Booking.status == BookingStatus.confirmed,
+                ClassOccurrence.status == OccurrenceStatus.scheduled,
+                Booking.class_date > lower,
+                Booking.class_date <= upper,
+                ~reminded,
+            )
+        )
+        for booking_id, athlete_id, parent_id, class_date, class_name in result.all():
+            data = {"class_name": class_name, "class_date": class_date.strftime("%d.%m.%Y %H:%M"), "hours": hours}
+            if template:
+                text = format_notification_from_template(template, data)
+            else:
+                text = {key: value.format(**data) for key, value in TRAINING_REMINDER_TEXT.items()}
+            for user_id in sorted({athlete_id, parent_id} - {None}):
+                rows.append({
+                    "user_id": user_id,
+                    "type": NotificationType.training_reminder,
+                    "priority": NotificationPriority.normal,
+                    "data": {"booking_id": booking_id},
+                    "dedupe_key": f"training-reminder:{booking_id}:{hours}h",
+                    "is_read": False,
+                    "is_sent": False,
+                    "created_at": created_at,
+                    **text,
+                })
+        lower = upper
+
+    created = 0
+    for start in range(0, len(rows), REMINDER_INSERT_CHUNK):
+        result = await db.execute(
+            dialect_insert(db, Notification)
+            .values(rows[start:start + REMINDER_INSERT_CHUNK])
+            .on_conflict_do_nothing(index_elements=[Notification.dedupe_key, Notification.user_id])
+            .returning(Notification.id)
+        )
+        created += len(result.all())
+    return created
+
 # Utility functions
 def format_notification_from_template(
     template: NotificationTemplate, 
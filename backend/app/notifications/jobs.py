@@ -0,0 +1,92 @@
+import logging
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.bookings.models import Booking, BookingStatus, SEAT_STATUSES
+from app.classes.schedule import local_now
+from app.config import settings
+from app.jobs.registry import job
+from app.notifications import crud
+from app.notifications.models import NotificationType
+from app.notifications.schemas import NotificationCreate
+
+logger = logging.getLogger(__name__)
+
+# Статус бронирования -> (тип уведомления, заголовок и текст по умолчанию)
+BOOKING_STATUS_NOTIFICATIONS = {
+    BookingStatus.confirmed: (
+        NotificationType.booking_confirmed,
+        "Тренировка подтверждена",
+        "Занятие «{class_name}» {class_date} подтверждено тренером",
+    ),
+    BookingStatus.cancelled: (
+        NotificationType.booking_cancelled,
+        "Бронирование отменено",
+        "Занятие «{class_name}» {class_date} отменено: {reason}",
+    ),
+}
+
+WAITLIST_PROMOTED_NOTIFICATION = (
+    NotificationType.waitlist_promoted,
+    "Освободилось место",
+    "Место на занятии «{class_name}» {class_date} освободилось, бронирование ожидает подтверждения тренера",
+)
+
+
+async def _load_booking(db: AsyncSession, booking_id: int) -> Optional[Booking]:
+    result = await db.execute(
+        select(Booking).where(Booking.id == booking_id).options(selectinload(Booking.class_obj))
+    )
+    return result.scalar_one_or_none()
+
+
+async def _notify_booking(db: AsyncSession, booking: Booking, notification_type: NotificationType, title: str, message: str) -> None:
+    """Уведомление спортсмену и родителю: шаблон типа или текст по умолчанию"""
+    data = {
+        "class_name": booking.class_obj.name if booking.class_obj else "",
+        "class_date": booking.class_date.strftime("%d.%m.%Y %H:%M"),
+        "reason": booking.cancellation_reason or "",
+    }
+    template = await crud.get_notification_template(db, notification_type.value)
+    if template:
+        text = crud.format_notification_from_template(template, data)
+    else:
+        text = {"title": title, "message": message.format(**data)}
+
+    recipients = {booking.athlete_id, booking.booked_by_parent_id} - {None}
+    for user_id in sorted(recipients):
+        await crud.create_notification(db, NotificationCreate(
+            user_id=user_id,
+            type=notification_type,
+            data={"booking_id": booking.id},
+            **text,
+        ))
+
+
+@job("notifications.booking_status")
+async def booking_status(db: AsyncSession, booking_id: int) -> None:
+    """Уведомить спортсмена и родителя о подтверждении или отмене бронирования"""
+    booking = await _load_booking(db, booking_id)
+    if not booking or booking.status not in BOOKING_STATUS_NOTIFICATIONS:
+        return
+    await _notify_booking(db, booking, *BOOKING_STATUS_NOTIFICATIONS[booking.status])
+
+
+@job("notifications.waitlist_promoted")
+async def waitlist_promoted(db: AsyncSession, booking_id: int) -> None:
+    """Уведомить, что бронирование перешло из листа ожидания (ставится из promote_waitlist)"""
+    booking = await _load_booking(db, booking_id)
+    if not booking or booking.status not in SEAT_STATUSES:
+        return
+    await _notify_booking(db, booking, *WAITLIST_PROMOTED_NOTIFICATION)
+
+
+@job("notifications.training_reminders", every=settings.TRAINING_REMINDER_INTERVAL_SECONDS)
+async def training_reminders(db: AsyncSession) -> None:
+    """Напоминания о ближайших подтверждённых занятиях (окна TRAINING_REMINDER_HOURS)"""
+    created = await crud.create_training_reminders(db, local_now())
+    if created:
+        logger.info("Created %s training reminders", created)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum as SqlEnum, ForeignKey, DateTime, Boolean, Text, JSON
+from sqlalchemy import Column, Integer, String, Enum as SqlEnum, ForeignKey, DateTime, Boolean, Text, JSON, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 from enum import Enum
@@ -15,6 +15,7 @@ class NotificationType(str, Enum):
     individual_training_declined = "individual_training_declined"
     schedule_change = "schedule_change"
     general_announcement = "general_announcement"
+    waitlist_promoted = "waitlist_promoted"
 
 class NotificationPriority(str, Enum):
     low = "low"
@@ -25,6 +26,12 @@ class NotificationPriority(str, Enum):
 class Notification(Base):
     """Уведомления для пользователей"""
     __tablename__ = "notifications"
+    __table_args__ = (
+        Index("ix_notifications_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_notifications_user_id_unread", "user_id", postgresql_where=text("is_read = false")),
+        # Повторная генерация (напоминания) не создаёт дублей: ON CONFLICT DO NOTHING
+        UniqueConstraint("dedupe_key", "user_id", name="uq_notifications_dedupe_key_user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -37,6 +44,7 @@ class Notification(Base):
     # Приоритет и метаданные
     priority = Column(SqlEnum(NotificationPriority), default=NotificationPriority.normal)
     data = Column(JSON, nullable=True)  # Дополнительные данные (ID тренировки, турнира и т.д.)
+    dedupe_key = Column(String, nullable=True)  # "training-reminder:{booking_id}:{hours}h"; у обычных уведомлений нет
     
     # Статус
     is_read = Column(Boolean, default=False)
@@ -56,6 +64,9 @@ class Notification(Base):
 class PushToken(Base):
     """Токены для push-уведомлений"""
     __tablename__ = "push_tokens"
+    __table_args__ = (
+        Index("ix_push_tokens_user_id_active", "user_id", postgresql_where=text("is_active")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
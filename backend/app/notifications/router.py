@@ -1,26 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from app.deps import get_db, get_current_user
 from app.users.models import User, UserRole
 from app.notifications import schemas, crud
+from app.common.pagination import PageParams, page_params
 
 router = APIRouter()
 
 # Notification endpoints
 @router.get("/", response_model=List[schemas.NotificationOut])
 async def get_my_notifications(
+    response: Response,
     unread_only: bool = Query(False, description="Получить только непрочитанные"),
-    limit: int = Query(50, le=100, description="Максимум уведомлений"),
-    offset: int = Query(0, ge=0, description="Смещение для пагинации"),
+    page: PageParams = Depends(page_params),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить мои уведомления"""
     notifications = await crud.get_user_notifications(
-        db, current_user.id, unread_only, limit, offset
+        db, current_user.id, unread_only, page
     )
-    return notifications
+    response.headers.update(notifications.headers())
+    return notifications.items
 
 @router.get("/unread-count", response_model=int)
 async def get_unread_notifications_count(
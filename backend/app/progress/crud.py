@@ -1,10 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, case, func, insert, update
 from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, date
 
 from app.progress import models, schemas
+from app.common.pagination import Page, PageParams, paginate
+from app.core.cache import cached, invalidate
+from app.core.singleflight import coalesced
+from app.jobs.crud import enqueue
+
+PRIZE_RESULTS = (models.ParticipationResult.first_place, models.ParticipationResult.second_place, models.ParticipationResult.third_place)
 
 # Progress CRUD
 async def get_progress_by_athlete(db: AsyncSession, athlete_id: int) -> Optional[models.Progress]:
@@ -23,8 +29,7 @@ async def create_progress(db: AsyncSession, progress_data: schemas.ProgressCreat
     """Создать прогресс для спортсмена"""
     db_progress = models.Progress(**progress_data.model_dump())
     db.add(db_progress)
-    await db.commit()
-    await db.refresh(db_progress)
+    await db.flush()
     return db_progress
 
 async def update_progress(db: AsyncSession, athlete_id: int, progress_update: schemas.ProgressUpdate) -> Optional[models.Progress]:
@@ -43,16 +48,44 @@ async def update_progress(db: AsyncSession, athlete_id: int, progress_update: sc
     
     db_progress.updated_at = datetime.utcnow()
     
-    await db.commit()
-    await db.refresh(db_progress)
+    await db.flush()
     return db_progress
 
+async def add_classes_attended(db: AsyncSession, attended: Dict[int, int]) -> None:
+    """Прибавить посещённые занятия: {athlete_id: сколько}.
+
+    Один UPDATE с CASE по спортсменам; тем, у кого прогресса ещё нет, он
+    создаётся одним многострочным INSERT уже с этим числом.
+    """
+    if not attended:
+        return
+    now = datetime.utcnow()
+    result = await db.execute(
+        update(models.Progress)
+        .where(models.Progress.athlete_id.in_(attended))
+        .values(
+            total_classes_attended=func.coalesce(models.Progress.total_classes_attended, 0)
+            + case(attended, value=models.Progress.athlete_id),
+            updated_at=now,
+        )
+        .returning(models.Progress.athlete_id)
+        .execution_options(synchronize_session=False)
+    )
+    missing = set(attended) - set(result.scalars().all())
+    if missing:
+        await db.execute(insert(models.Progress).values([
+            {"athlete_id": athlete_id, "total_classes_attended": attended[athlete_id], "created_at": now, "updated_at": now}
+            for athlete_id in sorted(missing)
+        ]))
+
 async def promote_belt(db: AsyncSession, athlete_id: int, new_belt: models.BeltLevel, new_stripes: int = 0) -> Optional[models.Progress]:
     """Повысить пояс спортсмена"""
     progress = await get_progress_by_athlete(db, athlete_id)
     if not progress:
         return None
     
+    old_belt = progress.current_belt
+    
     # Обновляем пояс
     progress.current_belt = new_belt
     progress.current_stripes = new_stripes
@@ -66,16 +99,15 @@ async def promote_belt(db: AsyncSession, athlete_id: int, new_belt: models.BeltL
         "progress_id": progress.id,
         "achievement_type": models.AchievementType.belt_promotion,
         "title": f"Получен {new_belt.value} пояс",
-        "description": f"Повышение с {progress.current_belt.value} до {new_belt.value} пояса",
+        "description": f"Повышение с {old_belt.value} до {new_belt.value} пояса",
         "belt_level": new_belt,
         "points_earned": 100,  # базовые баллы за повышение
     }
     
-    db_achievement = models.Achievement(**achievement_data)
-    db.add(db_achievement)
+    # Через связь: коллекция, загруженная get_progress_by_athlete, остаётся актуальной
+    progress.achievements.append(models.Achievement(**achievement_data))
     
-    await db.commit()
-    await db.refresh(progress)
+    await db.flush()
     return progress
 
 # Achievement CRUD
@@ -83,58 +115,52 @@ async def create_achievement(db: AsyncSession, achievement_data: schemas.Achieve
     """Создать достижение"""
     db_achievement = models.Achievement(**achievement_data.model_dump())
     db.add(db_achievement)
-    await db.commit()
-    await db.refresh(db_achievement)
+    await db.flush()
     return db_achievement
 
-async def get_achievements_by_athlete(db: AsyncSession, athlete_id: int) -> List[models.Achievement]:
+async def get_achievements_by_athlete(db: AsyncSession, athlete_id: int, page: Optional[PageParams] = None) -> Page[models.Achievement]:
     """Получить все достижения спортсмена"""
-    result = await db.execute(
+    query = (
         select(models.Achievement)
         .where(models.Achievement.athlete_id == athlete_id)
         .options(
             selectinload(models.Achievement.tournament),
             selectinload(models.Achievement.athlete)
         )
-        .order_by(models.Achievement.achieved_date.desc())
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(models.Achievement.achieved_date, True), (models.Achievement.id, True)], page)
 
-async def get_public_achievements(db: AsyncSession, limit: int = 50) -> List[models.Achievement]:
+@coalesced(List[schemas.AchievementWithDetails])
+async def get_public_achievements(db: AsyncSession, page: Optional[PageParams] = None) -> Page[models.Achievement]:
     """Получить публичные достижения для ленты"""
-    result = await db.execute(
+    query = (
         select(models.Achievement)
         .where(models.Achievement.is_public == True)
         .options(
             selectinload(models.Achievement.athlete),
             selectinload(models.Achievement.tournament)
         )
-        .order_by(models.Achievement.achieved_date.desc())
-        .limit(limit)
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(models.Achievement.achieved_date, True), (models.Achievement.id, True)], page)
 
-async def get_all_achievements(db: AsyncSession, skip: int = 0, limit: int = 50) -> List[models.Achievement]:
+async def get_all_achievements(db: AsyncSession, page: Optional[PageParams] = None) -> Page[models.Achievement]:
     """Получить все достижения с пагинацией"""
-    result = await db.execute(
+    query = (
         select(models.Achievement)
         .options(
             selectinload(models.Achievement.athlete),
             selectinload(models.Achievement.tournament)
         )
-        .order_by(models.Achievement.achieved_date.desc())
-        .offset(skip)
-        .limit(limit)
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(models.Achievement.achieved_date, True), (models.Achievement.id, True)], page)
 
 # Tournament CRUD
 async def create_tournament(db: AsyncSession, tournament_data: schemas.TournamentCreate) -> models.Tournament:
     """Создать турнир"""
     db_tournament = models.Tournament(**tournament_data.model_dump())
     db.add(db_tournament)
-    await db.commit()
-    await db.refresh(db_tournament)
+    await db.flush()
+    invalidate(db, "tournaments")
     return db_tournament
 
 async def get_tournament(db: AsyncSession, tournament_id: int) -> Optional[models.Tournament]:
@@ -146,21 +172,19 @@ async def get_tournament(db: AsyncSession, tournament_id: int) -> Optional[model
     )
     return result.scalar_one_or_none()
 
-async def get_tournaments(db: AsyncSession, skip: int = 0, limit: int = 20, status: Optional[models.TournamentStatus] = None) -> List[models.Tournament]:
+async def get_tournaments(db: AsyncSession, page: Optional[PageParams] = None, status: Optional[models.TournamentStatus] = None) -> Page[models.Tournament]:
     """Получить список турниров"""
     query = select(models.Tournament)
     
     if status:
         query = query.where(models.Tournament.status == status)
     
-    query = query.order_by(models.Tournament.event_date.desc()).offset(skip).limit(limit)
-    
-    result = await db.execute(query)
-    return result.scalars().all()
+    return await paginate(db, query, [(models.Tournament.event_date, True), (models.Tournament.id, True)], page)
 
-async def get_upcoming_tournaments(db: AsyncSession, limit: int = 10) -> List[models.Tournament]:
+@cached(List[schemas.TournamentOut], tags=("tournaments",))
+async def get_upcoming_tournaments(db: AsyncSession, page: Optional[PageParams] = None) -> Page[models.Tournament]:
     """Получить предстоящие турниры"""
-    result = await db.execute(
+    query = (
         select(models.Tournament)
         .where(
             and_(
@@ -168,10 +192,8 @@ async def get_upcoming_tournaments(db: AsyncSession, limit: int = 10) -> List[mo
                 models.Tournament.event_date > datetime.utcnow()
             )
         )
-        .order_by(models.Tournament.event_date.asc())
-        .limit(limit)
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(models.Tournament.event_date, False), (models.Tournament.id, False)], page)
 
 async def update_tournament(db: AsyncSession, tournament_id: int, tournament_update: schemas.TournamentUpdate) -> Optional[models.Tournament]:
     """Обновить турнир"""
@@ -189,8 +211,8 @@ async def update_tournament(db: AsyncSession, tournament_id: int, tournament_upd
     
     db_tournament.updated_at = datetime.utcnow()
     
-    await db.commit()
-    await db.refresh(db_tournament)
+    await db.flush()
+    invalidate(db, "tournaments")
     return db_tournament
 
 # Tournament Participation CRUD
@@ -221,29 +243,27 @@ async def register_for_tournament(db: AsyncSession, participation_data: schemas.
     if tournament:
         tournament.current_participants += 1
     
-    await db.commit()
-    await db.refresh(db_participation)
+    await db.flush()
+    invalidate(db, "tournaments")
     return db_participation
 
-async def get_tournament_participants(db: AsyncSession, tournament_id: int) -> List[models.TournamentParticipation]:
+async def get_tournament_participants(db: AsyncSession, tournament_id: int, page: Optional[PageParams] = None) -> Page[models.TournamentParticipation]:
     """Получить участников турнира"""
-    result = await db.execute(
+    query = (
         select(models.TournamentParticipation)
         .where(models.TournamentParticipation.tournament_id == tournament_id)
         .options(selectinload(models.TournamentParticipation.athlete))
-        .order_by(models.TournamentParticipation.registration_date.asc())
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(models.TournamentParticipation.registration_date, False), (models.TournamentParticipation.id, False)], page)
 
-async def get_athlete_tournaments(db: AsyncSession, athlete_id: int) -> List[models.TournamentParticipation]:
+async def get_athlete_tournaments(db: AsyncSession, athlete_id: int, page: Optional[PageParams] = None) -> Page[models.TournamentParticipation]:
     """Получить турниры спортсмена"""
-    result = await db.execute(
+    query = (
         select(models.TournamentParticipation)
         .where(models.TournamentParticipation.athlete_id == athlete_id)
         .options(selectinload(models.TournamentParticipation.tournament))
-        .order_by(models.TournamentParticipation.registration_date.desc())
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(models.TournamentParticipation.registration_date, True), (models.TournamentParticipation.id, True)], page)
 
 
 async def get_tournament_participation_by_athlete(db: AsyncSession, tournament_id: int, athlete_id: int) -> Optional[models.TournamentParticipation]:
@@ -277,36 +297,63 @@ async def update_tournament_result(db: AsyncSession, participation_id: int, resu
     db_participation.final_position = final_position
     db_participation.updated_at = datetime.utcnow()
     
-    # Создаем достижение если это призовое место
-    if result in [models.ParticipationResult.first_place, models.ParticipationResult.second_place, models.ParticipationResult.third_place]:
-        # Получаем турнир для названия
-        tournament_result = await db.execute(
-            select(models.Tournament).where(models.Tournament.id == db_participation.tournament_id)
+    # Достижение за призовое место создаёт фоновая задача
+    if result in PRIZE_RESULTS:
+        await enqueue(
+            db,
+            "progress.tournament_achievement",
+            {"participation_id": participation_id},
+            key=f"tournament-achievement:{participation_id}:{result.value}",
         )
-        tournament = tournament_result.scalar_one_or_none()
-        
-        if tournament:
-            achievement_data = {
-                "athlete_id": db_participation.athlete_id,
-                "progress_id": None,  # Найдем позже
-                "achievement_type": models.AchievementType.tournament_win,
-                "title": f"{result.value.replace('_', ' ').title()} - {tournament.name}",
-                "description": f"Занял {final_position} место в турнире {tournament.name}",
-                "tournament_id": tournament.id,
-                "points_earned": 50 if result == models.ParticipationResult.first_place else 30 if result == models.ParticipationResult.second_place else 20,
-            }
-            
-            # Находим progress_id
-            progress_result = await db.execute(
-                select(models.Progress).where(models.Progress.athlete_id == db_participation.athlete_id)
-            )
-            progress = progress_result.scalar_one_or_none()
-            if progress:
-                achievement_data["progress_id"] = progress.id
-                
-                db_achievement = models.Achievement(**achievement_data)
-                db.add(db_achievement)
     
-    await db.commit()
-    await db.refresh(db_participation)
+    await db.flush()
     return db_participation
+
+async def create_tournament_achievement(db: AsyncSession, participation_id: int) -> Optional[models.Achievement]:
+    """Создать достижение за призовое место по текущему результату участия.
+
+    Ничего не делает, если результат уже не призовой, у спортсмена нет
+    прогресса или достижение за этот турнир уже есть.
+    """
+    result_obj = await db.execute(
+        select(models.TournamentParticipation)
+        .where(models.TournamentParticipation.id == participation_id)
+        .options(selectinload(models.TournamentParticipation.tournament))
+    )
+    db_participation = result_obj.scalar_one_or_none()
+    if not db_participation or db_participation.result not in PRIZE_RESULTS:
+        return None
+    
+    result = db_participation.result
+    tournament = db_participation.tournament
+    
+    # Находим progress_id
+    progress_result = await db.execute(
+        select(models.Progress).where(models.Progress.athlete_id == db_participation.athlete_id)
+    )
+    progress = progress_result.scalar_one_or_none()
+    if not progress:
+        return None
+    
+    existing = await db.execute(
+        select(models.Achievement.id).where(
+            models.Achievement.athlete_id == db_participation.athlete_id,
+            models.Achievement.tournament_id == tournament.id,
+            models.Achievement.achievement_type == models.AchievementType.tournament_win,
+        )
+    )
+    if existing.first():
+        return None
+    
+    db_achievement = models.Achievement(
+        athlete_id=db_participation.athlete_id,
+        progress_id=progress.id,
+        achievement_type=models.AchievementType.tournament_win,
+        title=f"{result.value.replace('_', ' ').title()} - {tournament.name}",
+        description=f"Занял {db_participation.final_position} место в турнире {tournament.name}",
+        tournament_id=tournament.id,
+        points_earned=50 if result == models.ParticipationResult.first_place else 30 if result == models.ParticipationResult.second_place else 20,
+    )
+    db.add(db_achievement)
+    await db.flush()
+    return db_achievement
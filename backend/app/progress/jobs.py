@@ -0,0 +1,10 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.jobs.registry import job
+from app.progress import crud
+
+
+@job("progress.tournament_achievement")
+async def tournament_achievement(db: AsyncSession, participation_id: int) -> None:
+    """Достижение за призовое место (ставится из update_tournament_result)"""
+    await crud.create_tournament_achievement(db, participation_id)
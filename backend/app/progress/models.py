@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum as SqlEnum, ForeignKey, DateTime, Boolean, Text
+from sqlalchemy import Column, Integer, String, Enum as SqlEnum, ForeignKey, DateTime, Boolean, Text, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 from enum import Enum
@@ -52,6 +52,9 @@ class ParticipationResult(str, Enum):
 class Progress(Base):
     """Прогресс спортсмена - пояса, полоски, общая статистика"""
     __tablename__ = "progress"
+    __table_args__ = (
+        Index("ix_progress_athlete_id", "athlete_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     athlete_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -96,6 +99,13 @@ class Progress(Base):
 class Achievement(Base):
     """Достижения спортсмена"""
     __tablename__ = "achievements"
+    __table_args__ = (
+        Index("ix_achievements_athlete_id_achieved_date", "athlete_id", "achieved_date", "id"),
+        Index("ix_achievements_progress_id", "progress_id"),
+        Index("ix_achievements_tournament_id", "tournament_id", postgresql_where=text("tournament_id IS NOT NULL")),
+        Index("ix_achievements_public_achieved_date", "achieved_date", "id", postgresql_where=text("is_public")),
+        Index("ix_achievements_achieved_date_id", "achieved_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     athlete_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -125,6 +135,10 @@ class Achievement(Base):
 class Tournament(Base):
     """Турниры"""
     __tablename__ = "tournaments"
+    __table_args__ = (
+        Index("ix_tournaments_event_date_id", "event_date", "id"),
+        Index("ix_tournaments_status_event_date", "status", "event_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     
@@ -164,6 +178,11 @@ class Tournament(Base):
 class TournamentParticipation(Base):
     """Участие спортсменов в турнирах"""
     __tablename__ = "tournament_participations"
+    __table_args__ = (
+        Index("ix_tournament_participations_tournament_id_athlete_id", "tournament_id", "athlete_id"),
+        Index("ix_tournament_participations_tournament_id_registration_date", "tournament_id", "registration_date", "id"),
+        Index("ix_tournament_participations_athlete_id_registration_date", "athlete_id", "registration_date", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     tournament_id = Column(Integer, ForeignKey("tournaments.id"), nullable=False)
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
-from app.deps import get_db, get_current_user
+from datetime import datetime
+from app.deps import get_db, get_read_db, get_current_user
 from app.users.models import User, UserRole
 from app.progress import schemas, crud
-from app.progress.models import TournamentStatus, ParticipationResult
+from app.progress.models import Tournament, TournamentParticipation, TournamentStatus, ParticipationResult
+from app.core.conditional import compute_validators
+from app.core.responses import serialize
+from app.common.pagination import PageParams, optional_page_params, page_params, paged
 
 router = APIRouter()
 
@@ -105,30 +109,33 @@ async def promote_athlete_belt(
 # Achievement endpoints
 @router.get("/achievements/public", response_model=List[schemas.AchievementWithDetails])
 async def get_public_achievements(
-    limit: int = 50,
-    db: AsyncSession = Depends(get_db)
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить публичные достижения для ленты"""
-    return await crud.get_public_achievements(db, limit)
+    achievements = await crud.get_public_achievements(db, page)
+    return serialize(List[schemas.AchievementWithDetails], achievements.items, headers=achievements.headers())
 
 @router.get("/achievements/athlete/{athlete_id}", response_model=List[schemas.AchievementWithDetails])
 async def get_athlete_achievements(
     athlete_id: int,
-    db: AsyncSession = Depends(get_db),
+    page: PageParams = Depends(optional_page_params),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить достижения спортсмена"""
-    return await crud.get_achievements_by_athlete(db, athlete_id)
+    achievements = await crud.get_achievements_by_athlete(db, athlete_id, page)
+    return serialize(List[schemas.AchievementWithDetails], achievements.items, headers=achievements.headers())
 
 @router.get("/achievements", response_model=List[schemas.AchievementWithDetails])
 async def get_all_achievements(
-    skip: int = 0,
-    limit: int = 50,
-    db: AsyncSession = Depends(get_db),
+    page: PageParams = Depends(page_params),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить все достижения (для авторизованных пользователей)"""
-    return await crud.get_all_achievements(db, skip, limit)
+    achievements = await crud.get_all_achievements(db, page)
+    return serialize(List[schemas.AchievementWithDetails], achievements.items, headers=achievements.headers())
 
 @router.post("/achievements", response_model=schemas.AchievementOut)
 async def create_achievement(
@@ -164,28 +171,58 @@ async def create_tournament(
 
 @router.get("/tournaments", response_model=List[schemas.TournamentOut])
 async def get_tournaments(
-    skip: int = 0,
-    limit: int = 20,
+    request: Request,
+    response: Response,
     status: Optional[TournamentStatus] = None,
-    db: AsyncSession = Depends(get_db)
+    page: PageParams = Depends(paged(20)),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить список турниров"""
-    return await crud.get_tournaments(db, skip, limit, status)
+    validators = await compute_validators(db, request, (Tournament, Tournament.status == status) if status else Tournament)
+    if validators.matches(request):
+        return validators.not_modified()
+    tournaments = await crud.get_tournaments(db, page, status)
+    response.headers.update(tournaments.headers())
+    response.headers.update(validators.headers())
+    return tournaments.items
 
 @router.get("/tournaments/upcoming", response_model=List[schemas.TournamentOut])
 async def get_upcoming_tournaments(
-    limit: int = 10,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    page: PageParams = Depends(paged(10)),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить предстоящие турниры"""
-    return await crud.get_upcoming_tournaments(db, limit)
+    # event_date > now: прошедший турнир уменьшает count и меняет ETag
+    validators = await compute_validators(
+        db,
+        request,
+        (Tournament, (Tournament.status == TournamentStatus.upcoming) & (Tournament.event_date > datetime.utcnow())),
+    )
+    if validators.matches(request):
+        return validators.not_modified()
+    tournaments = await crud.get_upcoming_tournaments(db, page)
+    response.headers.update(tournaments.headers())
+    response.headers.update(validators.headers())
+    return tournaments.items
 
 @router.get("/tournaments/{tournament_id}", response_model=schemas.TournamentWithParticipants)
 async def get_tournament(
     tournament_id: int,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Получить турнир по ID"""
+    validators = await compute_validators(
+        db,
+        request,
+        (Tournament, Tournament.id == tournament_id),
+        (TournamentParticipation, TournamentParticipation.tournament_id == tournament_id),
+    )
+    if validators.matches(request):
+        return validators.not_modified()
     tournament = await crud.get_tournament(db, tournament_id)
     if not tournament:
         raise HTTPException(
@@ -193,6 +230,7 @@ async def get_tournament(
             detail="Tournament not found"
         )
     
+    response.headers.update(validators.headers())
     return tournament
 
 @router.put("/tournaments/{tournament_id}", response_model=schemas.TournamentOut)
@@ -261,7 +299,9 @@ async def register_for_tournament(
 @router.get("/tournaments/{tournament_id}/participants", response_model=List[schemas.TournamentParticipationWithDetails])
 async def get_tournament_participants(
     tournament_id: int,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    page: PageParams = Depends(optional_page_params),
+    db: AsyncSession = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить участников турнира (только тренеры)"""
@@ -272,7 +312,9 @@ async def get_tournament_participants(
             detail="Only coaches can view tournament participants"
         )
     
-    return await crud.get_tournament_participants(db, tournament_id)
+    participants = await crud.get_tournament_participants(db, tournament_id, page)
+    response.headers.update(participants.headers())
+    return participants.items
 
 
 @router.get("/tournaments/{tournament_id}/check-registration", response_model=schemas.TournamentParticipationOut)
@@ -303,11 +345,15 @@ async def check_tournament_registration(
 @router.get("/athletes/{athlete_id}/tournaments", response_model=List[schemas.TournamentParticipationWithDetails])
 async def get_athlete_tournaments(
     athlete_id: int,
+    response: Response,
+    page: PageParams = Depends(optional_page_params),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить турниры спортсмена"""
-    return await crud.get_athlete_tournaments(db, athlete_id)
+    participations = await crud.get_athlete_tournaments(db, athlete_id, page)
+    response.headers.update(participations.headers())
+    return participations.items
 
 @router.put("/tournaments/participation/{participation_id}/result", response_model=schemas.TournamentParticipationOut)
 async def update_tournament_result(
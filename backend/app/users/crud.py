@@ -1,3 +1,4 @@
+import logging
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import select
@@ -6,6 +7,12 @@ from datetime import date
 
 from app.users import models, schemas
 from app.core.security import get_password_hash, verify_password
+from app.common.pagination import Page, PageParams, paginate
+from app.core.writes import insert_returning
+from app.core.cache import cached, invalidate
+from app.core.fields import FieldSet, select_options
+
+logger = logging.getLogger(__name__)
 
 
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
@@ -44,28 +51,13 @@ async def create_user(db: AsyncSession, user: schemas.UserCreate) -> models.User
         primary_role=user.primary_role,
         is_head_coach=user.is_head_coach,
     )
+    # Основная роль и дополнительные (без дублирования основной) - через связь,
+    # чтобы пользователь и роли ушли в базу одним flush
+    roles = [user.primary_role] + [role for role in user.additional_roles if role != user.primary_role]
+    db_user.user_roles = [models.UserRoleAssignment(role=role) for role in roles]
     db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
-    
-    # Добавить основную роль в таблицу ролей
-    primary_role_assignment = models.UserRoleAssignment(
-        user_id=db_user.id,
-        role=user.primary_role
-    )
-    db.add(primary_role_assignment)
-    
-    # Добавить дополнительные роли, если есть
-    for role in user.additional_roles:
-        if role != user.primary_role:  # Избежать дублирования основной роли
-            role_assignment = models.UserRoleAssignment(
-                user_id=db_user.id,
-                role=role
-            )
-            db.add(role_assignment)
-    
-    await db.commit()
-    await db.refresh(db_user)
+    await db.flush()
+    invalidate(db, "users")
     return db_user
 
 
@@ -119,21 +111,14 @@ async def create_parent_athlete_relationship(
     relationship: schemas.ParentAthleteRelationshipCreate
 ) -> models.ParentAthleteRelationship:
     """Создать связь родитель-спортсмен"""
-    db_relationship = models.ParentAthleteRelationship(**relationship.model_dump())
-    db.add(db_relationship)
-    await db.commit()
-    await db.refresh(db_relationship)
-    
-    # Загрузить связанные объекты
-    result = await db.execute(
-        select(models.ParentAthleteRelationship)
-        .where(models.ParentAthleteRelationship.id == db_relationship.id)
-        .options(
-            selectinload(models.ParentAthleteRelationship.parent),
-            selectinload(models.ParentAthleteRelationship.athlete)
-        )
+    db_relationship = await insert_returning(
+        db,
+        models.ParentAthleteRelationship,
+        relationship.model_dump(),
+        load=("parent", "athlete"),
     )
-    return result.scalar_one()
+    await db.flush()
+    return db_relationship
 
 
 async def get_parent_athlete_relationship(
@@ -190,21 +175,14 @@ async def add_role_to_user(db: AsyncSession, user_id: int, role: schemas.UserRol
         raise ValueError("User already has this role")
     
     # Добавить роль
-    role_assignment = models.UserRoleAssignment(
-        user_id=user_id,
-        role=role
-    )
-    db.add(role_assignment)
-    await db.commit()
-    await db.refresh(user)
+    user.user_roles.append(models.UserRoleAssignment(role=role))
+    await db.flush()
+    invalidate(db, "users")
     return user
 
 
 async def get_user_by_iin_for_login(db: AsyncSession, iin: str) -> Optional[models.User]:
     """Получить пользователя по IIN для входа (с загрузкой ролей)"""
-    import logging
-    logger = logging.getLogger(__name__)
-    
     result = await db.execute(
         select(models.User)
         .where(models.User.iin == iin)
@@ -212,9 +190,10 @@ async def get_user_by_iin_for_login(db: AsyncSession, iin: str) -> Optional[mode
     )
     user = result.scalars().first()
     
-    if user:
-        logger.info(f"User {user.id} ({user.full_name}) loaded with roles: {[ur.role for ur in user.user_roles]}")
-        logger.info(f"User primary_role: {user.primary_role}")
+    # Вызывается при каждом аутентифицированном запросе: список ролей
+    # собираем, только если DEBUG включён
+    if user and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("User %s loaded with roles %s, primary_role %s", user.id, [ur.role for ur in user.user_roles], user.primary_role)
     
     return user
 
@@ -256,11 +235,12 @@ async def make_head_coach(db: AsyncSession, user_id: int, requesting_user_id: in
     
     # Назначить главным тренером
     user.is_head_coach = True
-    await db.commit()
-    await db.refresh(user)
+    await db.flush()
+    invalidate(db, "users")
     return user
 
 
+@cached(Optional[schemas.UserOut], tags=("users",))
 async def get_head_coach(db: AsyncSession) -> Optional[models.User]:
     """Получить главного тренера"""
     result = await db.execute(
@@ -282,15 +262,16 @@ async def get_athletes_by_parent(db: AsyncSession, parent_id: int) -> List[model
     return result.scalars().all()
 
 
-async def get_coaches(db: AsyncSession) -> List[models.User]:
+@cached(List[schemas.UserSimple], tags=("users",))
+async def get_coaches(db: AsyncSession, page: Optional[PageParams] = None) -> Page[models.User]:
     """Получить список всех тренеров"""
-    result = await db.execute(
+    query = (
         select(models.User)
         .join(models.UserRoleAssignment, models.User.id == models.UserRoleAssignment.user_id)
         .where(models.UserRoleAssignment.role == models.UserRole.coach)
         .options(selectinload(models.User.user_roles))
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(models.User.id, False)], page)
 
 async def get_parents_by_athlete(db: AsyncSession, athlete_id: int) -> List[models.User]:
     """Получить список родителей для спортсмена"""
@@ -303,14 +284,13 @@ async def get_parents_by_athlete(db: AsyncSession, athlete_id: int) -> List[mode
     return result.scalars().all()
 
 
-async def get_all_users(db: AsyncSession) -> List[models.User]:
+async def get_all_users(db: AsyncSession, page: Optional[PageParams] = None, fields: Optional[FieldSet] = None) -> Page[models.User]:
     """Получить всех пользователей (только для главных тренеров)"""
-    result = await db.execute(
+    query = (
         select(models.User)
-        .options(selectinload(models.User.user_roles))
-        .order_by(models.User.created_at.desc())
+        .options(*select_options(models.User, ("user_roles",), fields, keep=(models.User.created_at,)))
     )
-    return result.scalars().all()
+    return await paginate(db, query, [(models.User.created_at, True), (models.User.id, True)], page)
 
 
 async def make_user_coach(db: AsyncSession, user_id: int, requesting_user_id: int) -> models.User:
@@ -343,14 +323,10 @@ async def make_user_coach(db: AsyncSession, user_id: int, requesting_user_id: in
     user.primary_role = models.UserRole.coach
     
     # Добавить роль в таблицу user_role_assignments
-    role_assignment = models.UserRoleAssignment(
-        user_id=user_id,
-        role=schemas.UserRole.coach
-    )
-    db.add(role_assignment)
+    user.user_roles.append(models.UserRoleAssignment(role=schemas.UserRole.coach))
     
-    await db.commit()
-    await db.refresh(user)
+    await db.flush()
+    invalidate(db, "users")
     return user
 
 
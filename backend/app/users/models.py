@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Enum as SqlEnum, Date, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Enum as SqlEnum, Date, ForeignKey, DateTime, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from app.database import Base
 from enum import Enum
@@ -19,6 +19,10 @@ class RelationshipType(str, Enum):
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_created_at_id", "created_at", "id"),
+        Index("ix_users_head_coach", "id", postgresql_where=text("is_head_coach")),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     iin = Column(String, unique=True, index=True, nullable=False)
@@ -31,6 +35,7 @@ class User(Base):
     primary_role = Column(SqlEnum(UserRole), nullable=False)  # Основная роль
     is_head_coach = Column(Boolean, default=False)  # Флаг главного тренера
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     user_roles = relationship("UserRoleAssignment", back_populates="user", cascade="all, delete-orphan")
@@ -48,6 +53,10 @@ class User(Base):
 
 class UserRoleAssignment(Base):
     __tablename__ = "user_role_assignments"
+    __table_args__ = (
+        Index("ix_user_role_assignments_user_id_role", "user_id", "role"),
+        Index("ix_user_role_assignments_role_user_id", "role", "user_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -59,6 +68,10 @@ class UserRoleAssignment(Base):
 
 class ParentAthleteRelationship(Base):
     __tablename__ = "parent_athlete_relationships"
+    __table_args__ = (
+        Index("ix_parent_athlete_relationships_parent_id_athlete_id", "parent_id", "athlete_id"),
+        Index("ix_parent_athlete_relationships_athlete_id", "athlete_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     parent_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,12 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List
+from typing import List, Optional
 from datetime import date
 from app.deps import get_db, get_current_user
 from app.users import schemas, crud
 from app.users.models import User, UserRole, UserRoleAssignment
 from app.core.security import create_access_token, create_refresh_token, decode_refresh_token
+from app.core.responses import serialize
+from app.core.fields import FieldSet, prune, sparse_fields
+from app.common.pagination import PageParams, optional_page_params
 
 router = APIRouter()
 
@@ -167,7 +170,6 @@ async def get_current_user_info(
     current_user: User = Depends(get_current_user)
 ):
     """Получить информацию о текущем пользователе"""
-    print(f"DEBUG: User {current_user.id} ({current_user.full_name}) - is_head_coach: {current_user.is_head_coach}")
     return current_user
 
 @router.get("/my-athletes", response_model=List[schemas.UserSimple])
@@ -267,8 +269,8 @@ async def create_head_coach(
     db: AsyncSession = Depends(get_db),
 ):
     """Создать главного тренера (только если его еще нет в системе)"""
-    # Проверить, что главного тренера еще нет в системе
-    existing_head_coach = await crud.get_head_coach(db)
+    # Проверить, что главного тренера еще нет в системе (в базе, а не в кэше)
+    existing_head_coach = await crud.get_head_coach.uncached(db)
     if existing_head_coach:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -323,15 +325,20 @@ async def get_head_coach_info(db: AsyncSession = Depends(get_db)):
 
 @router.get("/coaches", response_model=List[schemas.UserSimple])
 async def get_coaches(
+    response: Response,
+    page: PageParams = Depends(optional_page_params),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Получить список всех тренеров"""
-    coaches = await crud.get_coaches(db)
-    return coaches
+    coaches = await crud.get_coaches(db, page)
+    response.headers.update(coaches.headers())
+    return coaches.items
 
 @router.get("/all", response_model=List[schemas.UserOut])
 async def get_all_users(
+    page: PageParams = Depends(optional_page_params),
+    fields: Optional[FieldSet] = Depends(sparse_fields(schemas.UserOut)),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -342,8 +349,8 @@ async def get_all_users(
             detail="Only head coaches can view all users"
         )
     
-    users = await crud.get_all_users(db)
-    return users
+    users = await crud.get_all_users(db, page, fields)
+    return serialize(prune(List[schemas.UserOut], fields), users.items, headers=users.headers())
 
 
 @router.post("/{user_id}/make-coach", response_model=schemas.UserOut)
@@ -7,12 +7,13 @@ from app.config import settings
 from app.database import Base
 # Импортируем все модели
 from app.users.models import User, UserRole, UserRoleAssignment, ParentAthleteRelationship
-from app.classes.models import Class
-from app.bookings.models import Booking, IndividualTrainingRequest
+from app.classes.models import Class, ClassOccurrence
+from app.bookings.models import Booking, CoachWorkingHours, IndividualTrainingRequest
 from app.progress.models import Progress
 from app.notifications.models import Notification
 from app.merchandise.models import Product, ProductVariant, ProductCollection
 from app.chat.models import ChatRoom, ChatMessage, ChatMembership, MessageReaction, ForumCategory, ForumTopic, ForumReply
+from app.jobs.models import Job
 
 # Настройка логов Alembic
 fileConfig(context.config.config_file_name)
@@ -0,0 +1,30 @@
+"""add notification dedupe key
+
+Revision ID: 2b7c5e9f4a60
+Revises: 9e4b2f6a8d31
+Create Date: 2026-10-19 19:41:27.184903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b7c5e9f4a60'
+down_revision: Union[str, Sequence[str], None] = '9e4b2f6a8d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notifications', sa.Column('dedupe_key', sa.String(), nullable=True))
+    op.create_unique_constraint('uq_notifications_dedupe_key_user_id', 'notifications', ['dedupe_key', 'user_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_notifications_dedupe_key_user_id', 'notifications', type_='unique')
+    op.drop_column('notifications', 'dedupe_key')
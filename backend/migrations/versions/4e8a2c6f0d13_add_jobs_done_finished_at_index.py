@@ -0,0 +1,28 @@
+"""add jobs done finished_at index
+
+Revision ID: 4e8a2c6f0d13
+Revises: 7c3f1e5a9b24
+Create Date: 2026-10-19 21:47:05.392614
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e8a2c6f0d13'
+down_revision: Union[str, Sequence[str], None] = '7c3f1e5a9b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_jobs_done_finished_at', 'jobs', ['finished_at'], unique=False, postgresql_where=sa.text("status = 'done'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_jobs_done_finished_at', table_name='jobs', postgresql_where=sa.text("status = 'done'"))
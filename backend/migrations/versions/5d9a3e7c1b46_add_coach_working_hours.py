@@ -0,0 +1,42 @@
+"""add coach working hours
+
+Revision ID: 5d9a3e7c1b46
+Revises: c83e5b1f0d92
+Create Date: 2026-10-19 18:12:40.318522
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d9a3e7c1b46'
+down_revision: Union[str, Sequence[str], None] = 'c83e5b1f0d92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('coach_working_hours',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('coach_id', sa.Integer(), nullable=False),
+    sa.Column('day_of_week', sa.String(), nullable=False),
+    sa.Column('start_time', sa.Time(), nullable=False),
+    sa.Column('end_time', sa.Time(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['coach_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_coach_working_hours_id'), 'coach_working_hours', ['id'], unique=False)
+    op.create_index('ix_coach_working_hours_coach_id', 'coach_working_hours', ['coach_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_coach_working_hours_coach_id', table_name='coach_working_hours')
+    op.drop_index(op.f('ix_coach_working_hours_id'), table_name='coach_working_hours')
+    op.drop_table('coach_working_hours')
@@ -0,0 +1,54 @@
+"""add class occurrences
+
+Revision ID: 6e2d4a8c1f07
+Revises: 3b7f1e9a2c54
+Create Date: 2026-10-19 14:22:41.905318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e2d4a8c1f07'
+down_revision: Union[str, Sequence[str], None] = '3b7f1e9a2c54'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+occurrencestatus = sa.Enum('scheduled', 'cancelled', name='occurrencestatus')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Занятия создаст задача classes.extend_occurrences при первом запуске воркера
+    op.add_column('classes', sa.Column('occurrences_until', sa.Date(), nullable=True))
+    op.create_table(
+        'class_occurrences',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('class_id', sa.Integer(), nullable=False),
+        sa.Column('coach_id', sa.Integer(), nullable=False),
+        sa.Column('starts_at', sa.DateTime(), nullable=False),
+        sa.Column('ends_at', sa.DateTime(), nullable=False),
+        sa.Column('status', occurrencestatus, nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['class_id'], ['classes.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['coach_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('class_id', 'starts_at', name='uq_class_occurrences_class_id_starts_at'),
+    )
+    op.create_index(op.f('ix_class_occurrences_id'), 'class_occurrences', ['id'], unique=False)
+    op.create_index('ix_class_occurrences_starts_at', 'class_occurrences', ['starts_at', 'id'], unique=False, postgresql_where=sa.text("status = 'scheduled'"))
+    op.create_index('ix_class_occurrences_coach_id_starts_at', 'class_occurrences', ['coach_id', 'starts_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_class_occurrences_coach_id_starts_at', table_name='class_occurrences')
+    op.drop_index('ix_class_occurrences_starts_at', table_name='class_occurrences')
+    op.drop_index(op.f('ix_class_occurrences_id'), table_name='class_occurrences')
+    op.drop_table('class_occurrences')
+    occurrencestatus.drop(op.get_bind(), checkfirst=True)
+    op.drop_column('classes', 'occurrences_until')
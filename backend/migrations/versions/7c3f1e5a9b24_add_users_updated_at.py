@@ -0,0 +1,30 @@
+"""add users updated_at
+
+Revision ID: 7c3f1e5a9b24
+Revises: 2b7c5e9f4a60
+Create Date: 2026-10-19 21:12:40.516308
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3f1e5a9b24'
+down_revision: Union[str, Sequence[str], None] = '2b7c5e9f4a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    # ETag занятий учитывает тренера: у существующих пользователей - время создания
+    op.execute("UPDATE users SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'updated_at')
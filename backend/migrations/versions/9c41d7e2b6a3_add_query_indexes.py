@@ -0,0 +1,94 @@
+"""add query indexes
+
+Revision ID: 9c41d7e2b6a3
+Revises: 5cf66e7985c5
+Create Date: 2026-10-19 10:12:41.204118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c41d7e2b6a3'
+down_revision: Union[str, Sequence[str], None] = '5cf66e7985c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (имя, таблица, колонки, условие частичного индекса)
+# Порядок колонок повторяет where + order_by соответствующих запросов в crud.py
+INDEXES = [
+    # users: список всех пользователей, поиск главного тренера
+    ('ix_users_created_at_id', 'users', ['created_at', 'id'], None),
+    ('ix_users_head_coach', 'users', ['id'], 'is_head_coach'),
+    ('ix_user_role_assignments_user_id_role', 'user_role_assignments', ['user_id', 'role'], None),
+    ('ix_user_role_assignments_role_user_id', 'user_role_assignments', ['role', 'user_id'], None),
+    ('ix_parent_athlete_relationships_parent_id_athlete_id', 'parent_athlete_relationships', ['parent_id', 'athlete_id'], None),
+    ('ix_parent_athlete_relationships_athlete_id', 'parent_athlete_relationships', ['athlete_id'], None),
+    # classes
+    ('ix_classes_coach_id_active', 'classes', ['coach_id', 'id'], "status = 'active'"),
+    # bookings: списки по спортсмену/родителю/занятию, сортировка class_date desc, id desc
+    ('ix_bookings_athlete_id_class_date', 'bookings', ['athlete_id', 'class_date', 'id'], None),
+    ('ix_bookings_booked_by_parent_id_class_date', 'bookings', ['booked_by_parent_id', 'class_date', 'id'], 'booked_by_parent_id IS NOT NULL'),
+    ('ix_bookings_class_id_class_date', 'bookings', ['class_id', 'class_date', 'id'], None),
+    ('ix_individual_training_requests_athlete_id_requested_date', 'individual_training_requests', ['athlete_id', 'requested_date', 'id'], None),
+    ('ix_individual_training_requests_coach_id_requested_date', 'individual_training_requests', ['coach_id', 'requested_date', 'id'], None),
+    ('ix_individual_training_requests_coach_id_pending', 'individual_training_requests', ['coach_id', 'requested_date'], "status = 'pending'"),
+    # notifications
+    ('ix_notifications_user_id_created_at', 'notifications', ['user_id', 'created_at', 'id'], None),
+    ('ix_notifications_user_id_unread', 'notifications', ['user_id'], 'is_read = false'),
+    ('ix_push_tokens_user_id_active', 'push_tokens', ['user_id'], 'is_active'),
+    # chat и форум
+    ('ix_chat_memberships_room_id_user_id', 'chat_memberships', ['room_id', 'user_id'], None),
+    ('ix_chat_memberships_user_id', 'chat_memberships', ['user_id'], None),
+    ('ix_chat_messages_room_id_created_at', 'chat_messages', ['room_id', 'created_at', 'id'], 'is_deleted = false'),
+    ('ix_message_reactions_message_id', 'message_reactions', ['message_id'], None),
+    ('ix_forum_topics_category_id_pinned_updated_at', 'forum_topics', ['category_id', 'is_pinned', 'updated_at', 'id'], 'is_approved'),
+    ('ix_forum_replies_topic_id_created_at', 'forum_replies', ['topic_id', 'created_at', 'id'], 'is_approved'),
+    # progress
+    ('ix_progress_athlete_id', 'progress', ['athlete_id'], None),
+    ('ix_achievements_athlete_id_achieved_date', 'achievements', ['athlete_id', 'achieved_date', 'id'], None),
+    ('ix_achievements_progress_id', 'achievements', ['progress_id'], None),
+    ('ix_achievements_tournament_id', 'achievements', ['tournament_id'], 'tournament_id IS NOT NULL'),
+    ('ix_achievements_public_achieved_date', 'achievements', ['achieved_date', 'id'], 'is_public'),
+    ('ix_achievements_achieved_date_id', 'achievements', ['achieved_date', 'id'], None),
+    ('ix_tournaments_event_date_id', 'tournaments', ['event_date', 'id'], None),
+    ('ix_tournaments_status_event_date', 'tournaments', ['status', 'event_date', 'id'], None),
+    ('ix_tournament_participations_tournament_id_athlete_id', 'tournament_participations', ['tournament_id', 'athlete_id'], None),
+    ('ix_tournament_participations_tournament_id_registration_date', 'tournament_participations', ['tournament_id', 'registration_date', 'id'], None),
+    ('ix_tournament_participations_athlete_id_registration_date', 'tournament_participations', ['athlete_id', 'registration_date', 'id'], None),
+    # feedback (таблица могла быть удалена ревизией 5cf66e7985c5)
+    ('ix_feedback_trainer_id_created_at', 'feedback', ['trainer_id', 'created_at', 'id'], None),
+    ('ix_feedback_author_id', 'feedback', ['author_id'], None),
+]
+
+
+def _existing_tables() -> set:
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    tables = _existing_tables()
+    for name, table, columns, where in INDEXES:
+        if table not in tables:
+            continue
+        op.create_index(
+            name,
+            table,
+            columns,
+            unique=False,
+            postgresql_where=sa.text(where) if where else None,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    tables = _existing_tables()
+    for name, table, columns, where in reversed(INDEXES):
+        if table not in tables:
+            continue
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,28 @@
+"""add bookings open class_date index
+
+Revision ID: 9e4b2f6a8d31
+Revises: 5d9a3e7c1b46
+Create Date: 2026-10-19 19:03:12.507714
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e4b2f6a8d31'
+down_revision: Union[str, Sequence[str], None] = '5d9a3e7c1b46'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_class_date_open', 'bookings', ['class_date', 'id'], unique=False, postgresql_where=sa.text("status IN ('pending', 'confirmed', 'waitlisted')"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_class_date_open', table_name='bookings')
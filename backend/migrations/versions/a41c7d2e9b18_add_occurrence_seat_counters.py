@@ -0,0 +1,62 @@
+"""add occurrence seat counters
+
+Revision ID: a41c7d2e9b18
+Revises: 6e2d4a8c1f07
+Create Date: 2026-10-19 15:48:03.117264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c7d2e9b18'
+down_revision: Union[str, Sequence[str], None] = '6e2d4a8c1f07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('class_occurrences', sa.Column('capacity', sa.Integer(), nullable=False, server_default='20'))
+    op.add_column('class_occurrences', sa.Column('seats_taken', sa.Integer(), nullable=False, server_default='0'))
+    op.create_check_constraint('ck_class_occurrences_seats_taken', 'class_occurrences', 'seats_taken >= 0')
+    op.add_column('bookings', sa.Column('occurrence_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('bookings_occurrence_id_fkey', 'bookings', 'class_occurrences', ['occurrence_id'], ['id'])
+    op.create_index('ix_bookings_occurrence_id_status', 'bookings', ['occurrence_id', 'status'], unique=False)
+
+    # Уже созданные занятия: вместимость класса, привязка бронирований и счётчик мест.
+    # Будущие занятия создаёт воркер (classes.extend_occurrences) - он же привязывает
+    # к ним оставшиеся бронирования без occurrence_id и пересчитывает места
+    op.execute("""
+        UPDATE class_occurrences SET capacity = COALESCE(
+            (SELECT classes.max_capacity FROM classes WHERE classes.id = class_occurrences.class_id), 20
+        )
+    """)
+    op.execute("""
+        UPDATE bookings SET occurrence_id = (
+            SELECT class_occurrences.id FROM class_occurrences
+            WHERE class_occurrences.class_id = bookings.class_id
+              AND class_occurrences.starts_at = bookings.class_date
+        )
+        WHERE occurrence_id IS NULL
+    """)
+    op.execute("""
+        UPDATE class_occurrences SET seats_taken = (
+            SELECT count(*) FROM bookings
+            WHERE bookings.occurrence_id = class_occurrences.id
+              AND bookings.status IN ('pending', 'confirmed')
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_occurrence_id_status', table_name='bookings')
+    op.drop_constraint('bookings_occurrence_id_fkey', 'bookings', type_='foreignkey')
+    op.drop_column('bookings', 'occurrence_id')
+    op.drop_constraint('ck_class_occurrences_seats_taken', 'class_occurrences', type_='check')
+    op.drop_column('class_occurrences', 'seats_taken')
+    op.drop_column('class_occurrences', 'capacity')
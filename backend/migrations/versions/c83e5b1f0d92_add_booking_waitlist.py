@@ -0,0 +1,36 @@
+"""add booking waitlist
+
+Revision ID: c83e5b1f0d92
+Revises: a41c7d2e9b18
+Create Date: 2026-10-19 17:06:55.640192
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c83e5b1f0d92'
+down_revision: Union[str, Sequence[str], None] = 'a41c7d2e9b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Новое значение enum нельзя использовать в той же транзакции (индекс ниже)
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE bookingstatus ADD VALUE IF NOT EXISTS 'waitlisted'")
+        op.execute("ALTER TYPE notificationtype ADD VALUE IF NOT EXISTS 'waitlist_promoted'")
+
+    op.add_column('bookings', sa.Column('waitlisted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_bookings_occurrence_id_waitlist', 'bookings', ['occurrence_id', 'waitlisted_at', 'id'], unique=False, postgresql_where=sa.text("status = 'waitlisted'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_occurrence_id_waitlist', table_name='bookings')
+    op.drop_column('bookings', 'waitlisted_at')
+    # Нельзя удалить значения из enum в PostgreSQL без пересоздания типа
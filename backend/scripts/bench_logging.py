@@ -0,0 +1,109 @@
+"""Стоимость логирования на пути аутентификации: синхронный stdout и очередь app.core.log.
+
+Каждый аутентифицированный запрос вызывает get_user_by_iin_for_login. Раньше
+это давало две INFO-записи с f-строками и четыре записи SQL echo (два
+запроса: пользователь и его роли, у каждого текст и параметры), и все они
+писались в stdout прямо на event loop. Скрипт измеряет время, которое
+запрос тратит на логирование в потоке event loop, в трёх режимах:
+
+    before      - как было: f-строки, echo=True, StreamHandler в вызывающем потоке
+    queue+echo  - те же записи через DeferredQueueHandler (SQL_ECHO=true)
+    after       - как сейчас: запись DEBUG отключена, SQL_ECHO=false
+
+Вывод идёт во временный файл, а не в терминал, поэтому оценка занижена:
+запись в pipe или терминал контейнера обычно медленнее.
+Запуск из каталога backend:
+    python -m scripts.bench_logging --requests 20000
+"""
+import argparse
+import logging
+import queue
+import tempfile
+import time
+from logging.handlers import QueueListener
+from types import SimpleNamespace
+
+from app.core.log import DeferredQueueHandler, JSONFormatter
+from app.users.models import UserRole
+
+STATEMENTS = (
+    ("SELECT users.id, users.iin, users.full_name FROM users WHERE users.iin = $1::VARCHAR", ("000000000001",)),
+    ("SELECT user_role_assignments.user_id, user_role_assignments.role FROM user_role_assignments "
+     "WHERE user_role_assignments.user_id IN ($1::INTEGER)", (1,)),
+)
+
+
+def make_user() -> SimpleNamespace:
+    return SimpleNamespace(
+        id=1, full_name="Спортсмен 1", primary_role=UserRole.athlete,
+        user_roles=[SimpleNamespace(role=UserRole.athlete), SimpleNamespace(role=UserRole.parent)],
+    )
+
+
+def auth_before(app_logger: logging.Logger, sql_logger: logging.Logger, user) -> None:
+    for statement, parameters in STATEMENTS:
+        sql_logger.info(statement)
+        sql_logger.info("[generated in %.5fs] %r", 0.0001, parameters)
+    app_logger.info(f"User {user.id} ({user.full_name}) loaded with roles: {[ur.role for ur in user.user_roles]}")
+    app_logger.info(f"User primary_role: {user.primary_role}")
+
+
+def auth_after(app_logger: logging.Logger, sql_logger: logging.Logger, user) -> None:
+    for statement, parameters in STATEMENTS:
+        # Так SQLAlchemy проверяет уровень перед записью echo
+        if sql_logger.isEnabledFor(logging.INFO):
+            sql_logger.info(statement)
+            sql_logger.info("[generated in %.5fs] %r", 0.0001, parameters)
+    if app_logger.isEnabledFor(logging.DEBUG):
+        app_logger.debug("User %s loaded with roles %s, primary_role %s", user.id, [ur.role for ur in user.user_roles], user.primary_role)
+
+
+def loggers(mode: str, handler: logging.Handler, sql_level: int):
+    app_logger = logging.getLogger(f"bench.{mode}.app")
+    sql_logger = logging.getLogger(f"bench.{mode}.sqlalchemy.engine")
+    for logger in (app_logger, sql_logger):
+        logger.handlers = [handler]
+        logger.propagate = False
+    app_logger.setLevel(logging.INFO)
+    sql_logger.setLevel(sql_level)
+    return app_logger, sql_logger
+
+
+def run(requests: int, auth, app_logger, sql_logger) -> float:
+    user = make_user()
+    started = time.perf_counter()
+    for _ in range(requests):
+        auth(app_logger, sql_logger, user)
+    return time.perf_counter() - started
+
+
+def main(requests: int) -> None:
+    with tempfile.TemporaryFile("w") as output:
+        stream = logging.StreamHandler(output)
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+
+        json_stream = logging.StreamHandler(output)
+        json_stream.setFormatter(JSONFormatter())
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, json_stream)
+        listener.start()
+        queue_handler = DeferredQueueHandler(log_queue)
+
+        results = {
+            "before": run(requests, auth_before, *loggers("before", stream, logging.INFO)),
+            "queue+echo": run(requests, auth_before, *loggers("queue", queue_handler, logging.INFO)),
+            "after": run(requests, auth_after, *loggers("after", queue_handler, logging.WARNING)),
+        }
+        listener.stop()
+
+    baseline = results["before"]
+    print(f"{'mode':<12}{'us/request':>12}{'requests/s':>14}{'speedup':>10}")
+    for mode, elapsed in results.items():
+        print(f"{mode:<12}{elapsed * 1e6 / requests:>12.2f}{requests / elapsed:>14.0f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    main(args.requests)
@@ -0,0 +1,100 @@
+"""Сравнение времени сериализации списков: стандартный путь FastAPI и app.core.responses.serialize.
+
+Запуск из каталога backend:
+    python -m scripts.bench_serialization --rows 500 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, datetime
+from types import SimpleNamespace
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.responses import serialize
+from app.users.models import UserRole
+from app.users.schemas import UserOut
+from app.bookings.models import BookingStatus, BookingType
+from app.bookings.schemas import BookingOut
+from app.progress.models import AchievementType, TournamentLevel
+from app.progress.schemas import AchievementWithDetails
+
+
+# Значения как их возвращает SQLAlchemy: enum-поля - экземпляры Enum
+def make_user(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=i, iin=f"{i:012d}", full_name=f"Спортсмен {i}", email=f"user{i}@aiga.kz",
+        phone="+77001234567", birth_date=date(2010, 1, 1), emergency_contact=None,
+        primary_role=UserRole.athlete, is_head_coach=False, created_at=datetime.utcnow(),
+    )
+
+
+def make_booking(i: int) -> SimpleNamespace:
+    coach = SimpleNamespace(id=1, full_name="Тренер")
+    return SimpleNamespace(
+        id=i, athlete_id=i, class_id=1, booking_type=BookingType.regular, class_date=datetime.utcnow(),
+        notes=None, booked_by_parent_id=2, status=BookingStatus.confirmed, booking_date=datetime.utcnow(),
+        is_paid=True, payment_amount=5000, cancellation_reason=None,
+        created_at=datetime.utcnow(), updated_at=datetime.utcnow(),
+        athlete=SimpleNamespace(id=i, full_name=f"Спортсмен {i}"),
+        class_obj=SimpleNamespace(id=1, name="Грэпплинг", coach=coach),
+        booked_by_parent=SimpleNamespace(id=2, full_name="Родитель"),
+    )
+
+
+def make_achievement(i: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=i, athlete_id=i, progress_id=i, achievement_type=AchievementType.tournament_win,
+        title=f"1 место - Турнир {i}", description=None, tournament_id=1, belt_level=None,
+        points_earned=50, is_public=True, achieved_date=datetime.utcnow(), created_at=datetime.utcnow(),
+        athlete=SimpleNamespace(id=i, full_name=f"Спортсмен {i}"),
+        tournament=SimpleNamespace(id=1, name="Кубок Алматы", event_date=datetime.utcnow(), tournament_level=TournamentLevel.local),
+    )
+
+
+ENDPOINTS = {
+    "/users/all": (List[UserOut], make_user),
+    "/bookings/my-bookings": (List[BookingOut], make_booking),
+    "/progress/achievements": (List[AchievementWithDetails], make_achievement),
+}
+
+
+async def fastapi_path(field, rows) -> bytes:
+    content = await serialize_response(field=field, response_content=rows)
+    return JSONResponse(content).body
+
+
+def fast_path(schema, rows) -> bytes:
+    return serialize(schema, rows).body
+
+
+async def main(rows: int, repeat: int) -> None:
+    print(f"{'endpoint':<26}{'before, ms':>12}{'after, ms':>12}{'speedup':>10}")
+    for path, (schema, factory) in ENDPOINTS.items():
+        data = [factory(i) for i in range(rows)]
+        field = create_model_field(name="response", type_=schema, mode="serialization")
+        assert json.loads(await fastapi_path(field, data)) == json.loads(fast_path(schema, data))
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await fastapi_path(field, data)
+        before = (time.perf_counter() - started) * 1000 / repeat
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            fast_path(schema, data)
+        after = (time.perf_counter() - started) * 1000 / repeat
+
+        print(f"{path:<26}{before:>12.2f}{after:>12.2f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.repeat))
@@ -0,0 +1,235 @@
+"""Проверка, что запросы чтения из crud.py обслуживаются индексами.
+
+Скрипт заполняет таблицы тестовыми данными внутри транзакции, вызывает
+функции чтения из crud-модулей, перехватывает выполненный ими SQL и получает
+план каждого запроса через EXPLAIN с выключенным seq scan. Если планировщику
+всё равно приходится читать таблицу целиком, подходящего индекса нет.
+В конце транзакция откатывается, данные в базе не остаются.
+
+Запуск из каталога backend (нужен Postgres с применёнными миграциями):
+    python -m scripts.check_indexes --rows 200
+"""
+import argparse
+import asyncio
+import re
+import sys
+import uuid
+from datetime import date, datetime, time, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.config import settings
+from app import models  # noqa: F401 - регистрация всех моделей
+from app.users.models import User, UserRole, UserRoleAssignment, ParentAthleteRelationship, RelationshipType
+from app.classes.models import Class
+from app.bookings.models import Booking, IndividualTrainingRequest
+from app.notifications.models import Notification, NotificationType, PushToken
+from app.chat.models import ChatRoom, ChatType, ChatMembership, ChatMessage, ForumCategory, ForumTopic, ForumReply
+from app.progress.models import Progress, Achievement, AchievementType, Tournament, TournamentParticipation
+from app.feedback.models import Feedback
+from app.common.pagination import PageParams
+from app.users import crud as users_crud
+from app.classes import crud as classes_crud
+from app.bookings import crud as bookings_crud
+from app.notifications import crud as notifications_crud
+from app.chat import crud as chat_crud
+from app.progress import crud as progress_crud
+from app.feedback import crud as feedback_crud
+
+# Справочники из нескольких строк: полное чтение для них дешевле индекса
+SMALL_TABLES = {"forum_categories", "notification_templates"}
+
+SEQ_SCAN = re.compile(r"Seq Scan on (\w+)")
+
+Check = Tuple[str, Callable[[AsyncSession, Dict[str, int]], Awaitable[Any]]]
+
+
+async def seed(db: AsyncSession, rows: int, with_feedback: bool) -> Dict[str, int]:
+    """Создать связанный набор данных и вернуть id, по которым будут запросы"""
+    tag = uuid.uuid4().hex[:8]
+    now = datetime.utcnow()
+
+    def user(i: int, role: UserRole) -> User:
+        return User(
+            iin=f"chk{tag}{i:06d}", full_name=f"Проверка {i}", email=f"chk-{tag}-{i}@example.com",
+            birth_date=date(1990, 1, 1), hashed_password="-", primary_role=role,
+        )
+
+    coach, parent = user(0, UserRole.coach), user(1, UserRole.parent)
+    athletes = [user(i + 2, UserRole.athlete) for i in range(rows)]
+    db.add_all([coach, parent, *athletes])
+    await db.flush()
+
+    db.add_all([UserRoleAssignment(user_id=coach.id, role=UserRole.coach), UserRoleAssignment(user_id=parent.id, role=UserRole.parent)])
+    db.add_all([UserRoleAssignment(user_id=a.id, role=UserRole.athlete) for a in athletes])
+    db.add_all([
+        ParentAthleteRelationship(parent_id=parent.id, athlete_id=a.id, relationship_type=RelationshipType.guardian)
+        for a in athletes[:3]
+    ])
+
+    classes = [
+        Class(name=f"Группа {i}", coach_id=coach.id, day_of_week="понедельник",
+              start_time=time(18, 0), end_time=time(19, 30), price_per_class=3000)
+        for i in range(max(rows // 20, 2))
+    ]
+    db.add_all(classes)
+    await db.flush()
+
+    athlete = athletes[0]
+    db.add_all([
+        Booking(athlete_id=athletes[i % len(athletes)].id, class_id=classes[i % len(classes)].id,
+                booked_by_parent_id=parent.id if i % 2 else None, class_date=now - timedelta(days=i))
+        for i in range(rows * 5)
+    ])
+    db.add_all([
+        IndividualTrainingRequest(athlete_id=athletes[i % len(athletes)].id, coach_id=coach.id,
+                                  requested_date=now + timedelta(days=i))
+        for i in range(rows)
+    ])
+    db.add_all([
+        Notification(user_id=athletes[i % len(athletes)].id, type=NotificationType.general_announcement,
+                     title="Проверка", message="Проверка", is_read=bool(i % 3))
+        for i in range(rows * 5)
+    ])
+    db.add_all([PushToken(user_id=a.id, token=f"chk-{tag}-{a.id}", platform="ios") for a in athletes])
+
+    room = ChatRoom(name="Проверка", chat_type=ChatType.general, created_by_id=coach.id)
+    category = ForumCategory(name=f"Проверка {tag}")
+    db.add_all([room, category])
+    await db.flush()
+    db.add_all([ChatMembership(room_id=room.id, user_id=a.id) for a in athletes])
+    db.add_all([
+        ChatMessage(room_id=room.id, sender_id=athletes[i % len(athletes)].id, content="Проверка")
+        for i in range(rows * 5)
+    ])
+    topic = ForumTopic(category_id=category.id, created_by_id=coach.id, title="Проверка", content="Проверка")
+    db.add(topic)
+    await db.flush()
+    db.add_all([ForumReply(topic_id=topic.id, author_id=athletes[i % len(athletes)].id, content="Проверка") for i in range(rows)])
+
+    tournaments = [
+        Tournament(name=f"Турнир {i}", location="Алматы", event_date=now + timedelta(days=i - rows // 2))
+        for i in range(rows)
+    ]
+    progresses = [Progress(athlete_id=a.id) for a in athletes]
+    db.add_all([*tournaments, *progresses])
+    await db.flush()
+    db.add_all([
+        Achievement(athlete_id=p.athlete_id, progress_id=p.id, achievement_type=AchievementType.attendance_milestone,
+                    title="Проверка", tournament_id=tournaments[i % len(tournaments)].id if i % 4 == 0 else None)
+        for i, p in enumerate(progresses * 3)
+    ])
+    db.add_all([
+        TournamentParticipation(tournament_id=tournaments[i % len(tournaments)].id, athlete_id=athletes[i % len(athletes)].id)
+        for i in range(rows * 2)
+    ])
+    if with_feedback:
+        db.add_all([Feedback(author_id=athletes[i % len(athletes)].id, trainer_id=coach.id, rating=5) for i in range(rows)])
+    await db.flush()
+
+    return {
+        "coach": coach.id, "parent": parent.id, "athlete": athlete.id, "room": room.id,
+        "category": category.id, "topic": topic.id, "tournament": tournaments[0].id,
+    }
+
+
+def checks(with_feedback: bool) -> List[Check]:
+    page = PageParams(limit=20)
+    items: List[Check] = [
+        ("users.get_all_users", lambda db, ids: users_crud.get_all_users(db, page)),
+        ("users.get_coaches", lambda db, ids: users_crud.get_coaches(db, page)),
+        ("users.get_user", lambda db, ids: users_crud.get_user(db, ids["athlete"])),
+        ("users.get_head_coach", lambda db, ids: users_crud.get_head_coach(db)),
+        ("users.get_athletes_by_parent", lambda db, ids: users_crud.get_athletes_by_parent(db, ids["parent"])),
+        ("users.get_parents_by_athlete", lambda db, ids: users_crud.get_parents_by_athlete(db, ids["athlete"])),
+        ("users.user_has_role", lambda db, ids: users_crud.user_has_role(db, ids["coach"], UserRole.coach)),
+        ("classes.get_classes", lambda db, ids: classes_crud.get_classes(db, page)),
+        ("classes.get_classes_by_coach", lambda db, ids: classes_crud.get_classes_by_coach(db, ids["coach"], page)),
+        ("bookings.get_bookings_by_parent", lambda db, ids: bookings_crud.get_bookings_by_parent(db, ids["parent"], page)),
+        ("bookings.get_bookings_by_athlete", lambda db, ids: bookings_crud.get_bookings_by_athlete(db, ids["athlete"], page)),
+        ("bookings.get_bookings_by_coach", lambda db, ids: bookings_crud.get_bookings_by_coach(db, ids["coach"], page)),
+        ("bookings.get_individual_training_requests_by_athlete",
+         lambda db, ids: bookings_crud.get_individual_training_requests_by_athlete(db, ids["athlete"], page)),
+        ("bookings.get_individual_training_requests_by_coach",
+         lambda db, ids: bookings_crud.get_individual_training_requests_by_coach(db, ids["coach"], page)),
+        ("bookings.get_pending_individual_training_requests_by_coach",
+         lambda db, ids: bookings_crud.get_pending_individual_training_requests_by_coach(db, ids["coach"])),
+        ("bookings.count_pending_individual_training_requests_by_coach",
+         lambda db, ids: bookings_crud.count_pending_individual_training_requests_by_coach(db, ids["coach"])),
+        ("notifications.get_user_notifications",
+         lambda db, ids: notifications_crud.get_user_notifications(db, ids["athlete"], False, page)),
+        ("notifications.get_unread_count", lambda db, ids: notifications_crud.get_unread_count(db, ids["athlete"])),
+        ("notifications.get_user_push_tokens", lambda db, ids: notifications_crud.get_user_push_tokens(db, ids["athlete"])),
+        ("chat.get_chat_rooms", lambda db, ids: chat_crud.get_chat_rooms(db, page)),
+        ("chat.get_user_chat_rooms", lambda db, ids: chat_crud.get_user_chat_rooms(db, ids["athlete"])),
+        ("chat.get_room_messages", lambda db, ids: chat_crud.get_room_messages(db, ids["room"], page)),
+        ("chat.get_forum_topics", lambda db, ids: chat_crud.get_forum_topics(db, ids["category"], page)),
+        ("chat.get_forum_replies", lambda db, ids: chat_crud.get_forum_replies(db, ids["topic"], page)),
+        ("progress.get_progress_by_athlete", lambda db, ids: progress_crud.get_progress_by_athlete(db, ids["athlete"])),
+        ("progress.get_achievements_by_athlete", lambda db, ids: progress_crud.get_achievements_by_athlete(db, ids["athlete"], page)),
+        ("progress.get_public_achievements", lambda db, ids: progress_crud.get_public_achievements(db, page)),
+        ("progress.get_all_achievements", lambda db, ids: progress_crud.get_all_achievements(db, page)),
+        ("progress.get_tournaments", lambda db, ids: progress_crud.get_tournaments(db, page)),
+        ("progress.get_upcoming_tournaments", lambda db, ids: progress_crud.get_upcoming_tournaments(db, page)),
+        ("progress.get_tournament", lambda db, ids: progress_crud.get_tournament(db, ids["tournament"])),
+        ("progress.get_tournament_participants",
+         lambda db, ids: progress_crud.get_tournament_participants(db, ids["tournament"], page)),
+        ("progress.get_athlete_tournaments", lambda db, ids: progress_crud.get_athlete_tournaments(db, ids["athlete"], page)),
+    ]
+    if with_feedback:
+        items.append(("feedback.get_feedback_for_trainer", lambda db, ids: feedback_crud.get_feedback_for_trainer(db, ids["coach"], page)))
+    return items
+
+
+async def main(rows: int) -> int:
+    engine = create_async_engine(settings.DATABASE_URL)
+    captured: List[Tuple[str, Any]] = []
+    capturing = False
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if capturing and not executemany:
+            captured.append((statement, parameters))
+
+    failures = 0
+    async with engine.connect() as conn:
+        await conn.begin()
+        with_feedback = await conn.run_sync(lambda sync_conn: inspect(sync_conn).has_table("feedback"))
+        db = AsyncSession(bind=conn, expire_on_commit=False)
+        ids = await seed(db, rows, with_feedback)
+        await conn.exec_driver_sql("ANALYZE")
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+        for name, call in checks(with_feedback):
+            captured.clear()
+            capturing = True
+            await call(db, ids)
+            capturing = False
+            db.expunge_all()
+
+            for statement, parameters in captured:
+                result = await conn.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                plan = "\n".join(row[0] for row in result)
+                scanned = sorted(set(SEQ_SCAN.findall(plan)) - SMALL_TABLES)
+                if scanned:
+                    failures += 1
+                    print(f"FAIL {name}: seq scan on {', '.join(scanned)}")
+                    print("    " + statement.replace("\n", " "))
+                    print("    " + plan.replace("\n", "\n    "))
+                else:
+                    print(f"ok   {name}")
+
+        await conn.rollback()
+    await engine.dispose()
+
+    print(f"\n{failures} запрос(ов) без индекса")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200, help="размер тестового набора (спортсменов)")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.rows)))
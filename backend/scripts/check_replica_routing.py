@@ -0,0 +1,108 @@
+"""Проверка маршрутизации чтения между основной базой и репликой.
+
+Скрипт выполняет GET /classes/ через ASGI-приложение и считает, сколько
+запросов ушло на каждый движок: анонимное чтение и чтение пользователя без
+недавних записей должны попасть на реплику, чтение сразу после записи - на
+основную базу, а после окна READ_YOUR_WRITES_SECONDS - снова на реплику.
+Данные не создаются и не меняются.
+
+Для локальной проверки DATABASE_REPLICA_URL можно направить на ту же базу,
+что и DATABASE_URL (или на её копию): маршрут определяется по движку, а не по
+содержимому. Запуск из каталога backend (миграции применены):
+    DATABASE_REPLICA_URL=postgresql+asyncpg://... python -m scripts.check_replica_routing
+"""
+import argparse
+import asyncio
+import sys
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+
+from app.core.replica import read_your_writes
+from app.core.security import create_access_token
+from app.database import engine, replica_engine
+from app.main import app
+
+SUBJECT = "000000000000"
+
+
+async def get(path: str, token: Optional[str] = None) -> int:
+    """Выполнить GET напрямую через ASGI и вернуть статус ответа"""
+    headers: List[Tuple[bytes, bytes]] = [(b"host", b"localhost")]
+    if token:
+        headers.append((b"authorization", f"Bearer {token}".encode()))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"limit=1",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    status: Dict[str, int] = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status["code"] = message["status"]
+
+    await app(scope, receive, send)
+    return status.get("code", 0)
+
+
+async def main(window: float) -> int:
+    if replica_engine is None:
+        print("DATABASE_REPLICA_URL не задан: все запросы идут в основную базу")
+        return 1
+
+    counts: Counter = Counter()
+
+    def counter(name):
+        def count(conn, cursor, statement, parameters, context, executemany):
+            counts[name] += 1
+        return count
+
+    event.listen(engine.sync_engine, "before_cursor_execute", counter("primary"))
+    event.listen(replica_engine.sync_engine, "before_cursor_execute", counter("replica"))
+
+    read_your_writes.window_seconds = window
+    read_your_writes.clear()
+    token = create_access_token({"sub": SUBJECT})
+
+    async def step(title: str, expected: str, **kwargs) -> bool:
+        counts.clear()
+        code = await get("/classes/", **kwargs)
+        routed = "replica" if counts["replica"] and not counts["primary"] else "primary"
+        ok = code == 200 and routed == expected
+        print(f"{'OK  ' if ok else 'FAIL'} {title}: HTTP {code}, primary={counts['primary']} replica={counts['replica']}")
+        return ok
+
+    results = [await step("анонимное чтение", "replica")]
+    results.append(await step("чтение без недавних записей", "replica", token=token))
+
+    # То же, что делает get_db после фиксации транзакции с записями
+    read_your_writes.mark(SUBJECT)
+    results.append(await step("чтение сразу после записи", "primary", token=token))
+
+    await asyncio.sleep(window + 0.1)
+    results.append(await step("чтение после окна read-your-writes", "replica", token=token))
+
+    await engine.dispose()
+    await replica_engine.dispose()
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--window", type=float, default=0.5, help="окно read-your-writes для проверки, секунд")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.window)))
@@ -0,0 +1,134 @@
+"""Нагрузочная проверка счётчика мест: сотни одновременных бронирований последнего места.
+
+Создаёт тренера, --attempts спортсменов и занятие с --capacity местами, из
+которых свободно только одно. Затем все спортсмены одновременно бронируют
+его через bookings.crud.create_booking, каждый в своей сессии и транзакции,
+как параллельные запросы POST /bookings/. Успешным должно быть ровно одно
+бронирование, а seats_taken - равен capacity. Тестовые данные в конце удаляются.
+
+Запускать против PostgreSQL (DATABASE_URL из .env или окружения); в SQLite
+записи и так выполняются строго по очереди. Из каталога backend:
+    python -m scripts.stress_booking_capacity --attempts 300 --connections 50
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import date, datetime, time as dtime, timedelta
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app import models  # noqa: F401 - регистрация всех моделей
+from app.bookings import crud
+from app.bookings.models import Booking, SEAT_STATUSES
+from app.bookings.schemas import BookingCreate
+from app.classes.models import Class, ClassOccurrence, OccurrenceStatus
+from app.classes.schedule import local_today
+from app.config import settings
+from app.users.models import User, UserRole
+
+
+async def create_fixtures(sessions: async_sessionmaker, attempts: int, capacity: int):
+    tag = uuid.uuid4().hex[:8]
+    async with sessions() as db:
+        users = [
+            {
+                "iin": f"stress-{tag}-{i}",
+                "full_name": f"Stress {i}",
+                "email": f"stress-{tag}-{i}@example.com",
+                "birth_date": date(1990, 1, 1),
+                "hashed_password": "-",
+                "primary_role": UserRole.coach if i == 0 else UserRole.athlete,
+            }
+            for i in range(attempts + 1)
+        ]
+        ids = (await db.execute(insert(User).values(users).returning(User.id))).scalars().all()
+        coach_id, athlete_ids = ids[0], ids[1:]
+
+        class_id = (await db.execute(
+            insert(Class).values(
+                name=f"Stress {tag}", coach_id=coach_id, day_of_week="понедельник",
+                start_time=dtime(18), end_time=dtime(19), max_capacity=capacity, price_per_class=0,
+            ).returning(Class.id)
+        )).scalar_one()
+        starts_at = datetime.combine(local_today() + timedelta(days=7), dtime(18))
+        # Свободно одно место
+        occurrence_id = (await db.execute(
+            insert(ClassOccurrence).values(
+                class_id=class_id, coach_id=coach_id, starts_at=starts_at, ends_at=starts_at + timedelta(hours=1),
+                status=OccurrenceStatus.scheduled, capacity=capacity, seats_taken=capacity - 1,
+            ).returning(ClassOccurrence.id)
+        )).scalar_one()
+        await db.commit()
+    return ids, class_id, occurrence_id, starts_at, athlete_ids
+
+
+async def attempt(sessions: async_sessionmaker, start: asyncio.Event, data: BookingCreate) -> str:
+    await start.wait()
+    async with sessions() as db:
+        try:
+            await crud.create_booking(db, data, None)
+            await db.commit()
+            return "booked"
+        except crud.SessionFull:
+            await db.rollback()
+            return "full"
+        except Exception as e:
+            await db.rollback()
+            return type(e).__name__
+
+
+async def cleanup(sessions: async_sessionmaker, user_ids, class_id: int, occurrence_id: int) -> None:
+    async with sessions() as db:
+        await db.execute(delete(Booking).where(Booking.class_id == class_id))
+        await db.execute(delete(ClassOccurrence).where(ClassOccurrence.id == occurrence_id))
+        await db.execute(delete(Class).where(Class.id == class_id))
+        await db.execute(delete(User).where(User.id.in_(user_ids)))
+        await db.commit()
+
+
+async def main(attempts: int, connections: int, capacity: int) -> bool:
+    engine = create_async_engine(settings.DATABASE_URL, pool_size=connections, max_overflow=0)
+    sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    user_ids, class_id, occurrence_id, starts_at, athlete_ids = await create_fixtures(sessions, attempts, capacity)
+    try:
+        start = asyncio.Event()
+        tasks = [
+            asyncio.create_task(attempt(sessions, start, BookingCreate(athlete_id=athlete_id, class_id=class_id, class_date=starts_at)))
+            for athlete_id in athlete_ids
+        ]
+        await asyncio.sleep(0.1)
+        started = time.perf_counter()
+        start.set()
+        outcomes = Counter(await asyncio.gather(*tasks))
+        elapsed = time.perf_counter() - started
+
+        async with sessions() as db:
+            seats_taken = (await db.execute(
+                select(ClassOccurrence.seats_taken).where(ClassOccurrence.id == occurrence_id)
+            )).scalar_one()
+            booked = (await db.execute(
+                select(func.count()).select_from(Booking).where(Booking.occurrence_id == occurrence_id, Booking.status.in_(SEAT_STATUSES))
+            )).scalar_one()
+    finally:
+        await cleanup(sessions, user_ids, class_id, occurrence_id)
+        await engine.dispose()
+
+    print(f"{attempts} attempts over {connections} connections in {elapsed:.2f}s")
+    print(f"outcomes: {dict(outcomes)}")
+    print(f"seats_taken={seats_taken} capacity={capacity} bookings={booked + capacity - 1}")
+    ok = outcomes["booked"] == 1 and seats_taken == capacity and booked == 1
+    print("OK" if ok else "FAILED: overbooked or lost seat")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=300)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument("--capacity", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args.attempts, args.connections, args.capacity)) else 1)
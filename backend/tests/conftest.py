@@ -0,0 +1,76 @@
+"""Общие фикстуры: приложение на временной SQLite (aiosqlite).
+
+Переменные окружения задаются до импорта app: настройки читаются при импорте.
+"""
+import asyncio
+import os
+import tempfile
+from datetime import date
+
+import pytest
+
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="aiga-tests-"), "test.db")
+# База задаётся явно, а не setdefault: фикстуры пересоздают схему
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_PATH}"
+os.environ["ALEMBIC_DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ["DATABASE_REPLICA_URL"] = ""
+os.environ["CACHE_REDIS_URL"] = "memory://"
+os.environ.setdefault("SECRET_KEY", "test-secret")
+
+from sqlalchemy import event  # noqa: E402
+
+import app.main  # noqa: E402,F401  - регистрирует все модели в Base.metadata
+from app.database import Base, engine  # noqa: E402
+from app.users.models import User, UserRole  # noqa: E402
+
+
+@pytest.fixture
+def run():
+    """Выполнить корутину в цикле событий теста; схема создаётся заново"""
+    loop = asyncio.new_event_loop()
+
+    async def reset():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+
+    loop.run_until_complete(reset())
+    yield loop.run_until_complete
+    loop.run_until_complete(engine.dispose())
+    loop.close()
+
+
+@pytest.fixture
+def statements():
+    """SQL-запросы, отправленные в базу, в порядке выполнения"""
+    executed = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", listener)
+    yield executed
+    event.remove(engine.sync_engine, "before_cursor_execute", listener)
+
+
+@pytest.fixture
+def make_users():
+    """make_users(db, *roles): пользователи с заданными ролями, закоммиченные"""
+
+    async def make(db, *roles: UserRole):
+        users = [
+            User(
+                iin=f"{index:012d}",
+                full_name=f"User {index}",
+                email=f"user{index}@example.com",
+                birth_date=date(2010, 1, 1),
+                hashed_password="x",
+                primary_role=role,
+            )
+            for index, role in enumerate(roles, start=1)
+        ]
+        db.add_all(users)
+        await db.commit()
+        return users
+
+    return make
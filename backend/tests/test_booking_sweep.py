@@ -0,0 +1,89 @@
+"""Периодическое закрытие прошедших бронирований (app.bookings.jobs)"""
+from datetime import time, timedelta
+
+from sqlalchemy import select
+
+from app.bookings import jobs
+from app.bookings.models import Booking, BookingStatus
+from app.bookings.crud import BOOKING_SESSION_CANCELLED_REASON
+from app.classes.models import Class, ClassOccurrence, OccurrenceStatus
+from app.classes.schedule import local_now
+from app.database import AsyncSessionLocal
+from app.progress.models import Progress
+from app.users.models import UserRole
+
+
+def test_sweep_batches_commit_outside_job_session(run, make_users, monkeypatch):
+    monkeypatch.setattr(jobs.settings, "BOOKING_SWEEP_BATCH_SIZE", 2)
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            coach, athlete = await make_users(db, UserRole.coach, UserRole.athlete)
+            class_obj = Class(name="Грэпплинг", coach_id=coach.id, day_of_week="понедельник", start_time=time(10), end_time=time(11), price_per_class=0)
+            db.add(class_obj)
+            await db.flush()
+            past = local_now() - timedelta(days=1)
+            statuses = [BookingStatus.confirmed] * 3 + [BookingStatus.pending, BookingStatus.waitlisted]
+            db.add_all([
+                Booking(athlete_id=athlete.id, class_id=class_obj.id, class_date=past - timedelta(days=i), status=status)
+                for i, status in enumerate(statuses)
+            ])
+            db.add(Booking(athlete_id=athlete.id, class_id=class_obj.id, class_date=local_now() + timedelta(days=1), status=BookingStatus.confirmed))
+            await db.commit()
+
+        async with AsyncSessionLocal() as db:
+            await jobs.sweep(db)
+            # Откат сессии задачи (сбой до complete_job) не отменяет зафиксированные пачки
+            await db.rollback()
+
+        async with AsyncSessionLocal() as db:
+            bookings = (await db.execute(select(Booking).order_by(Booking.class_date))).scalars().all()
+            progress = (await db.execute(select(Progress).where(Progress.athlete_id == athlete.id))).scalar_one()
+            return [booking.status for booking in bookings], progress.total_classes_attended
+
+    statuses, attended = run(scenario())
+    assert statuses == [
+        BookingStatus.cancelled,
+        BookingStatus.cancelled,
+        BookingStatus.completed,
+        BookingStatus.completed,
+        BookingStatus.completed,
+        BookingStatus.confirmed,
+    ]
+    assert attended == 3
+
+
+def test_sweep_skips_cancelled_sessions(run, make_users):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            coach, athlete = await make_users(db, UserRole.coach, UserRole.athlete)
+            class_obj = Class(name="Грэпплинг", coach_id=coach.id, day_of_week="понедельник", start_time=time(10), end_time=time(11), price_per_class=0)
+            db.add(class_obj)
+            await db.flush()
+            past = local_now() - timedelta(days=1)
+            occurrences = [
+                ClassOccurrence(class_id=class_obj.id, coach_id=coach.id, starts_at=past - timedelta(days=i), ends_at=past - timedelta(days=i) + timedelta(hours=1), status=status, seats_taken=1)
+                for i, status in enumerate((OccurrenceStatus.scheduled, OccurrenceStatus.cancelled))
+            ]
+            db.add_all(occurrences)
+            await db.flush()
+            db.add_all([
+                Booking(athlete_id=athlete.id, class_id=class_obj.id, occurrence_id=occurrence.id, class_date=occurrence.starts_at, status=BookingStatus.confirmed)
+                for occurrence in occurrences
+            ])
+            await db.commit()
+
+        async with AsyncSessionLocal() as db:
+            await jobs.sweep(db)
+
+        async with AsyncSessionLocal() as db:
+            bookings = (await db.execute(select(Booking).order_by(Booking.class_date.desc()))).scalars().all()
+            progress = (await db.execute(select(Progress).where(Progress.athlete_id == athlete.id))).scalar_one()
+            return [(booking.status, booking.cancellation_reason) for booking in bookings], progress.total_classes_attended
+
+    bookings, attended = run(scenario())
+    assert bookings == [
+        (BookingStatus.completed, None),
+        (BookingStatus.cancelled, BOOKING_SESSION_CANCELLED_REASON),
+    ]
+    assert attended == 1
@@ -0,0 +1,87 @@
+"""Статусы бронирований и места на занятиях (app.bookings.crud)"""
+from datetime import datetime, time, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.bookings import crud as booking_crud
+from app.bookings.models import Booking, BookingStatus
+from app.classes import crud as class_crud
+from app.classes.models import Class, ClassOccurrence, OccurrenceStatus
+from app.classes.schemas import ClassUpdate
+from app.database import AsyncSessionLocal
+from app.jobs.models import Job
+from app.users.models import UserRole
+
+
+async def _class_with_booking(db, make_users, status: BookingStatus):
+    coach, athlete = await make_users(db, UserRole.coach, UserRole.athlete)
+    class_obj = Class(name="Грэпплинг", coach_id=coach.id, day_of_week="понедельник", start_time=time(10), end_time=time(11), price_per_class=0)
+    db.add(class_obj)
+    await db.flush()
+    booking = Booking(
+        athlete_id=athlete.id,
+        class_id=class_obj.id,
+        class_date=datetime.combine(datetime.utcnow().date() + timedelta(days=7), time(10)),
+        status=status,
+    )
+    db.add(booking)
+    await db.commit()
+    return booking
+
+
+@pytest.mark.parametrize("status", [BookingStatus.cancelled, BookingStatus.completed, BookingStatus.waitlisted, BookingStatus.confirmed])
+def test_approve_only_pending(run, make_users, status):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            booking = await _class_with_booking(db, make_users, status)
+            approved = await booking_crud.approve_booking(db, booking.id)
+            await db.commit()
+            current = (await db.execute(select(Booking.status).where(Booking.id == booking.id))).scalar_one()
+            return approved, current
+
+    approved, current = run(scenario())
+    assert approved is None
+    assert current == status
+
+
+def test_schedule_change_cancels_bookings_on_dropped_sessions(run, make_users):
+    async def occurrence_state(db, occurrence_id):
+        result = await db.execute(select(ClassOccurrence.status, ClassOccurrence.seats_taken).where(ClassOccurrence.id == occurrence_id))
+        return tuple(result.one())
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            coach, athlete = await make_users(db, UserRole.coach, UserRole.athlete)
+            class_obj = Class(name="Грэпплинг", coach_id=coach.id, day_of_week="понедельник", start_time=time(10), end_time=time(11), price_per_class=0)
+            db.add(class_obj)
+            await db.flush()
+            await class_crud.regenerate_occurrences(db, class_obj)
+            occurrence = (
+                await db.execute(select(ClassOccurrence).where(ClassOccurrence.class_id == class_obj.id).order_by(ClassOccurrence.starts_at))
+            ).scalars().first()
+            booking = Booking(athlete_id=athlete.id, class_id=class_obj.id, occurrence_id=occurrence.id, class_date=occurrence.starts_at, status=BookingStatus.confirmed)
+            db.add(booking)
+            occurrence.seats_taken = 1
+            await db.commit()
+            class_id, occurrence_id, booking_id = class_obj.id, occurrence.id, booking.id
+
+        async with AsyncSessionLocal() as db:
+            await class_crud.update_class(db, class_id, ClassUpdate(day_of_week="вторник"))
+            await db.commit()
+            booking = (await db.execute(select(Booking).where(Booking.id == booking_id))).scalar_one()
+            keys = (await db.execute(select(Job.idempotency_key))).scalars().all()
+            dropped = await occurrence_state(db, occurrence_id)
+
+            # Возврат прежнего расписания: занятие снова scheduled, но без отменённой брони
+            await class_crud.update_class(db, class_id, ClassUpdate(day_of_week="понедельник"))
+            await db.commit()
+            revived = await occurrence_state(db, occurrence_id)
+            return booking, keys, dropped, revived
+
+    booking, keys, dropped, revived = run(scenario())
+    assert booking.status == BookingStatus.cancelled
+    assert booking.cancellation_reason == class_crud.SCHEDULE_CHANGED_REASON
+    assert keys == [f"booking-status:{booking.id}:cancelled"]
+    assert dropped == (OccurrenceStatus.cancelled, 0)
+    assert revived == (OccurrenceStatus.scheduled, 0)
@@ -0,0 +1,126 @@
+"""Кэш результатов crud-функций (app.core.cache)"""
+import asyncio
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+
+from app import deps
+from app.core import cache as cache_module
+from app.core.cache import Cache, CacheBackend, InMemoryRedis, MemoryBackend, RedisBackend, invalidate
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Управляемое time.monotonic() модуля кэша"""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def _counted(test_cache: Cache, tag: str = "classes"):
+    """Кэшируемая функция с тегом tag и список её вызовов"""
+    calls = []
+
+    async def get_items(db, limit: int = 3):
+        calls.append(limit)
+        return list(range(limit))
+
+    # Имя функции входит в ключ кэша
+    get_items.__qualname__ = f"get_{tag}"
+    return test_cache.cached(List[int], tags=(tag,))(get_items), calls
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def test_memory_backend_lru_and_ttl(clock):
+    async def scenario():
+        backend = MemoryBackend(max_entries=2)
+        await backend.set("a", b"1", ttl=10)
+        await backend.set("b", b"2", ttl=10)
+        # Чтение делает "a" свежей, вытесняется "b"
+        assert await backend.get("a") == b"1"
+        await backend.set("c", b"3", ttl=30)
+        assert await backend.get("b") is None
+        assert backend.size() == 2
+
+        clock[0] += 10
+        assert await backend.get("a") is None
+        assert await backend.get("c") == b"3"
+        assert backend.size() == 1
+
+    asyncio.run(scenario())
+
+
+def test_memory_redis_backend(clock):
+    async def scenario():
+        backend = RedisBackend.from_url("memory://")
+        assert isinstance(backend.client, InMemoryRedis)
+        await backend.set("key", b"value", ttl=5)
+        assert await backend.get("key") == b"value"
+        await backend.bump(["classes", "classes", "users"])
+        assert await backend.get_versions(["classes", "users", "other"]) == [2, 1, 0]
+
+        clock[0] += 5
+        assert await backend.get("key") is None
+        # Версии тегов не истекают
+        assert await backend.get_versions(["classes"]) == [2]
+
+    asyncio.run(scenario())
+
+
+def test_hit_miss_stats():
+    test_cache = Cache(MemoryBackend(max_entries=10))
+    get_items, calls = _counted(test_cache)
+    db = SimpleNamespace(bind=object())
+
+    async def scenario():
+        assert await get_items(db) == [0, 1, 2]
+        assert await get_items(db, 3) == [0, 1, 2]
+        assert await get_items(db, limit=2) == [0, 1]
+
+    asyncio.run(scenario())
+    assert calls == [3, 2]
+    stats = test_cache.stats()
+    assert (stats["backend"], stats["entries"], stats["hits"], stats["misses"]) == ("memory", 2, 1, 2)
+    assert stats["functions"][0]["hit_ratio"] == 0.333
+
+    test_cache.reset_stats()
+    assert test_cache.stats()["functions"] == []
+
+
+def test_tags_invalidated_after_commit(run, monkeypatch):
+    test_cache = Cache(MemoryBackend(max_entries=10))
+    monkeypatch.setattr(deps, "cache", test_cache)
+    get_items, calls = _counted(test_cache)
+    other_items, other_calls = _counted(test_cache, "users")
+    request = SimpleNamespace()
+
+    async def scenario():
+        db = SimpleNamespace(bind=object())
+        await get_items(db)
+        await other_items(db)
+
+        # Откат: теги не сбрасываются
+        session = deps.get_db(request)
+        invalidate(await session.__anext__(), "classes")
+        with pytest.raises(RuntimeError):
+            await session.athrow(RuntimeError("handler failed"))
+        await get_items(db)
+
+        session = deps.get_db(request)
+        invalidate(await session.__anext__(), "classes")
+        # До фиксации запись в кэше ещё действительна
+        await get_items(db)
+        assert len(calls) == 1
+        with pytest.raises(StopAsyncIteration):
+            await session.__anext__()
+        await get_items(db)
+        await other_items(db)
+
+    run(scenario())
+    assert len(calls) == 2
+    assert len(other_calls) == 1
@@ -0,0 +1,52 @@
+"""Очередь фоновых задач (app.jobs.crud)"""
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from app.database import AsyncSessionLocal
+from app.jobs import crud, retention
+from app.jobs.models import Job, JobStatus
+
+
+def test_expired_lease_on_last_attempt_fails(run):
+    async def scenario():
+        expired = datetime.utcnow() - timedelta(seconds=1)
+        async with AsyncSessionLocal() as db:
+            db.add_all([
+                Job(name="a", payload={}, status=JobStatus.running, attempts=2, max_attempts=3, locked_until=expired),
+                Job(name="b", payload={}, status=JobStatus.running, attempts=3, max_attempts=3, locked_until=expired),
+            ])
+            await db.commit()
+
+        async with AsyncSessionLocal() as db:
+            claimed = await crud.claim_jobs(db, 10)
+            await db.commit()
+            jobs = (await db.execute(select(Job).order_by(Job.name))).scalars().all()
+            return [job.name for job in claimed], [(job.status, job.attempts) for job in jobs], jobs[1].last_error
+
+    claimed, jobs, error = run(scenario())
+    assert claimed == ["a"]
+    assert jobs == [(JobStatus.running, 3), (JobStatus.failed, 3)]
+    assert error == crud.LEASE_EXPIRED_ERROR
+
+
+def test_purge_done_keeps_recent_and_failed(run, monkeypatch):
+    monkeypatch.setattr(retention.settings, "JOBS_RETENTION_BATCH_SIZE", 2)
+
+    async def scenario():
+        old = datetime.utcnow() - timedelta(days=retention.settings.JOBS_RETENTION_DAYS + 1)
+        async with AsyncSessionLocal() as db:
+            db.add_all([Job(name=f"old-{i}", payload={}, status=JobStatus.done, finished_at=old) for i in range(5)])
+            db.add_all([
+                Job(name="recent", payload={}, status=JobStatus.done, finished_at=datetime.utcnow()),
+                Job(name="failed", payload={}, status=JobStatus.failed, finished_at=old),
+            ])
+            await db.commit()
+
+        async with AsyncSessionLocal() as db:
+            await retention.purge_done(db)
+
+        async with AsyncSessionLocal() as db:
+            return (await db.execute(select(Job.name).order_by(Job.name))).scalars().all()
+
+    assert run(scenario()) == ["failed", "recent"]
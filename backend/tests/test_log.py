@@ -0,0 +1,25 @@
+"""Отложенное форматирование записей лога (app.core.log)"""
+import logging
+import queue
+
+from app.core.log import DeferredQueueHandler
+
+
+def _prepared(msg, *args):
+    handler = DeferredQueueHandler(queue.SimpleQueue())
+    record = logging.LogRecord("app.test", logging.INFO, __file__, 1, msg, args, None)
+    return handler.prepare(record)
+
+
+def test_primitive_args_are_deferred():
+    record = _prepared("Booking %s for user %s", 7, "x")
+    assert record.args == (7, "x")
+    assert record.getMessage() == "Booking 7 for user x"
+
+
+def test_mutable_args_are_formatted_eagerly():
+    items = [1, 2]
+    record = _prepared("Items %s", items)
+    items.append(3)
+    assert record.args is None
+    assert record.getMessage() == "Items [1, 2]"
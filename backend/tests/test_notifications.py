@@ -0,0 +1,43 @@
+"""Напоминания о тренировках (app.notifications.crud)"""
+from datetime import time, timedelta
+
+from sqlalchemy import select
+
+from app.bookings.models import Booking, BookingStatus
+from app.classes.models import Class, ClassOccurrence, OccurrenceStatus
+from app.classes.schedule import local_now
+from app.database import AsyncSessionLocal
+from app.notifications import crud
+from app.notifications.models import Notification
+from app.users.models import UserRole
+
+
+def test_reminders_skip_cancelled_sessions(run, make_users):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            coach, athlete = await make_users(db, UserRole.coach, UserRole.athlete)
+            class_obj = Class(name="Грэпплинг", coach_id=coach.id, day_of_week="понедельник", start_time=time(10), end_time=time(11), price_per_class=0)
+            db.add(class_obj)
+            await db.flush()
+            soon = local_now().replace(microsecond=0) + timedelta(hours=1)
+            occurrences = [
+                ClassOccurrence(class_id=class_obj.id, coach_id=coach.id, starts_at=soon + timedelta(minutes=i), ends_at=soon + timedelta(hours=1), status=status)
+                for i, status in enumerate((OccurrenceStatus.scheduled, OccurrenceStatus.cancelled))
+            ]
+            db.add_all(occurrences)
+            await db.flush()
+            bookings = [
+                Booking(athlete_id=athlete.id, class_id=class_obj.id, occurrence_id=occurrence.id, class_date=occurrence.starts_at, status=BookingStatus.confirmed)
+                for occurrence in occurrences
+            ]
+            db.add_all(bookings)
+            await db.commit()
+
+            created = await crud.create_training_reminders(db, local_now())
+            await db.commit()
+            keys = (await db.execute(select(Notification.dedupe_key))).scalars().all()
+            return created, keys, bookings[0].id
+
+    created, keys, booking_id = run(scenario())
+    assert created == 1
+    assert keys == [f"training-reminder:{booking_id}:2h"]
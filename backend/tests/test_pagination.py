@@ -0,0 +1,83 @@
+"""Keyset-пагинация по колонкам с NULL (app.common.pagination)"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.common.pagination import InvalidCursor, PageParams, optional_page_params, paged, paginate
+from app.database import AsyncSessionLocal
+from app.users.models import User, UserRole
+
+
+def _walk(run, order_by, limit=2):
+    """Пройти весь список страницами по limit, вернуть id в порядке выдачи"""
+
+    async def scenario():
+        ids, cursor = [], None
+        async with AsyncSessionLocal() as db:
+            while True:
+                page = await paginate(db, select(User), order_by, PageParams(cursor=cursor, limit=limit))
+                ids.extend(user.id for user in page.items)
+                if not page.next_cursor:
+                    return ids
+                cursor = page.next_cursor
+
+    return run(scenario())
+
+
+@pytest.fixture
+def users(run, make_users):
+    """7 пользователей: у троих created_at = NULL, у двоих одинаковый"""
+
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            users = await make_users(db, *[UserRole.athlete] * 7)
+            base = datetime(2026, 1, 1)
+            created = [base, None, base + timedelta(days=1), None, base, base + timedelta(days=2), None]
+            for user, created_at in zip(users, created):
+                await db.execute(update(User).where(User.id == user.id).values(created_at=created_at))
+            await db.commit()
+            return {user.id: created_at for user, created_at in zip(users, created)}
+
+    return run(scenario())
+
+
+def test_descending_with_nulls(run, users):
+    ids = _walk(run, [(User.created_at, True), (User.id, True)])
+    nulls = sorted((user_id for user_id, created_at in users.items() if created_at is None), reverse=True)
+    dated = sorted((user_id for user_id, created_at in users.items() if created_at is not None), key=lambda user_id: (users[user_id], user_id), reverse=True)
+    assert ids == nulls + dated
+
+
+def test_ascending_with_nulls(run, users):
+    ids = _walk(run, [(User.created_at, False), (User.id, False)])
+    dated = sorted((user_id for user_id, created_at in users.items() if created_at is not None), key=lambda user_id: (users[user_id], user_id))
+    nulls = sorted(user_id for user_id, created_at in users.items() if created_at is None)
+    assert ids == dated + nulls
+
+
+def test_mixed_directions_with_nulls(run, users):
+    ids = _walk(run, [(User.created_at, True), (User.id, False)], limit=3)
+    nulls = sorted(user_id for user_id, created_at in users.items() if created_at is None)
+    dated = sorted((user_id for user_id, created_at in users.items() if created_at is not None), key=lambda user_id: (-users[user_id].toordinal(), user_id))
+    assert ids == nulls + dated
+
+
+def test_unbounded_without_limit(run, users):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            return await paginate(db, select(User), [(User.id, False)], PageParams(limit=None))
+
+    page = run(scenario())
+    assert [user.id for user in page.items] == sorted(users)
+    assert page.next_cursor is None
+    assert optional_page_params(cursor=None, limit=None, skip=None, offset=None) == PageParams(limit=None)
+
+
+def test_legacy_skip_rejected():
+    dependency = paged(20)
+    assert dependency(cursor=None, limit=20, skip=0, offset=None) == PageParams(limit=20)
+    with pytest.raises(InvalidCursor):
+        dependency(cursor=None, limit=20, skip=20, offset=None)
+    with pytest.raises(InvalidCursor):
+        dependency(cursor=None, limit=20, skip=None, offset=5)
@@ -0,0 +1,27 @@
+"""Ключ объединения запросов (app.core.singleflight)"""
+import inspect
+from types import SimpleNamespace
+
+from app.core import singleflight
+from app.core.singleflight import call_key
+
+
+async def _get_items(db, limit: int = 6):
+    return []
+
+
+def test_call_key_normalizes_arguments():
+    signature = inspect.signature(_get_items)
+    db = SimpleNamespace(bind=object())
+    assert call_key(signature, db, (), {}) == call_key(signature, db, (6,), {}) == call_key(signature, db, (), {"limit": 6})
+    assert call_key(signature, db, (7,), {}) != call_key(signature, db, (6,), {})
+
+
+def test_call_key_separates_replica_from_primary(monkeypatch):
+    primary, replica = object(), object()
+    monkeypatch.setattr(singleflight, "replica_engine", replica)
+    signature = inspect.signature(_get_items)
+    primary_key = call_key(signature, SimpleNamespace(bind=primary), (), {})
+    replica_key = call_key(signature, SimpleNamespace(bind=replica), (), {})
+    assert primary_key != replica_key
+    assert primary_key == call_key(signature, SimpleNamespace(bind=object()), (), {})
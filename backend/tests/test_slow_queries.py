@@ -0,0 +1,25 @@
+"""Журнал медленных запросов (app.core.slow_queries)"""
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.slow_queries import SlowQueryLog
+
+
+def test_failed_query_does_not_leak_start_time(run, tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'slow.db'}")
+    log = SlowQueryLog(threshold_ms=0, size=10)
+    log.install(engine)
+
+    async def scenario():
+        async with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                await conn.execute(text("SELECT * FROM missing_table"))
+            await conn.execute(text("SELECT 1"))
+            started = (await conn.get_raw_connection()).info["slow_query_started"]
+        await engine.dispose()
+        return started
+
+    assert run(scenario()) == []
+    assert [entry["statement"] for entry in log.entries()] == ["SELECT 1"]
@@ -0,0 +1,146 @@
+"""Число запросов у записи через RETURNING (app.core.writes).
+
+Создание и обновление - один INSERT/UPDATE ... RETURNING; связи берутся из
+identity map сессии, недостающие - одним SELECT на связь.
+"""
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import select
+
+from app.bookings import crud as booking_crud
+from app.bookings.models import Booking, BookingStatus
+from app.classes.models import Class
+from app.database import AsyncSessionLocal
+from app.users import crud as user_crud
+from app.users.models import ParentAthleteRelationship, RelationshipType, User, UserRole
+from app.users.schemas import ParentAthleteRelationshipCreate
+from app.core.writes import insert_many_returning, insert_returning, update_returning
+
+
+def _relationship(parent: User, athlete: User) -> ParentAthleteRelationshipCreate:
+    return ParentAthleteRelationshipCreate(
+        parent_id=parent.id,
+        athlete_id=athlete.id,
+        relationship_type=RelationshipType.mother,
+    )
+
+
+def test_insert_returning_takes_relations_from_identity_map(run, statements, make_users):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            parent, athlete = await make_users(db, UserRole.parent, UserRole.athlete)
+            statements.clear()
+            relationship = await user_crud.create_parent_athlete_relationship(db, _relationship(parent, athlete))
+            return relationship
+
+    relationship = run(scenario())
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO parent_athlete_relationships")
+    assert "RETURNING" in statements[0]
+    assert relationship.parent.full_name == "User 1"
+    assert relationship.athlete.full_name == "User 2"
+
+
+def test_insert_returning_loads_missing_relations(run, statements, make_users):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            parent, athlete = await make_users(db, UserRole.parent, UserRole.athlete)
+        # Новая сессия: в identity map нет пользователей
+        async with AsyncSessionLocal() as db:
+            statements.clear()
+            return await insert_returning(
+                db,
+                ParentAthleteRelationship,
+                _relationship(parent, athlete).model_dump(),
+                load=("parent", "athlete"),
+            )
+
+    relationship = run(scenario())
+    assert len(statements) == 3
+    assert statements[0].startswith("INSERT INTO parent_athlete_relationships")
+    assert all(statement.startswith("SELECT") for statement in statements[1:])
+    assert relationship.athlete.full_name == "User 2"
+
+
+def test_insert_many_returning_is_one_statement(run, statements, make_users):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            parent, *athletes = await make_users(db, UserRole.parent, UserRole.athlete, UserRole.athlete, UserRole.athlete)
+            statements.clear()
+            return await insert_many_returning(
+                db,
+                ParentAthleteRelationship,
+                [_relationship(parent, athlete).model_dump() for athlete in athletes],
+                load=("parent", "athlete"),
+            )
+
+    relationships = run(scenario())
+    assert len(statements) == 1
+    assert len(relationships) == 3
+    assert [relationship.athlete.full_name for relationship in relationships] == ["User 2", "User 3", "User 4"]
+
+
+def test_approve_booking_is_one_update(run, statements, make_users):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            coach, athlete = await make_users(db, UserRole.coach, UserRole.athlete)
+            class_obj = Class(
+                name="Грэпплинг",
+                coach_id=coach.id,
+                day_of_week="понедельник",
+                start_time=time(10),
+                end_time=time(11),
+                price_per_class=0,
+            )
+            db.add(class_obj)
+            await db.flush()
+            booking = Booking(
+                athlete_id=athlete.id,
+                class_id=class_obj.id,
+                class_date=datetime.combine(datetime.utcnow().date() + timedelta(days=7), time(10)),
+            )
+            db.add(booking)
+            await db.commit()
+
+            statements.clear()
+            approved = await booking_crud.approve_booking(db, booking.id)
+            await db.commit()
+            return approved
+
+    approved = run(scenario())
+    # UPDATE ... RETURNING и постановка уведомления в очередь; связи - из identity map
+    assert [statement.split()[0] for statement in statements] == ["UPDATE", "INSERT"]
+    assert statements[0].startswith("UPDATE bookings")
+    assert "RETURNING" in statements[0]
+    assert statements[1].startswith("INSERT INTO jobs")
+    assert approved.status == BookingStatus.confirmed
+    assert approved.class_obj.coach.full_name == "User 1"
+
+
+def test_update_returning_missing_row(run, statements):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            statements.clear()
+            return await update_returning(db, Booking, 404, {"notes": "x"}, load=("athlete",))
+
+    assert run(scenario()) is None
+    assert len(statements) == 1
+
+
+def test_hydrate_reuses_loaded_user(run, statements, make_users):
+    async def scenario():
+        async with AsyncSessionLocal() as db:
+            parent, athlete = await make_users(db, UserRole.parent, UserRole.athlete)
+            # Как get_current_user: пользователь уже загружен в сессию запроса
+            await db.execute(select(User).where(User.id == parent.id))
+            statements.clear()
+            return await insert_returning(
+                db,
+                ParentAthleteRelationship,
+                _relationship(parent, athlete).model_dump(),
+                load=("parent",),
+            )
+
+    relationship = run(scenario())
+    assert len(statements) == 1
+    assert relationship.parent.id == relationship.parent_id